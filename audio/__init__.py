@@ -0,0 +1,9 @@
+# AudioCapture lives in audio.capture and is not re-exported here, so that code which
+# never opens a microphone does not need PortAudio to import this package.
+from .file_source import FileAudioSource, find_audio_files, read_audio_file
+from .frame_queue import FrameQueue
+from .recorder import CommandRecorder
+from .ring_buffer import AudioRingBuffer
+from .source import AudioSource
+from .vad import VADEngine, RMSVAD, AdaptiveVAD, SileroVAD, create_vad_engine, speech_span
+from .wake_phrase import WakePhraseTrimmer
@@ -0,0 +1,41 @@
+import sounddevice as sd
+
+from .source import AudioSource
+
+
+class AudioCapture(AudioSource):
+    """
+    Owns the microphone stream. The sounddevice callback is the only audio producer: it
+    copies each block into a FrameQueue and returns immediately, so the microphone keeps
+    being read no matter how long wake-word detection or command processing take.
+    """
+
+    def __init__(self, sample_rate: int, frame_length: int, queue_frames: int):
+        super().__init__(sample_rate, frame_length, queue_frames)
+        self.input_overflows = 0
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        """Runs on the PortAudio thread; must never block."""
+        if status.input_overflow:
+            self.input_overflows += 1
+        self.frames.put(indata)
+
+    def start(self):
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype='int16',
+            blocksize=self.frame_length,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def stats(self) -> dict:
+        return {**super().stats(), "input_overflows": self.input_overflows}
@@ -0,0 +1,122 @@
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from .source import AudioSource
+
+AUDIO_FILE_SUFFIXES = {".wav", ".flac"}
+
+
+def find_audio_files(paths: list) -> list[Path]:
+    """Expands directories into the audio files they contain, in sorted order."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in AUDIO_FILE_SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+
+def read_audio_file(path: Path, sample_rate: int) -> np.ndarray:
+    """
+    Reads a WAV or FLAC file as mono int16 at `sample_rate`.
+
+    WAV is read with the standard library; FLAC needs the optional `soundfile` package.
+    Multi-channel audio is averaged to mono and other sample rates are resampled linearly,
+    which is good enough for replaying recorded commands.
+    """
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported.")
+            file_rate = wav_file.getframerate()
+            channels = wav_file.getnchannels()
+            audio = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+            audio = audio.reshape(-1, channels)
+    else:
+        try:
+            import soundfile
+        except ImportError:
+            raise ImportError(f"Reading {path.suffix} files requires the 'soundfile' package.") from None
+        audio, file_rate = soundfile.read(str(path), dtype='int16', always_2d=True)
+
+    mono = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0].astype(np.float64)
+    if file_rate != sample_rate:
+        num_samples = int(round(len(mono) * sample_rate / file_rate))
+        mono = np.interp(np.arange(num_samples) * file_rate / sample_rate, np.arange(len(mono)), mono)
+    return np.clip(np.round(mono), -32768, 32767).astype(np.int16)
+
+
+class FileAudioSource(AudioSource):
+    """
+    Replays audio files through the listener instead of a microphone.
+
+    Each file is followed by `gap_seconds` of silence, so the VAD ends one recording before
+    the next file begins. In real-time mode frames are paced like a microphone and dropped
+    if the listener falls behind; otherwise they are delivered as fast as the listener
+    consumes them and none are ever dropped. Since the listener records much faster than
+    Whisper transcribes, a fast replay also waits while `hold()` returns True, so the
+    consumer can keep the ring buffer from overwriting audio that is still needed.
+
+    `file_starts` holds the absolute sample index at which each file begins, counted in
+    delivered frames, so it lines up with the listener's ring buffer indices.
+    """
+
+    def __init__(self, paths: list, sample_rate: int, frame_length: int, queue_frames: int,
+                 realtime: bool = False, gap_seconds: float = 1.0, hold=None):
+        super().__init__(sample_rate, frame_length, queue_frames)
+        self.paths = find_audio_files(paths)
+        self.realtime = realtime
+        self.hold = hold
+        self.gap = np.zeros(int(gap_seconds * sample_rate), dtype=np.int16)
+        self.file_starts: list[tuple[int, Path]] = []
+        self._samples_delivered = 0
+        self._stop_event = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set() and len(self.frames) == 0
+
+    def _produce(self):
+        frame_duration = self.frame_length / self.sample_rate
+        next_deadline = time.perf_counter()
+        try:
+            for path in self.paths:
+                audio = np.concatenate([read_audio_file(path, self.sample_rate), self.gap])
+                self.file_starts.append((self._samples_delivered, path))
+                # Pad the last frame with silence instead of dropping the tail of the file.
+                audio = np.pad(audio, (0, -len(audio) % self.frame_length))
+                for frame in audio.reshape(-1, self.frame_length):
+                    if self._stop_event.is_set():
+                        return
+                    if self.realtime:
+                        next_deadline += frame_duration
+                        time.sleep(max(0.0, next_deadline - time.perf_counter()))
+                        if not self.frames.put(frame):
+                            continue
+                    else:
+                        while len(self.frames) >= self.frames.num_slots or (self.hold and self.hold()):
+                            if self._stop_event.wait(0.001):
+                                return
+                        self.frames.put(frame)
+                    self._samples_delivered += self.frame_length
+        except Exception as e:
+            print(f"[FileAudioSource] ERROR: Replay stopped: {e}")
+        finally:
+            self._done.set()
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+
+
+class FrameQueue:
+    """
+    A bounded single-producer/single-consumer queue of fixed-size int16 frames.
+
+    Frames are copied into preallocated slots. The producer (the audio callback) only
+    advances `_tail` and the consumer only advances `_head`, so neither side takes a lock
+    on the hot path; an Event is used purely to wake up a waiting consumer. When the
+    consumer falls behind and every slot is full, new frames are dropped and counted
+    instead of blocking the audio callback.
+    """
+
+    def __init__(self, num_slots: int, frame_length: int):
+        if num_slots <= 0:
+            raise ValueError(f"FrameQueue needs at least one slot, got {num_slots}.")
+        self.num_slots = num_slots
+        self.frame_length = frame_length
+        self._slots = np.zeros((num_slots, frame_length), dtype=np.int16)
+        self._head = 0
+        self._tail = 0
+        self._holding = False
+        self._not_empty = threading.Event()
+        self.dropped_frames = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def put(self, frame: np.ndarray) -> bool:
+        """
+        Copies a frame into the next free slot. Never blocks.
+
+        :return: False if the queue was full and the frame was dropped.
+        """
+        if self._tail - self._head >= self.num_slots:
+            self.dropped_frames += 1
+            return False
+        self._slots[self._tail % self.num_slots] = frame.reshape(-1)
+        self._tail += 1
+        self._not_empty.set()
+        return True
+
+    def get(self, timeout: float = None):
+        """
+        Waits for the next frame and returns a view of its slot.
+
+        The view stays valid until the next call to `get()`, which is when the slot is
+        handed back to the producer.
+
+        :return: The frame, or None if nothing arrived within `timeout` seconds.
+        """
+        if self._holding:
+            self._head += 1
+            self._holding = False
+
+        while self._tail == self._head:
+            self._not_empty.clear()
+            # Re-check after clearing so a frame put in between is not missed.
+            if self._tail != self._head:
+                break
+            if not self._not_empty.wait(timeout):
+                return None
+
+        self._holding = True
+        return self._slots[self._head % self.num_slots]
@@ -0,0 +1,147 @@
+import numpy as np
+
+from .ring_buffer import AudioRingBuffer
+from .vad import VADEngine
+
+
+class CommandRecorder:
+    """
+    Records a single spoken command out of an AudioRingBuffer.
+
+    The recorder never copies audio: it remembers where the command started in the ring
+    buffer, runs the VAD engine on views of the new frames, and finally hands out the
+    whole utterance as one float32 view that can be passed straight to Whisper. The speech
+    segments found along the way are kept so the STT stage does not need its own VAD pass.
+    """
+
+    def __init__(self, ring: AudioRingBuffer, frame_length: int, vad: VADEngine,
+                 silence_frames_after_speech: int, no_speech_timeout_frames: int,
+                 max_recording_frames: int, on_speech_start=None):
+        if (max_recording_frames + 1) * frame_length > ring.capacity:
+            raise ValueError("The capture buffer is too small to hold the longest possible recording.")
+        self.ring = ring
+        self.frame_length = frame_length
+        self.vad = vad
+        self.silence_frames_after_speech = silence_frames_after_speech
+        self.no_speech_timeout_frames = no_speech_timeout_frames
+        self.max_recording_frames = max_recording_frames
+        self.on_speech_start = on_speech_start
+
+        self.start_index = 0
+        self.num_frames = 0
+        self.has_started_speaking = False
+        self.consecutive_silent_frames = 0
+        self._segments = []
+        self._segment_start = None
+        self.last_speech_end = 0
+        self._early_end = None
+        self.ended_early = False
+
+    def start(self, preroll_frames: int = 0):
+        """
+        Begins a new recording at the current write position of the ring buffer.
+
+        :param preroll_frames: Number of already-buffered frames to seed the recording with,
+            so speech that began before the wake word was recognized is not clipped.
+        """
+        preroll_frames = min(preroll_frames, self.ring.total_written // self.frame_length)
+        self.start_index = self.ring.total_written - preroll_frames * self.frame_length
+        self.num_frames = 0
+        self.has_started_speaking = False
+        self.consecutive_silent_frames = 0
+        self._segments = []
+        self._segment_start = None
+        self.last_speech_end = 0
+        self._early_end = None
+        self.ended_early = False
+        self.vad.reset()
+
+        # Pre-roll frames only feed the speech segments. They usually hold the tail of the
+        # wake word itself, so they must not start the end-of-speech countdown.
+        if preroll_frames:
+            self._detect(self.start_index, preroll_frames)
+
+    def _detect(self, start: int, num_frames: int = 1) -> bool:
+        """
+        Runs the VAD on `num_frames` consecutive frames in one call, so vectorized engines
+        classify a whole batch at once, and keeps the speech segments up to date.
+
+        :return: True if the last frame contains speech.
+        """
+        end = start + num_frames * self.frame_length
+        is_speech = False
+        for i, is_speech in enumerate(self.vad.detect(self.ring.samples(start, end), self.frame_length)):
+            frame_start = start + i * self.frame_length
+            if is_speech:
+                self.last_speech_end = frame_start + self.frame_length
+                if self._segment_start is None:
+                    self._segment_start = frame_start
+            elif self._segment_start is not None:
+                self._segments.append((self._segment_start, frame_start))
+                self._segment_start = None
+        return bool(is_speech)
+
+    def process_frame(self, frame_start: int) -> bool:
+        """
+        Updates the voice-detection state with the frame written at `frame_start`.
+
+        :return: True once the recording is finished.
+        """
+        self.num_frames += 1
+
+        if self._detect(frame_start):
+            if not self.has_started_speaking:
+                self.has_started_speaking = True
+                if self.on_speech_start:
+                    self.on_speech_start()
+            self.consecutive_silent_frames = 0
+        elif self.has_started_speaking:
+            self.consecutive_silent_frames += 1
+
+        if self.has_started_speaking and self.consecutive_silent_frames > self.silence_frames_after_speech:
+            return True
+        if self._early_end and self.has_started_speaking:
+            complete_speech_end, silence_frames = self._early_end
+            # Only valid if nothing has been said since the complete transcript was heard.
+            if self.last_speech_end <= complete_speech_end and self.consecutive_silent_frames > silence_frames:
+                self.ended_early = True
+                return True
+        if not self.has_started_speaking and self.num_frames > self.no_speech_timeout_frames:
+            return True
+        return self.num_frames > self.max_recording_frames
+
+    def mark_complete(self, speech_end: int, silence_frames: int):
+        """
+        Lets the recording end after only `silence_frames` of silence, because the speech
+        up to absolute index `speech_end` already forms a complete command. Ignored as soon
+        as more speech follows. May be called from another thread.
+        """
+        self._early_end = (speech_end, silence_frames)
+
+    @property
+    def saved_frames(self) -> int:
+        """Silence frames the recording did not have to wait for because it ended early."""
+        if not self.ended_early:
+            return 0
+        return self.silence_frames_after_speech + 1 - self.consecutive_silent_frames
+
+    def utterance(self) -> np.ndarray:
+        """Returns a zero-copy float32 view of everything recorded since `start()`."""
+        return self.ring.samples(self.start_index)
+
+    def speech_segments(self) -> list[tuple[int, int]]:
+        """
+        Returns the detected speech as (start, end) sample offsets relative to the start
+        of the utterance. A segment still open at the end of the recording is closed there.
+        Empty when nothing was said after the wake word.
+        """
+        if not self.has_started_speaking:
+            # Speech found only in the pre-roll is the wake word, not a command.
+            return []
+        # May be called from the streaming transcriber's thread while the listener records,
+        # so read the open segment once instead of checking and using it separately.
+        segments = list(self._segments)
+        open_segment_start = self._segment_start
+        if open_segment_start is not None:
+            segments.append((open_segment_start, self.ring.total_written))
+        return [(start - self.start_index, end - self.start_index) for start, end in segments]
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Scale factor that maps int16 PCM onto the [-1.0, 1.0) float range Whisper expects.
+INT16_TO_FLOAT32 = np.float32(1.0 / 32768.0)
+
+
+def frame_rms(samples: np.ndarray) -> float:
+    """Root-mean-square energy of a float32 view, computed without temporary arrays."""
+    if samples.shape[0] == 0:
+        return 0.0
+    return float(np.sqrt(np.dot(samples, samples) / samples.shape[0]))
+
+
+class AudioRingBuffer:
+    """
+    A preallocated ring buffer that stores the microphone stream both as int16 PCM
+    (for Porcupine) and as normalized float32 samples (for VAD and Whisper).
+
+    Every sample is written twice, at `i` and at `i + capacity`. Because of this mirror,
+    any window of up to `capacity` recent samples is one contiguous slice, so frames and
+    whole utterances can be handed out as zero-copy views even when they wrap around.
+
+    Positions are absolute sample indices counted from the first write. A view stays
+    valid until `capacity` further samples have been written.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be positive, got {capacity}.")
+        self.capacity = capacity
+        self._pcm = np.zeros(2 * capacity, dtype=np.int16)
+        self._samples = np.zeros(2 * capacity, dtype=np.float32)
+        self.total_written = 0
+
+    def write(self, frame: np.ndarray) -> int:
+        """
+        Copies one frame of int16 PCM into the buffer in place.
+
+        :param frame: int16 samples, either flat or shaped (n, 1) as sounddevice returns them.
+        :return: The absolute index of the first sample of the frame.
+        """
+        frame = frame.reshape(-1)
+        n = frame.shape[0]
+        if n > self.capacity:
+            raise ValueError(f"Frame of {n} samples does not fit in a buffer of {self.capacity}.")
+
+        start = self.total_written
+        pos = start % self.capacity
+        first = min(n, self.capacity - pos)
+        self._store(pos, frame[:first])
+        if first < n:
+            self._store(0, frame[first:])
+        self.total_written = start + n
+        return start
+
+    def _store(self, pos: int, chunk: np.ndarray):
+        end = pos + chunk.shape[0]
+        mirror_pos, mirror_end = pos + self.capacity, end + self.capacity
+        self._pcm[pos:end] = chunk
+        self._pcm[mirror_pos:mirror_end] = chunk
+        np.multiply(chunk, INT16_TO_FLOAT32, out=self._samples[pos:end], casting='same_kind')
+        self._samples[mirror_pos:mirror_end] = self._samples[pos:end]
+
+    def contains(self, start: int) -> bool:
+        """Returns True while the sample at absolute index `start` has not been overwritten."""
+        return max(self.total_written - self.capacity, 0) <= start <= self.total_written
+
+    def _offset(self, start: int, end: int) -> int:
+        """Validates an absolute [start, end) window and returns its physical offset."""
+        oldest = self.total_written - self.capacity
+        if not (max(oldest, 0) <= start <= end <= self.total_written):
+            raise ValueError(
+                f"Window [{start}, {end}) is outside the buffered range "
+                f"[{max(oldest, 0)}, {self.total_written})."
+            )
+        return start % self.capacity
+
+    def samples(self, start: int, end: int = None) -> np.ndarray:
+        """Returns a zero-copy float32 view of the samples in [start, end)."""
+        end = self.total_written if end is None else end
+        offset = self._offset(start, end)
+        return self._samples[offset:offset + (end - start)]
+
+    def pcm(self, start: int, end: int = None) -> np.ndarray:
+        """Returns a zero-copy int16 view of the samples in [start, end)."""
+        end = self.total_written if end is None else end
+        offset = self._offset(start, end)
+        return self._pcm[offset:offset + (end - start)]
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+
+from .frame_queue import FrameQueue
+
+
+class AudioSource(ABC):
+    """
+    Abstract base class for everything that feeds int16 frames to the listener.
+
+    A source owns a FrameQueue that its producer fills with frames of exactly
+    `frame_length` samples; the listener consumes them with `frames.get()`.
+    """
+
+    def __init__(self, sample_rate: int, frame_length: int, queue_frames: int):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.frames = FrameQueue(queue_frames, frame_length)
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+    @property
+    def finished(self) -> bool:
+        """True once the source will never produce another frame. A microphone never finishes."""
+        return False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def stats(self) -> dict:
+        """Returns the capture health counters."""
+        return {
+            "queued_frames": len(self.frames),
+            "dropped_frames": self.frames.dropped_frames,
+        }
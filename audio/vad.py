@@ -0,0 +1,174 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+
+from .ring_buffer import frame_rms
+
+
+def frame_energies(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Computes the RMS of every whole frame in `samples` in a single vectorized pass."""
+    num_frames = samples.shape[0] // frame_length
+    frames = samples[:num_frames * frame_length].reshape(num_frames, frame_length)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_length)
+
+
+def speech_span(segments: list[tuple[int, int]], length: int, pad: int):
+    """
+    Collapses speech segments into the single [start, end) range Whisper should see,
+    padded on both sides and clamped to the utterance.
+
+    :return: The (start, end) range, or None if no speech was detected.
+    """
+    if not segments:
+        return None
+    return max(segments[0][0] - pad, 0), min(segments[-1][1] + pad, length)
+
+
+class VADEngine(ABC):
+    """Abstract base class for streaming voice activity detectors."""
+
+    @abstractmethod
+    def is_speech(self, samples: np.ndarray) -> bool:
+        """
+        Classifies one frame of float32 audio.
+        :param samples: A float32 view of exactly one frame.
+        :return: True if the frame contains speech.
+        """
+        pass
+
+    def detect(self, samples: np.ndarray, frame_length: int) -> np.ndarray:
+        """Classifies every whole frame of a longer buffer. Backends may vectorize this."""
+        num_frames = samples.shape[0] // frame_length
+        return np.array([
+            self.is_speech(samples[i * frame_length:(i + 1) * frame_length]) for i in range(num_frames)
+        ], dtype=bool)
+
+    def reset(self):
+        """Clears per-utterance state. Called when a new command recording starts."""
+        pass
+
+
+class RMSVAD(VADEngine):
+    """Fixed-threshold energy detector. The cheapest backend and the historical default."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        return frame_rms(samples) > self.threshold
+
+    def detect(self, samples: np.ndarray, frame_length: int) -> np.ndarray:
+        return frame_energies(samples, frame_length) > self.threshold
+
+
+class AdaptiveVAD(VADEngine):
+    """
+    Energy detector whose threshold follows the background noise.
+
+    The noise floor is an exponential moving average of frame energy, and a frame counts as
+    speech when it is `ratio` times louder than that floor. Speech frames still nudge the
+    floor upward at a tenth of the rate, so a room that suddenly gets louder (a fan turning
+    on) is eventually learned instead of being treated as endless speech. The floor is kept
+    across commands, since the room does not change between them.
+    """
+
+    SPEECH_ADAPTATION_FACTOR = 0.1
+
+    def __init__(self, min_threshold: float, ratio: float, adaptation_rate: float):
+        self.min_threshold = min_threshold
+        self.ratio = ratio
+        self.adaptation_rate = adaptation_rate
+        self.noise_floor = min_threshold / ratio
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_threshold, self.noise_floor * self.ratio)
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        rms = frame_rms(samples)
+        is_speech = rms > self.threshold
+        rate = self.adaptation_rate * (self.SPEECH_ADAPTATION_FACTOR if is_speech else 1.0)
+        self.noise_floor += rate * (rms - self.noise_floor)
+        return is_speech
+
+
+class SileroVAD(VADEngine):
+    """
+    Neural detector running the Silero VAD ONNX model through onnxruntime.
+
+    By default it uses the Silero model bundled with faster-whisper, so the same network
+    that `vad_filter=True` would run inside Whisper runs here once, on the live stream.
+    The model expects 512-sample frames at 16 kHz, which is Porcupine's frame size.
+    """
+
+    CONTEXT_SAMPLES = 64
+
+    def __init__(self, threshold: float, sample_rate: int, model_path: Path = None):
+        import onnxruntime
+
+        if model_path is None:
+            from faster_whisper.utils import get_assets_path
+            model_path = Path(get_assets_path()) / "silero_vad_v6.onnx"
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Silero VAD model not found at: {model_path}")
+
+        print(f"Loading Silero VAD model from '{model_path}'...")
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"], sess_options=opts
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.threshold = threshold
+        self.sample_rate = np.array(sample_rate, dtype=np.int64)
+        self._input = None
+        self.reset()
+
+    def reset(self):
+        self._context = np.zeros(self.CONTEXT_SAMPLES, dtype=np.float32)
+        # Depending on the export, the LSTM state is one 'state' tensor or separate 'h' and 'c'.
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._h = np.zeros((1, 1, 128), dtype=np.float32)
+        self._c = np.zeros((1, 1, 128), dtype=np.float32)
+
+    def speech_probability(self, samples: np.ndarray) -> float:
+        frame_length = samples.shape[0]
+        if self._input is None or self._input.shape[1] != self.CONTEXT_SAMPLES + frame_length:
+            self._input = np.zeros((1, self.CONTEXT_SAMPLES + frame_length), dtype=np.float32)
+        self._input[0, :self.CONTEXT_SAMPLES] = self._context
+        self._input[0, self.CONTEXT_SAMPLES:] = samples
+        self._context[:] = samples[-self.CONTEXT_SAMPLES:]
+
+        if 'state' in self.input_names:
+            output, self._state = self.session.run(
+                None, {'input': self._input, 'state': self._state, 'sr': self.sample_rate}
+            )
+        else:
+            output, self._h, self._c = self.session.run(
+                None, {'input': self._input, 'h': self._h, 'c': self._c}
+            )
+        return float(np.ravel(output)[0])
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        return self.speech_probability(samples) >= self.threshold
+
+
+def create_vad_engine(vad_settings: dict, sample_rate: int, project_root: Path) -> VADEngine:
+    """Builds the VAD backend selected by the `vad.engine` setting."""
+    engine = vad_settings.get('engine', 'rms')
+    if engine == 'rms':
+        return RMSVAD(threshold=vad_settings['threshold'])
+    if engine == 'adaptive':
+        adaptive = vad_settings['adaptive']
+        return AdaptiveVAD(
+            min_threshold=adaptive['min_threshold'],
+            ratio=adaptive['ratio'],
+            adaptation_rate=adaptive['adaptation_rate']
+        )
+    if engine == 'silero':
+        silero = vad_settings['silero']
+        model_path = project_root / silero['model_path'] if silero.get('model_path') else None
+        return SileroVAD(threshold=silero['threshold'], sample_rate=sample_rate, model_path=model_path)
+    raise ValueError(f"Unknown VAD engine '{engine}'. Expected 'rms', 'adaptive' or 'silero'.")
@@ -0,0 +1,19 @@
+import re
+
+
+class WakePhraseTrimmer:
+    """
+    Removes the wake phrase from the front of a transcript.
+
+    When a recording is seeded with pre-roll audio, Whisper often hears the end of the
+    wake word too ("... Loki, open Chrome"). Any trailing part of the phrase is accepted,
+    since the pre-roll may only contain its last word.
+    """
+
+    def __init__(self, phrase: str):
+        words = [re.escape(word) for word in phrase.split()]
+        suffixes = [r'\W+'.join(words[i:]) for i in range(len(words))]
+        self.pattern = re.compile(r'^\W*(?:' + '|'.join(suffixes) + r')\b\W*', re.IGNORECASE)
+
+    def trim(self, transcript: str) -> str:
+        return self.pattern.sub('', transcript, count=1)
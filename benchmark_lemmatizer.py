@@ -0,0 +1,84 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from evaluate_routing import load_labelled
+from intent import FastClassifier, LookupNormalizer, SpacyNormalizer
+from intent.normalizer import create_normalizer
+from nlp_service import Utterance
+
+
+def time_per_call(normalizer, texts: list[str], repeat: int) -> np.ndarray:
+    """Seconds per call, lemmatizing one fresh (unparsed) utterance at a time, as classify() does."""
+    durations = []
+    for _ in range(repeat):
+        for text in texts:
+            utterance = Utterance(text)
+            started = time.perf_counter()
+            normalizer.normalize([utterance])
+            durations.append(time.perf_counter() - started)
+    return np.array(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the 'lookup' lemmatizer with the full spaCy pipeline: latency per call, "
+                    "and how often the lemmas and the FastClassifier's results agree.")
+    parser.add_argument("texts", type=Path, nargs="?",
+                        help="JSON list (or .jsonl) of {\"text\": ...} objects (default: the training data). "
+                             "Transcripts of real commands show the out-of-vocabulary rate best.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing passes over the texts.")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).parent
+    fast_classifier_settings = settings['intent']['fast_classifier']
+    texts_path = args.texts or project_root / settings['intent']['training_data_path']
+    texts = [example['text'] for example in load_labelled(texts_path) if example['text']]
+
+    lookup = create_normalizer("lookup", project_root / fast_classifier_settings['lemma_table_path'])
+    if not isinstance(lookup, LookupNormalizer):
+        raise SystemExit("No usable lemma table; run build_lemma_table.py first.")
+    spacy_normalizer = SpacyNormalizer()
+    spacy_normalizer.normalize([Utterance("open chrome")])  # Warm up both before timing
+    lookup.normalize([Utterance("open chrome")])
+
+    print(f"\n{len(texts)} texts, {args.repeat} passes")
+    print(f"{'lemmatizer':<12}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}")
+    for name, normalizer in (("spacy", spacy_normalizer), ("lookup", lookup)):
+        durations = time_per_call(normalizer, texts, args.repeat) * 1e6
+        print(f"{name:<12}{durations.mean():>10.1f}{np.quantile(durations, 0.5):>10.1f}"
+              f"{np.quantile(durations, 0.95):>10.1f}")
+    print(f"lookup: {lookup.stats()}")
+
+    spacy_lemmas = spacy_normalizer.normalize([Utterance(text) for text in texts])
+    lookup_lemmas = lookup.normalize([Utterance(text) for text in texts])
+    differences = [(text, a, b) for text, a, b in zip(texts, spacy_lemmas, lookup_lemmas) if a != b]
+    print(f"\nLemmas agree for {len(texts) - len(differences)}/{len(texts)} texts.")
+    for text, a, b in differences[:10]:
+        print(f"  '{text}': spacy '{a}', lookup '{b}'")
+
+    cache_dir = fast_classifier_settings['embedding_cache_dir']
+    classifier = FastClassifier(
+        intents_path=project_root / settings['intent']['training_data_path'],
+        model_name=fast_classifier_settings['model'],
+        threshold=fast_classifier_settings['threshold'],
+        embedding_cache_dir=project_root / cache_dir if cache_dir else None,
+        top_k=fast_classifier_settings['top_k'],
+        aggregation=fast_classifier_settings['aggregation'],
+        normalizer=spacy_normalizer,
+    )
+    spacy_results = classifier.classify_batch(texts)
+    classifier.normalizer = lookup
+    lookup_results = classifier.classify_batch(texts)
+    classifier.close()
+    key = lambda result: (result['type'], result.get('action'), result['route'])
+    agreeing = sum(key(a) == key(b) for a, b in zip(spacy_results, lookup_results))
+    print(f"Classifications (intent and route) agree for {agreeing}/{len(texts)} texts "
+          f"({agreeing / len(texts):.1%}).")
+
+
+if __name__ == '__main__':
+    main()
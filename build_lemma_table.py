@@ -0,0 +1,77 @@
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from spacy.util import load_language_data
+
+from config import settings
+from intent.normalizer import spacy_model_id
+from nlp_service import get_nlp
+
+
+def spelling_variants(text: str) -> list[str]:
+    """The text as written and as Whisper tends to write it: capitalized, with a full stop."""
+    return [text, text[:1].upper() + text[1:] + "."]
+
+
+def vocabulary_lemmas(texts: list[str]) -> tuple[dict[str, str], set[str]]:
+    """
+    Parses every text with the full spaCy pipeline and records the lemma of each word.
+
+    :return: (word -> lemma for words that always got the same lemma, words whose lemma
+        depended on the context and so are left to the tagger)
+    """
+    seen = defaultdict(set)
+    nlp = get_nlp()
+    variants = [variant for text in texts for variant in spelling_variants(text)]
+    for doc in nlp.pipe(variants, batch_size=256):
+        for token in doc:
+            seen[token.lower_].add(token.lemma_.lower())
+    table = {word: lemmas.pop() for word, lemmas in seen.items() if len(lemmas) == 1}
+    return table, {word for word, lemmas in seen.items() if len(lemmas) > 1}
+
+
+def spacy_lookup_lemmas() -> dict[str, str]:
+    """spaCy's context-free English lemma table (needs the optional spacy-lookups-data package)."""
+    try:
+        import spacy_lookups_data
+    except ImportError:
+        print("spaCy's lemma lookup table is not available; install spacy-lookups-data to add it.")
+        return {}
+    lookup = load_language_data(spacy_lookups_data.get_file("en_lemma_lookup.json"))
+    return {word: lemma.lower() for word, lemma in lookup.items() if word == word.lower() and " " not in word}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the lemma lookup table of the FastClassifier's 'lookup' lemmatizer from the "
+                    "training data's vocabulary and, if installed, spaCy's lemma lookup table.")
+    parser.add_argument("--output", type=Path, help="Where to write the table (default: from config.yaml).")
+    parser.add_argument("--no-spacy-lookups", action="store_true",
+                        help="Only use the training vocabulary; other words are always lemmatized by spaCy.")
+    args = parser.parse_args()
+
+    project_root = Path(__file__).parent
+    fast_classifier_settings = settings['intent']['fast_classifier']
+    output_path = args.output or project_root / fast_classifier_settings['lemma_table_path']
+    with open(project_root / settings['intent']['training_data_path'], 'r') as f:
+        texts = [example["text"] for example in json.load(f)]
+
+    table, ambiguous = vocabulary_lemmas(texts)
+    print(f"Training vocabulary: {len(table)} words, {len(ambiguous)} left to the tagger: {sorted(ambiguous)}")
+    if not args.no_spacy_lookups:
+        # The tagger's lemmas of the training vocabulary take precedence over spaCy's context-free ones.
+        added = {word: lemma for word, lemma in spacy_lookup_lemmas().items()
+                 if word not in table and word not in ambiguous}
+        table.update(added)
+        print(f"Added {len(added)} words from spaCy's lemma lookup table.")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"spacy_model": spacy_model_id(get_nlp()), "entries": dict(sorted(table.items()))}, f)
+    print(f"Lemma table with {len(table)} words saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
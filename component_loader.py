@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ComponentLoader:
+    """
+    Loads independent components on a thread pool and hands them out when they are ready.
+
+    Each component is registered with a factory and, optionally, the names of components
+    it depends on; it starts loading as soon as those are done. Callers block only on the
+    component they actually need, so the assistant can start listening for the wake word
+    while Whisper or the sentence-embedding model are still loading.
+    """
+
+    def __init__(self, max_workers: int, on_loaded=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loader")
+        self._futures: dict[str, Future] = {}
+        self.on_loaded = on_loaded
+        self.load_times: dict[str, float] = {}
+        self.warmup_times: dict[str, float] = {}
+
+    def submit(self, name: str, factory, depends_on: tuple = (), warmup=None):
+        """
+        Schedules `factory()` to build the component `name`.
+        :param depends_on: Names of previously submitted components that must load first.
+        :param warmup: Optional `warmup(component)` run before the component is handed out,
+            so one-time initialization cost is not paid by the first real request.
+        """
+        future = Future()
+        self._futures[name] = future
+        dependencies = [self._futures[dependency] for dependency in depends_on]
+        if not dependencies:
+            self._executor.submit(self._load, name, factory, warmup, future, dependencies)
+            return
+
+        remaining = [len(dependencies)]
+        lock = threading.Lock()
+
+        def dependency_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            self._executor.submit(self._load, name, factory, warmup, future, dependencies)
+
+        for dependency in dependencies:
+            dependency.add_done_callback(dependency_done)
+
+    def _load(self, name: str, factory, warmup, future: Future, dependencies: list[Future]):
+        if any(dependency.exception() for dependency in dependencies):
+            future.set_exception(RuntimeError(f"'{name}' was not loaded because a dependency failed."))
+            return
+
+        start = time.perf_counter()
+        try:
+            component = factory()
+        except Exception as e:
+            print(f"[ComponentLoader] ERROR: Failed to load '{name}': {e}")
+            future.set_exception(e)
+            return
+
+        self.load_times[name] = time.perf_counter() - start
+        message = f"[ComponentLoader] Loaded '{name}' in {self.load_times[name]:.2f}s"
+
+        if warmup:
+            start = time.perf_counter()
+            try:
+                warmup(component)
+            except Exception as e:
+                # A cold component still works; it is just slower the first time.
+                print(f"[ComponentLoader] WARNING: Warm-up of '{name}' failed: {e}")
+            else:
+                self.warmup_times[name] = time.perf_counter() - start
+                message += f" (warm-up {self.warmup_times[name]:.2f}s)"
+
+        print(message)
+        future.set_result(component)
+        if self.on_loaded:
+            self.on_loaded(name, self.load_times[name])
+
+    def get(self, name: str, timeout: float = None):
+        """Returns the component, waiting for it to load if needed. Re-raises load errors."""
+        return self._futures[name].result(timeout)
+
+    def is_ready(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def peek(self, name: str):
+        """Returns the component if it has loaded, or None without waiting."""
+        return self._futures[name].result() if self.is_ready(name) else None
+
+    def failed(self) -> list[str]:
+        """Names of the components whose loading has finished with an error."""
+        return sorted(name for name, future in self._futures.items()
+                      if future.done() and future.exception() is not None)
+
+    def when_all_loaded(self, callback):
+        """Calls `callback()` on a pool thread once every submitted component has finished loading."""
+        futures = list(self._futures.values())
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def component_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            self._executor.submit(callback)
+
+        for future in futures:
+            future.add_done_callback(component_done)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
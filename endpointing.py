@@ -0,0 +1,51 @@
+from speculative_nlu import SpeculativeNLU
+
+
+class Endpointer:
+    """
+    Decides whether a partial transcript is already a complete command.
+
+    A transcript is complete when the FastClassifier maps it to an intent with high
+    confidence, the intent's action is allowed to end early, and the NER model finds
+    every entity that action needs ("open" alone is not complete, "open chrome" is).
+    A complete command only needs a short pause to end the recording; everything else
+    still waits for the regular VAD silence timeout.
+
+    Classification goes through SpeculativeNLU, so the work done here is cached and
+    reused if the partial transcript turns out to be the final one.
+    """
+
+    def __init__(self, nlu: SpeculativeNLU, confidence: float, required_entities: dict[str, list[str]]):
+        self.nlu = nlu
+        self.confidence = confidence
+        self.required_entities = required_entities
+
+        self.utterances = 0
+        self.early_endings = 0
+        self.total_saved_seconds = 0.0
+
+    def is_complete(self, transcript: str) -> bool:
+        intent, entities = self.nlu.speculate(transcript)
+        if intent['type'] == 'unknown' or intent['confidence'] < self.confidence:
+            return False
+
+        required = self.required_entities.get(intent['action'])
+        if required is None:
+            return False  # Actions that are not listed never end early
+        return all(entity in entities for entity in required)
+
+    def record(self, saved_seconds: float):
+        """Records the latency saved on one utterance (0 if it did not end early)."""
+        self.utterances += 1
+        if saved_seconds > 0:
+            self.early_endings += 1
+            self.total_saved_seconds += saved_seconds
+        print(f"[Endpointer] Saved {saved_seconds:.2f}s on this utterance "
+              f"({self.early_endings}/{self.utterances} ended early, {self.total_saved_seconds:.2f}s saved in total).")
+
+    def stats(self) -> dict:
+        return {
+            "utterances": self.utterances,
+            "early_endings": self.early_endings,
+            "total_saved_seconds": self.total_saved_seconds,
+        }
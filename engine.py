@@ -0,0 +1,35 @@
+import threading
+from pathlib import Path
+
+from config import settings
+from engine_link import EngineServer, engine_address
+from event_bus import EventBus
+from loki_worker import LokiWorker
+
+
+def main():
+    """
+    Runs LOKI as a resident engine: one long-lived process that owns the wake word,
+    Whisper, the classifiers, NER and Piper. `gui.py` and `main.py` attach to it over a
+    local socket, so restarting a front-end no longer reloads any model.
+
+    Stop the engine with Ctrl+C.
+    """
+    bus = EventBus()
+    stop_event = threading.Event()
+    server = EngineServer(bus, engine_address(settings['engine'], Path(__file__).parent))
+    server.start()
+
+    print("--- LOKI engine starting; front-ends can attach now ---")
+    worker = LokiWorker(bus, stop_event)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        print("\n🛑 SIGINT received. Shutting down the LOKI engine...")
+    finally:
+        server.close()
+        print("--- LOKI engine stopped ---")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import os
+import socket
+import threading
+from pathlib import Path
+
+from event_bus import (Channel, Error, EventBus, StateChanged, Status, TextInput, decode_message,
+                       encode_message)
+
+# Commands a front-end may send; everything else it sends is ignored.
+COMMAND_TYPES = (TextInput,)
+
+
+def engine_address(engine_settings: dict, project_root: Path):
+    """
+    Where the engine listens: a Unix socket path (str) where the platform supports one,
+    otherwise a (host, port) tuple on the loopback interface.
+    """
+    if hasattr(socket, 'AF_UNIX') and engine_settings['socket_path']:
+        return str(project_root / engine_settings['socket_path'])
+    return "127.0.0.1", engine_settings['port']
+
+
+def _family(address) -> int:
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+class EngineServer:
+    """
+    Serves the events of a resident LokiWorker to any number of front-ends and passes
+    their commands back to it, as newline-delimited JSON over a local socket.
+
+    Front-ends attach and detach at will; the engine and its models keep running.
+    A front-end that attaches first receives the current state and status, so it can
+    draw itself without waiting for the next event.
+    """
+
+    def __init__(self, bus: EventBus, address, send_timeout: float = 1.0):
+        self.bus = bus
+        self.address = address
+        self.send_timeout = send_timeout
+        self._listener = None
+        self._clients = {}  # socket -> lock serializing writes to it
+        self._clients_lock = threading.Lock()
+        self._last_state = None
+        self._last_status = None
+        self._closed = threading.Event()
+        self._threads = []
+
+    def start(self):
+        address = self.address
+        is_unix_socket = isinstance(address, str)
+        if not is_unix_socket or os.path.exists(address):
+            # Refuse to steal the address of a live engine. A socket file may also be left
+            # behind by an engine that did not shut down cleanly; that one is removed.
+            # (Port 0 asks for a free port, so there is nothing to probe.)
+            probe = _connect(address, timeout=0.2) if is_unix_socket or address[1] else None
+            if probe is not None:
+                probe.close()
+                raise RuntimeError(f"A LOKI engine is already listening on {address}.")
+            if is_unix_socket:
+                os.unlink(address)
+        self._listener = socket.socket(_family(address), socket.SOCK_STREAM)
+        if not is_unix_socket:
+            if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+                # On Windows SO_REUSEADDR would let a second engine bind a port that is in use.
+                self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(address)
+        self._listener.listen()
+        if not is_unix_socket:
+            self.address = self._listener.getsockname()[:2]  # Resolves port 0
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="engine-accept", daemon=True),
+            threading.Thread(target=self._broadcast_loop, name="engine-events", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"[EngineServer] Listening on {self.address}")
+
+    @property
+    def client_count(self) -> int:
+        with self._clients_lock:
+            return len(self._clients)
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                break  # Listener closed
+            client.settimeout(self.send_timeout)
+            lock = threading.Lock()
+            # The snapshot is sent under the write lock, so no broadcast can overtake it.
+            with lock:
+                with self._clients_lock:
+                    self._clients[client] = lock
+                    snapshot = [event for event in (self._last_state, self._last_status) if event]
+                try:
+                    client.sendall(b"".join(encode_message(event) for event in snapshot))
+                except OSError:
+                    self._drop(client)
+                    continue
+            print(f"[EngineServer] Front-end attached ({self.client_count} connected).")
+            threading.Thread(target=self._read_loop, args=(client,), name="engine-client", daemon=True).start()
+
+    def _read_loop(self, client: socket.socket):
+        """Receives the commands of one front-end until it detaches."""
+        buffer = b""
+        while not self._closed.is_set():
+            try:
+                data = client.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                try:
+                    command = decode_message(line)
+                except ValueError as e:
+                    print(f"[EngineServer] WARNING: {e}")
+                    continue
+                if isinstance(command, COMMAND_TYPES):
+                    self.bus.submit(command)
+        self._drop(client)
+
+    def _broadcast_loop(self):
+        """Fans the worker's events out to every attached front-end."""
+        while not self._closed.is_set():
+            events = self.bus.events.get_batch(timeout=0.5)
+            if not events:
+                continue
+            for event in events:
+                if isinstance(event, StateChanged):
+                    self._last_state = event
+                elif isinstance(event, Status):
+                    self._last_status = event
+            # Encoded once per batch, however many front-ends are attached.
+            payload = b"".join(encode_message(event) for event in events)
+            with self._clients_lock:
+                clients = list(self._clients.items())
+            for client, lock in clients:
+                try:
+                    with lock:
+                        client.sendall(payload)
+                except OSError:
+                    # Includes timeouts: a front-end that stops reading must not stall the others.
+                    self._drop(client)
+
+    def _drop(self, client: socket.socket):
+        with self._clients_lock:
+            if self._clients.pop(client, None) is None:
+                return
+        client.close()
+        print(f"[EngineServer] Front-end detached ({self.client_count} connected).")
+
+    def close(self):
+        self._closed.set()
+        if self._listener:
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)  # Wakes up accept()
+            except OSError:
+                pass
+            self._listener.close()
+        with self._clients_lock:
+            clients, self._clients = list(self._clients), {}
+        for client in clients:
+            client.close()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class RemoteBus:
+    """
+    The front-end's end of the engine socket. It has the same `events` channel and
+    `submit()` as an in-process EventBus, so front-ends work the same either way.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.events = Channel()
+        self._sock = sock
+        self._send_lock = threading.Lock()
+        self._closing = False
+        self._reader = threading.Thread(target=self._read_loop, name="engine-link", daemon=True)
+        self._reader.start()
+
+    @property
+    def connected(self) -> bool:
+        return not self.events.closed
+
+    def _read_loop(self):
+        buffer = b""
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                try:
+                    self.events.put(decode_message(line))
+                except ValueError as e:
+                    print(f"[RemoteBus] WARNING: {e}")
+        if not self._closing:
+            self.events.put(Error("Lost the connection to the LOKI engine."))
+        self.events.close()
+
+    def submit(self, command):
+        """Sends a command to the engine."""
+        try:
+            with self._send_lock:
+                self._sock.sendall(encode_message(command))
+        except OSError as e:
+            self.events.put(Error(f"Could not reach the LOKI engine: {e}"))
+
+    def close(self):
+        """Detaches from the engine; it keeps running for the next front-end."""
+        self._closing = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._reader.join(timeout=1)
+
+
+def _connect(address, timeout: float):
+    sock = socket.socket(_family(address), socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def connect_to_engine(address, timeout: float = 0.2) -> RemoteBus:
+    """Attaches to a running engine, or returns None if none is listening at `address`."""
+    sock = _connect(address, timeout)
+    return RemoteBus(sock) if sock else None
@@ -0,0 +1,95 @@
+import argparse
+import json
+from pathlib import Path
+
+from config import settings
+from intent import FastClassifier, RoutingPolicy
+from intent.normalizer import create_normalizer
+from intent.routing import FAST, LLM, REPEAT
+
+
+def load_labelled(path: Path) -> list[dict]:
+    """Examples with their expected intent, as a JSON list like the training data or as JSON lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def evaluate(policy: RoutingPolicy, results: list[dict], labelled: list[dict]) -> dict:
+    """
+    Routes every fast-path result with `policy` and counts the outcomes. A fast-path
+    answer is correct when its intent is the labelled one; answers for examples labelled
+    "unknown" are always wrong, since those should reach the LLM.
+    """
+    counts = {FAST: 0, LLM: 0, REPEAT: 0, "fast_correct": 0, "fast_wrong": 0}
+    for result, example in zip(results, labelled):
+        route = policy.route(result['candidates'], result['margin'])
+        counts[route] += 1
+        if route == FAST:
+            best = result['candidates'][0]
+            correct = (example['type'] != "unknown" and best['type'] == example['type'] and
+                       best['action'] == example.get('action'))
+            counts["fast_correct" if correct else "fast_wrong"] += 1
+    counts["fast_accuracy"] = counts["fast_correct"] / counts[FAST] if counts[FAST] else None
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare routing policies of the fast classifier on labelled examples: how many LLM "
+                    "calls each one avoids and how many fast-path answers it gets wrong.")
+    parser.add_argument("labelled", type=Path,
+                        help="JSON list (or .jsonl) of {\"text\", \"type\", \"action\"} examples. Use examples "
+                             "that are not in the training data, e.g. labelled transcripts of real commands.")
+    parser.add_argument("--margins", type=float, nargs="*", default=[],
+                        help="Also evaluate the configured policy with each of these margins.")
+    parser.add_argument("--report", type=Path, help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    fast_classifier_settings = settings['intent']['fast_classifier']
+    routing_settings = settings['intent']['routing']
+    project_root = Path(__file__).parent
+    cache_dir = fast_classifier_settings['embedding_cache_dir']
+    threshold = fast_classifier_settings['threshold']
+    classifier = FastClassifier(
+        intents_path=project_root / settings['intent']['training_data_path'],
+        model_name=fast_classifier_settings['model'],
+        threshold=threshold,
+        embedding_cache_dir=project_root / cache_dir if cache_dir else None,
+        top_k=fast_classifier_settings['top_k'],
+        aggregation=fast_classifier_settings['aggregation'],
+        normalizer=create_normalizer(fast_classifier_settings['lemmatizer'],
+                                     project_root / fast_classifier_settings['lemma_table_path']),
+    )
+
+    labelled = load_labelled(args.labelled)
+    results = classifier.classify_batch([example['text'] for example in labelled])
+    classifier.close()
+
+    policies = {
+        "threshold only": RoutingPolicy(threshold),
+        "configured": RoutingPolicy.from_settings(threshold, routing_settings),
+    }
+    for margin in args.margins:
+        policies[f"margin {margin:g}"] = RoutingPolicy.from_settings(threshold, {**routing_settings, 'margin': margin})
+
+    baseline = evaluate(policies["threshold only"], results, labelled)
+    report = {}
+    print(f"\n{len(labelled)} labelled examples, threshold {threshold}")
+    print(f"{'policy':<16}{'fast':>7}{'llm':>7}{'repeat':>8}{'avoided':>9}{'wrong':>7}{'accuracy':>10}")
+    for name, policy in policies.items():
+        counts = evaluate(policy, results, labelled)
+        counts["llm_calls_avoided"] = baseline[LLM] - counts[LLM]
+        report[name] = counts
+        accuracy = "-" if counts["fast_accuracy"] is None else f"{counts['fast_accuracy']:.1%}"
+        print(f"{name:<16}{counts[FAST]:>7}{counts[LLM]:>7}{counts[REPEAT]:>8}{counts['llm_calls_avoided']:>9}"
+              f"{counts['fast_wrong']:>7}{accuracy:>10}")
+
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, fields
+from enum import Enum
+
+
+class AssistantState(Enum):
+    """What LOKI is doing right now; drives the GUI's status icon."""
+    IDLE = "LISTENING_IDLE"
+    LISTENING = "LISTENING_ACTIVE"
+    PROCESSING = "PROCESSING"
+
+
+# --- Outbound events (worker -> front-end) ---
+
+@dataclass(frozen=True)
+class StateChanged:
+    state: AssistantState
+
+
+@dataclass(frozen=True)
+class Status:
+    """Free-form progress text, e.g. "Transcribing..."."""
+    text: str
+
+
+@dataclass(frozen=True)
+class ShowWindow:
+    pass
+
+
+@dataclass(frozen=True)
+class HideWindow:
+    pass
+
+
+@dataclass(frozen=True)
+class Heard:
+    """What LOKI understood the user to say (or typed)."""
+    text: str
+
+
+@dataclass(frozen=True)
+class PartialTranscript:
+    """Live hypothesis while the user is still speaking."""
+    text: str
+
+
+@dataclass(frozen=True)
+class Response:
+    text: str
+
+
+@dataclass(frozen=True)
+class Error:
+    message: str
+
+
+# --- Inbound commands (front-end -> worker) ---
+
+@dataclass(frozen=True)
+class TextInput:
+    text: str
+
+
+# Everything that can cross the engine socket (see engine_link.py), by name.
+MESSAGE_TYPES = {cls.__name__: cls for cls in (
+    StateChanged, Status, ShowWindow, HideWindow, Heard, PartialTranscript, Response, Error, TextInput
+)}
+
+
+def encode_message(message) -> bytes:
+    """Serializes an event or command as one line of JSON."""
+    record = {"type": type(message).__name__}
+    for field in fields(message):
+        value = getattr(message, field.name)
+        record[field.name] = value.name if isinstance(value, AssistantState) else value
+    return (json.dumps(record) + "\n").encode('utf-8')
+
+
+def decode_message(line: bytes):
+    """Inverse of encode_message(). Raises ValueError for anything that is not a known message."""
+    try:
+        record = json.loads(line)
+        cls = MESSAGE_TYPES[record.pop("type")]
+        return cls(**{
+            field.name: AssistantState[record[field.name]] if field.type is AssistantState else record[field.name]
+            for field in fields(cls)
+        })
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise ValueError(f"Not a LOKI message: {line[:200]!r}") from e
+
+
+class Channel:
+    """
+    A one-way, unbounded FIFO between threads.
+
+    Consumers block in `get()`/`get_batch()` instead of polling. `get_batch()` hands over
+    everything that has piled up in one go, so a burst of events costs one wake-up and
+    one lock round-trip instead of one per event.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        with self._condition:
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout: float = None):
+        """Waits for the next item. Returns None on timeout or once the channel is closed and empty."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            return self._items.popleft() if self._items else None
+
+    def get_batch(self, timeout: float = None) -> list:
+        """Waits for at least one item and returns all queued items ([] on timeout or close)."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._items or self._closed, timeout):
+                return []
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def drain(self) -> list:
+        """Returns all queued items without waiting."""
+        return self.get_batch(timeout=0)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Wakes up all waiting consumers; items already queued can still be read."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class EventBus:
+    """
+    Connects the worker and a front-end (GUI, console, replay) with two separate channels:
+    `events` carries typed events from the worker, `commands` carries requests to it.
+    Neither side ever reads its own messages.
+    """
+
+    def __init__(self):
+        self.events = Channel()
+        self.commands = Channel()
+
+    def publish(self, event):
+        """Worker side: emits an event to the front-end."""
+        self.events.put(event)
+
+    def submit(self, command):
+        """Front-end side: sends a command to the worker."""
+        self.commands.put(command)
@@ -1,11 +1,14 @@
-import queue
 import threading
+from pathlib import Path
 
 import customtkinter as ctk
 from PIL import Image
 from pystray import Icon as TrayIcon, Menu as TrayMenu, MenuItem as TrayMenuItem
 
-from loki_worker import LokiWorker
+from config import settings
+from engine_link import connect_to_engine, engine_address
+from event_bus import (AssistantState, Error, EventBus, Heard, HideWindow, PartialTranscript, Response,
+                       ShowWindow, StateChanged, Status, TextInput)
 
 # --- UI Configuration ---
 WINDOW_WIDTH = 700
@@ -56,18 +59,28 @@ class LokiApp(ctk.CTk):
         self.setup_ui()
 
         # --- Threading and Communication ---
-        self.message_queue = queue.Queue()
+        # A running LOKI engine (engine.py) already has every model loaded; attach to it.
+        engine = settings['engine']
+        self.bus = connect_to_engine(engine_address(engine, Path(__file__).parent), engine['connect_timeout_s'])
         self.stop_event = threading.Event()
-        self.loki_worker = LokiWorker(self.message_queue, self.stop_event)
-        self.loki_thread = threading.Thread(target=self.loki_worker.run, daemon=True)
+        self.loki_worker = None
+        self.loki_thread = None
+        if self.bus is None:
+            # Only imported when needed: attaching must not load the model libraries.
+            from loki_worker import LokiWorker
+            self.bus = EventBus()
+            self.loki_worker = LokiWorker(self.bus, self.stop_event)
+            # Tk owns the main thread, so the worker's asyncio loop gets a thread of its own.
+            self.loki_thread = threading.Thread(target=self.loki_worker.run, daemon=True)
 
         # --- System Tray ---
         self.tray_icon = None
         self.setup_tray_icon()
 
         # --- Finalize and Run ---
-        self.loki_thread.start()
-        self.process_queue()
+        if self.loki_thread:
+            self.loki_thread.start()
+        self.process_events()
         self.withdraw()  # Start hidden
         self.protocol("WM_DELETE_WINDOW", self.hide_window)
 
@@ -148,14 +161,12 @@ class LokiApp(ctk.CTk):
             self.pending_hide_id = None
             print("[DEBUG GUI] Cancelled pending hide operation")
 
-    def process_queue(self):
+    def process_events(self):
         if self._is_closing:
             return
         try:
-            while True:  # Process ALL messages in queue
-                message = self.message_queue.get_nowait()
-
-                if message == "SHOW_WINDOW":
+            for event in self.bus.events.drain():  # Process ALL events that arrived since the last tick
+                if isinstance(event, ShowWindow):
                     self.cancel_pending_hide()  # Cancel any pending hide
                     self.manually_opened = False  # Auto-opened by wake word
                     print(f"[DEBUG GUI] SHOW_WINDOW: manually_opened = {self.manually_opened}")
@@ -163,7 +174,7 @@ class LokiApp(ctk.CTk):
                     for widget in self.log_frame.winfo_children():
                         widget.destroy()
                     self.fade_in()
-                elif message == "HIDE_WINDOW":
+                elif isinstance(event, HideWindow):
                     print(f"[DEBUG GUI] HIDE_WINDOW received: manually_opened = {self.manually_opened}")
                     # Only auto-hide if not manually opened
                     if not self.manually_opened:
@@ -172,23 +183,23 @@ class LokiApp(ctk.CTk):
                         self.pending_hide_id = self.after(3000, self.auto_hide)
                     else:
                         print("[DEBUG GUI] Window was manually opened, skipping auto-hide")
-                elif message.startswith("STATUS:"):
-                    self.update_status(message.replace("STATUS: ", ""))
-                elif message.startswith("HEARD:"):
-                    self.add_log_entry("You", message.replace('HEARD: ', '').strip('"'), self.COLOR_USER)
-                elif message.startswith("LOKI:"):
-                    self.add_log_entry("LOKI", message.replace('LOKI: ', '').strip('"'), self.COLOR_LOKI)
-                elif message.startswith("ERROR:"):
-                    self.add_log_entry("ERROR", message.replace("ERROR: ", ""), "red")
-                elif message.startswith("TEXT_INPUT:"):
-                    # This message type is handled by loki_worker, not the GUI
-                    pass
-        except queue.Empty:
-            pass
+                elif isinstance(event, StateChanged):
+                    self.update_status(event.state.value, event.state)
+                elif isinstance(event, Status):
+                    self.update_status(event.text)
+                elif isinstance(event, Heard):
+                    self.add_log_entry("You", event.text, self.COLOR_USER)
+                elif isinstance(event, PartialTranscript):
+                    # Live transcript while the user is still speaking
+                    self.status_text_label.configure(text=event.text)
+                elif isinstance(event, Response):
+                    self.add_log_entry("LOKI", event.text, self.COLOR_LOKI)
+                elif isinstance(event, Error):
+                    self.add_log_entry("ERROR", event.message, "red")
         finally:
             # Add this check before scheduling the next call
             if not self._is_closing:
-                self.after(100, self.process_queue)
+                self.after(100, self.process_events)
 
     def auto_hide(self):
         """Actually perform the auto-hide after delay."""
@@ -201,9 +212,9 @@ class LokiApp(ctk.CTk):
             print("[DEBUG GUI] auto_hide cancelled - window was manually opened")
         self.pending_hide_id = None
 
-    def update_status(self, status_text):
-        self.is_processing = "Processing" in status_text
-        self.is_pulsing = "LISTENING_ACTIVE" in status_text
+    def update_status(self, status_text, state: AssistantState = None):
+        self.is_processing = state is AssistantState.PROCESSING
+        self.is_pulsing = state is AssistantState.LISTENING
 
         self.status_text_label.configure(text=status_text.replace("_", " ").title())
 
@@ -316,7 +327,7 @@ class LokiApp(ctk.CTk):
             self.manually_opened = True
 
         # Send text to worker for processing
-        self.message_queue.put(f"TEXT_INPUT:{text}")
+        self.bus.submit(TextInput(text))
 
     def start_move(self, event):
         # Don't start dragging if clicking on an Entry or Button widget
@@ -361,8 +372,11 @@ class LokiApp(ctk.CTk):
         if self.tray_icon:
             self.tray_icon.stop()
 
-        self.stop_event.set()
-        self.loki_thread.join(timeout=2)
+        if self.loki_thread:
+            self.stop_event.set()
+            self.loki_thread.join(timeout=2)
+        else:
+            self.bus.close()  # Detach; the engine keeps running
 
         self.destroy()  # Destroy the window last
 
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from orchestrator import PipelineOrchestrator
+
+ENDPOINTS = ("/v1/command", "/v1/classify", "/v1/entities", "/v1/reload-intents")
+MAX_BODY_BYTES = 64 * 1024
+
+
+class RequestCoalescer:
+    """
+    Shares the work of identical requests that are in flight at the same time: the
+    first one runs, the others await its result. Lives on the worker's event loop.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def run(self, key: tuple, coroutine_fn, *args):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_fn(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # One caller giving up (timeout, disconnect) must not cancel the others' result.
+        return await asyncio.shield(task)
+
+
+class CommandAPI:
+    """
+    Local HTTP/JSON API over the worker's classifiers, NER and agents, for scripts and
+    other tools:
+
+        POST /v1/command   {"text": "open chrome", "speak": false}
+        POST /v1/classify  {"text": "open chrome"}  or  {"texts": ["open chrome", ...]}
+        POST /v1/entities  {"text": "open chrome"}
+        POST /v1/reload-intents  {}
+
+    Every request is a task on the worker's event loop, so the stages run on the same
+    sized executors as voice commands, which bound the concurrency of each stage. Identical
+    requests in flight are coalesced, and requests beyond `max_in_flight` are turned away
+    with 503 instead of queueing without bound.
+    """
+
+    def __init__(self, worker, orchestrator: PipelineOrchestrator, max_in_flight: int = 64,
+                 request_timeout: float = 60.0):
+        self.worker = worker
+        self.orchestrator = orchestrator
+        self.request_timeout = request_timeout
+        self.coalescer = RequestCoalescer()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._server = None
+        self.port = None
+
+    def _route(self, path: str, payload: dict):
+        """Returns the worker coroutine and its arguments for a request, or raises ValueError."""
+        if path == "/v1/reload-intents":
+            return self.worker.api_reload_intents, ()  # Takes no body
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object.")
+        if path == "/v1/classify" and "texts" in payload:
+            texts = payload["texts"]
+            if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t.strip() for t in texts):
+                raise ValueError("Expected 'texts' to be a non-empty list of non-empty strings.")
+            return self.worker.api_classify_batch, (tuple(text.strip() for text in texts),)
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Expected a JSON object with a non-empty 'text'.")
+        text = text.strip()
+        if path == "/v1/command":
+            return self.worker.api_command, (text, bool(payload.get("speak", False)))
+        return {"/v1/classify": self.worker.api_classify, "/v1/entities": self.worker.api_entities}[path], (text,)
+
+    def handle(self, path: str, payload: dict) -> tuple[int, dict]:
+        """Runs one request on the event loop and waits for it. Called on a server thread."""
+        if path not in ENDPOINTS:
+            return 404, {"error": f"Unknown endpoint {path}."}
+        try:
+            handler, args = self._route(path, payload)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        if not self._slots.acquire(blocking=False):
+            return 503, {"error": "Too many requests in flight."}
+        try:
+            future = self.orchestrator.call(self.coalescer.run, (path, *args), handler, *args)
+            try:
+                return 200, future.result(self.request_timeout)
+            except TimeoutError as e:
+                if future.done():
+                    return 504, {"error": str(e)}  # A stage timed out
+                future.cancel()
+                return 504, {"error": f"No result within {self.request_timeout}s."}
+            except Exception as e:
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            self._slots.release()
+
+    def start(self, port: int, host: str = "127.0.0.1"):
+        """Serves the API on background threads, one per connection."""
+        api = self
+
+        class APIHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse connections
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    self._reply(413, {"error": "Request body too large."})
+                    self.close_connection = True
+                    return
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    self._reply(400, {"error": "Request body is not valid JSON."})
+                    return
+                self._reply(*api.handle(self.path.split("?")[0], payload))
+
+            def _reply(self, status: int, body: dict):
+                data = json.dumps(body, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Scripts sending many requests would flood the console
+
+        self._server = ThreadingHTTPServer((host, port), APIHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="api-http", daemon=True).start()
+        self.port = self._server.server_port
+        print(f"[CommandAPI] Serving http://{host}:{self.port}/v1/")
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
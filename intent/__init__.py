@@ -1,2 +1,7 @@
 from .fast_classifier import FastClassifier
 from .llm_classifier import LLMClassifier
+from .micro_batcher import MicroBatcher
+from .similarity_index import SimilarityIndex
+from .routing import RoutingPolicy
+from .pattern_matcher import PatternMatcher
+from .normalizer import LookupNormalizer, SpacyNormalizer
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+
+def content_hash(texts: list[str]) -> str:
+    """Identifies a list of texts, order included."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def reuse_embeddings(texts: list[str], known_texts: list[str], known_embeddings, encode) -> tuple[np.ndarray, int]:
+    """
+    Embeddings of `texts`, taking the rows of `known_embeddings` (aligned with `known_texts`)
+    where possible and encoding only the rest.
+
+    :return: (embeddings, number of texts that had to be encoded)
+    """
+    rows = {text: row for row, text in enumerate(known_texts)}
+    missing = list(dict.fromkeys(text for text in texts if text not in rows))
+    fresh = {}
+    if missing:
+        fresh_embeddings = np.asarray(encode(missing), dtype=np.float32)
+        fresh = {text: fresh_embeddings[i] for i, text in enumerate(missing)}
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32), 0
+    embeddings = np.stack([
+        fresh[text] if text in fresh else np.asarray(known_embeddings[rows[text]], dtype=np.float32) for text in texts
+    ])
+    return embeddings, len(missing)
+
+
+class EmbeddingCache:
+    """
+    Embeddings of the known intent examples, kept on disk between runs.
+
+    There is one directory per model name and revision. It holds a float32 `.npy` matrix
+    (memory-mapped on load) and the texts of its rows, both named after the content hash
+    of the texts, plus `meta.json` pointing at the current pair. An unchanged data file
+    therefore loads without running the model. After an edit, only texts that are not
+    cached yet are encoded.
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str, revision: str):
+        safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", model_name)
+        key = hashlib.sha256(f"{model_name}@{revision}".encode('utf-8')).hexdigest()[:12]
+        self.path = cache_dir / f"{safe_name}-{key}"
+        self.reused = 0
+        self.encoded = 0
+
+    def _files(self, data_hash: str) -> tuple[Path, Path]:
+        return self.path / f"embeddings-{data_hash[:16]}.npy", self.path / f"texts-{data_hash[:16]}.json"
+
+    def _load(self, data_hash: str):
+        """The cached matrix and its texts, or (None, []) if there is no usable cache."""
+        embeddings_path, texts_path = self._files(data_hash)
+        try:
+            texts = json.loads(texts_path.read_text(encoding='utf-8'))
+            embeddings = np.load(embeddings_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None, []
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(texts):
+            return None, []
+        return embeddings, texts
+
+    def _current_hash(self):
+        try:
+            return json.loads((self.path / "meta.json").read_text(encoding='utf-8'))['data_hash']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load_or_encode(self, texts: list[str], encode) -> np.ndarray:
+        """
+        Returns the embeddings of `texts`, one row per text.
+        :param encode: Called with the texts that are not cached; returns a 2-D array.
+        """
+        data_hash = content_hash(texts)
+        cached_hash = self._current_hash()
+        cached, cached_texts = self._load(cached_hash) if cached_hash else (None, [])
+        if cached is not None and cached_hash == data_hash:
+            self.reused, self.encoded = len(texts), 0
+            return cached
+
+        embeddings, self.encoded = reuse_embeddings(texts, cached_texts, cached, encode)
+        cached_set = set(cached_texts)
+        self.reused = sum(text in cached_set for text in texts)
+
+        try:
+            self._store(texts, embeddings, data_hash, previous_hash=cached_hash)
+        except OSError as e:
+            print(f"[EmbeddingCache] WARNING: Could not write the embedding cache: {e}")
+        return embeddings
+
+    def _store(self, texts: list[str], embeddings: np.ndarray, data_hash: str, previous_hash: str = None):
+        """Writes the new files first and switches meta.json last, so readers never see a mix."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        embeddings_path, texts_path = self._files(data_hash)
+        for path, write in ((embeddings_path, lambda f: np.save(f, embeddings)),
+                            (texts_path, lambda f: f.write(json.dumps(texts).encode('utf-8')))):
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        meta_path = self.path / "meta.json"
+        tmp_path = meta_path.with_name("meta.json.tmp")
+        tmp_path.write_text(json.dumps({"data_hash": data_hash, "count": len(texts)}), encoding='utf-8')
+        os.replace(tmp_path, meta_path)
+
+        if previous_hash and previous_hash[:16] != data_hash[:16]:
+            for path in self._files(previous_hash):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass  # Still mapped by another process (Windows); it is harmless
@@ -1,53 +1,196 @@
 import json
+import os
+import threading
+import time
 from pathlib import Path
-import spacy
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
+
+from nlp_service import Utterance
+
+from .embedding_cache import EmbeddingCache, reuse_embeddings
+from .micro_batcher import MicroBatcher
+from .normalizer import SpacyNormalizer
+from .routing import FAST, RoutingPolicy
+from .similarity_index import AGGREGATIONS, SimilarityIndex
+
+
+def _model_revision(model: SentenceTransformer) -> str:
+    """The Hugging Face commit the model was loaded from, so cached embeddings follow model updates."""
+    try:
+        return model[0].auto_model.config._commit_hash or "unknown"
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return "unknown"
 
 
 class FastClassifier:
-    def __init__(self, intents_path: Path, model_name: str, threshold: float):
+    def __init__(self, intents_path: Path, model_name: str, threshold: float,
+                 batch_window_ms: float = 0, max_batch_size: int = 32, embedding_cache_dir: Path = None,
+                 top_k: int = 5, aggregation: str = "max", routing_policy: RoutingPolicy = None,
+                 normalizer=None):
+        """
+        :param batch_window_ms: How long concurrent classify calls are collected into one
+            encoder batch (see MicroBatcher); 0 encodes every call on its own.
+        :param embedding_cache_dir: Where the embeddings of the known examples are kept
+            between runs (see EmbeddingCache); None encodes them on every start.
+        :param top_k: How many nearest examples are kept per transcript (see SimilarityIndex).
+        :param aggregation: How their similarities rank the intents: "max", "mean" or "vote".
+        :param routing_policy: Decides between the fast path, the LLM and asking again;
+            by default, only scores below `threshold` go to the LLM.
+        :param normalizer: Lemmatizes transcripts before they are embedded (see intent/normalizer.py);
+            by default with the full spaCy pipeline.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {AGGREGATIONS}.")
         print("Initializing FastClassifier...")
         self.SIMILARITY_THRESHOLD = threshold
+        self.top_k = top_k
+        self.aggregation = aggregation
+        self.routing_policy = routing_policy or RoutingPolicy(threshold)
         print(f"Loading SentenceTransformer model: '{model_name}'...")
         self.model = SentenceTransformer(model_name, device='cpu')
-        print("Loading spaCy model for lemmatization...")
-        self.nlp = spacy.load("en_core_web_sm", disable=["parser", "ner"])
+        self.normalizer = normalizer or SpacyNormalizer()
+        self.embedding_cache = None
+        if embedding_cache_dir:
+            self.embedding_cache = EmbeddingCache(Path(embedding_cache_dir), model_name, _model_revision(self.model))
+        self.intents_path = Path(intents_path)
+        # Replaced as a whole by reload(); readers take it once.
+        self._index = SimilarityIndex([], None)
+        self.version = 0  # Incremented by every reload, so caches of results can be dropped
+        self._reload_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._watcher = None
         self._load_and_embed_intents(intents_path)
+        self.batcher = None
+        if batch_window_ms > 0:
+            self.batcher = MicroBatcher(self._encode, window=batch_window_ms / 1000, max_batch_size=max_batch_size)
         print("FastClassifier is ready.")
 
+    @property
+    def known_intents(self) -> list[dict]:
+        return self._index.examples
+
+    @property
+    def known_embeddings(self):
+        """The normalized embeddings of the known examples, one row each."""
+        return self._index.embeddings
+
     def _load_and_embed_intents(self, intents_path: Path):
         print(f"Loading generated intent examples from '{intents_path}'...")
         with open(intents_path, 'r') as f:
             intent_examples = json.load(f)
 
-        self.known_intents = intent_examples
-        prompts_to_embed = [example["text"] for example in self.known_intents]
+        prompts_to_embed = [example["text"] for example in intent_examples]
+        known_texts = [example["text"] for example in self.known_intents]
+        encode = lambda texts: self.model.encode(texts, convert_to_numpy=True)
+
+        if self.embedding_cache:
+            embeddings = self.embedding_cache.load_or_encode(prompts_to_embed, encode)
+            encoded = self.embedding_cache.encoded
+        else:
+            # Without a cache, examples that are already loaded are still not encoded again.
+            embeddings, encoded = reuse_embeddings(prompts_to_embed, known_texts, self.known_embeddings, encode)
+        print(f"Loaded embeddings for {len(prompts_to_embed)} known example prompts ({encoded} encoded).")
+
+        # A single assignment: classify() calls in flight keep scoring against the old index.
+        self._index = SimilarityIndex(intent_examples, embeddings)
+        known, new = set(known_texts), set(prompts_to_embed)
+        return {"examples": len(prompts_to_embed), "added": len(new - known), "removed": len(known - new),
+                "encoded": encoded}
+
+    def reload(self) -> dict:
+        """
+        Re-reads the training data without a restart. Only added examples are encoded,
+        deleted ones are dropped, and the new index replaces the old one atomically.
 
-        print(f"Pre-computing embeddings for {len(prompts_to_embed)} known example prompts...")
-        self.known_embeddings = self.model.encode(prompts_to_embed, convert_to_tensor=True)
-        print("Embeddings computed successfully.")
+        :return: Counts of the examples, added, removed and encoded ones, and the seconds taken.
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            summary = self._load_and_embed_intents(self.intents_path)
+            self.version += 1
+        summary["seconds"] = time.perf_counter() - started
+        return summary
 
-    def classify(self, transcript: str) -> dict:
-        if not transcript:
-            return {"type": "unknown", "confidence": 0.0, "transcript": ""}
+    def watch(self, interval: float = 1.0, on_reload=None):
+        """
+        Reloads the training data whenever its file changes. Polls, so no extra dependency is needed.
 
-        doc = self.nlp(transcript.lower())
-        lemmatized_transcript = " ".join([token.lemma_ for token in doc])
-        print(f"[FastClassifier] Original: '{transcript}' -> Lemmatized: '{lemmatized_transcript}'")
+        :param on_reload: Called after every successful reload, e.g. to rebuild what else was
+            derived from the intents.
+        """
+        if self._watcher:
+            return
 
-        transcript_embedding = self.model.encode(lemmatized_transcript, convert_to_tensor=True)
-        scores = util.cos_sim(transcript_embedding, self.known_embeddings)[0]
+        def file_state():
+            try:
+                stat = os.stat(self.intents_path)
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                return None
 
-        best_match_index = scores.argmax()
-        confidence = scores[best_match_index].item()
+        last_state = file_state()  # Taken before returning, so no change after watch() is missed
 
-        if confidence < self.SIMILARITY_THRESHOLD:
-            return {"type": "unknown", "confidence": confidence, "transcript": transcript}
+        def poll():
+            nonlocal last_state
+            while not self._stop_watching.wait(interval):
+                state = file_state()
+                if state is None or state == last_state:
+                    continue
+                last_state = state
+                try:
+                    summary = self.reload()
+                    print(f"[FastClassifier] Reloaded '{self.intents_path.name}': {summary}")
+                    if on_reload:
+                        on_reload()
+                except Exception as e:
+                    # Most likely a half-saved file; the next save triggers another attempt.
+                    print(f"[FastClassifier] ERROR: Reload failed, keeping the previous examples: {e}")
 
-        best_match = self.known_intents[best_match_index]
+        self._watcher = threading.Thread(target=poll, name="intent-watcher", daemon=True)
+        self._watcher.start()
 
-        if best_match["type"] == "unknown":
-            return {"type": "unknown", "confidence": 1.0 - confidence, "transcript": transcript}
+    def close(self):
+        self._stop_watching.set()
+        if self._watcher:
+            self._watcher.join(timeout=5)
+        if self.batcher:
+            self.batcher.close()
+
+    def _lemmatize(self, utterances: list[Utterance]) -> list[str]:
+        return self.normalizer.normalize(utterances)
+
+    def _encode(self, texts: list[str]):
+        return self.model.encode(texts, convert_to_numpy=True)
+
+    def _score(self, transcripts: list[str], lemmatized: list[str]) -> list[dict]:
+        """Encodes all transcripts in one batch and scores them against every known example at once."""
+        index = self._index
+        transcript_embeddings = (self.batcher or self._encode)(lemmatized)
+        return [
+            self._result(transcript, index.aggregate(neighbours, self.aggregation))
+            for transcript, neighbours in zip(transcripts, index.search(transcript_embeddings, self.top_k))
+        ]
+
+    def _result(self, transcript: str, candidates: list[dict]) -> dict:
+        """
+        Builds the result from the intents of the top-k neighbours, best first. They are
+        kept as `candidates`, with the `margin` of the best over the runner-up and the
+        `route` the routing policy chose, so later stages know how sure the match is.
+        The margin is None when the top-k neighbours all belong to one intent: there is no
+        runner-up to be ahead of, and the gap to that intent's own weakest example says
+        nothing about ambiguity.
+        """
+        if not candidates:
+            return self._empty_result(transcript)
+        best_match = candidates[0]
+        confidence = best_match["score"]
+        margin = confidence - candidates[1]["score"] if len(candidates) > 1 else None
+        route = self.routing_policy.route(candidates, margin)
+        evidence = {"transcript": transcript, "margin": margin, "route": route, "candidates": candidates}
+        if route != FAST:
+            if best_match["type"] == "unknown" and confidence >= self.SIMILARITY_THRESHOLD:
+                confidence = 1.0 - confidence
+            return {"type": "unknown", "confidence": confidence, **evidence}
 
         # The NER model is now the primary source for parameters.
         # This classifier's only job is to provide the type and action.
@@ -56,5 +199,35 @@ class FastClassifier:
             "action": best_match["action"],
             "confidence": confidence,
             "parameters": {},
-            "transcript": transcript
+            **evidence
         }
+
+    def _empty_result(self, transcript: str = "") -> dict:
+        return {"type": "unknown", "confidence": 0.0, "transcript": transcript, "margin": None,
+                "route": self.routing_policy.route([], None), "candidates": []}
+
+    def classify(self, transcript: str | Utterance) -> dict:
+        """Classifies a transcript, or an Utterance whose spaCy parse the NER model reuses."""
+        utterance = Utterance.coerce(transcript)
+        if not utterance.text:
+            return self._empty_result()
+
+        lemmatized_transcript = self._lemmatize([utterance])[0]
+        print(f"[FastClassifier] Original: '{utterance.text}' -> Lemmatized: '{lemmatized_transcript}'")
+        return self._score([utterance.text], [lemmatized_transcript])[0]
+
+    def classify_batch(self, transcripts: list[str | Utterance]) -> list[dict]:
+        """
+        Classifies many transcripts at once, with the same results as calling classify()
+        on each: spaCy parses them with nlp.pipe, the SentenceTransformer encodes them
+        as one batch and a single similarity matrix scores them all.
+        """
+        utterances = [Utterance.coerce(transcript) for transcript in transcripts]
+        results = [self._empty_result() for _ in utterances]
+        indices = [i for i, utterance in enumerate(utterances) if utterance.text]
+        if indices:
+            selected = [utterances[i] for i in indices]
+            texts = [utterance.text for utterance in selected]
+            for i, result in zip(indices, self._score(texts, self._lemmatize(selected))):
+                results[i] = result
+        return results
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("texts", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Merges concurrent encode calls into one forward pass.
+
+    Callers block in `__call__` as if they called `encode` themselves. A background thread
+    waits up to `window` seconds after the first pending request (or until `max_batch_size`
+    texts are pending), encodes everything in one batch and hands each caller its rows.
+    A caller alone pays at most `window` of extra latency; concurrent callers (voice, text,
+    API clients, speculative partials) share one forward pass instead of running their own.
+    """
+
+    def __init__(self, encode, window: float, max_batch_size: int, stats_window: int = 1024):
+        self.encode = encode
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.on_batch = None  # Optional callback(batch_size, queue_delays) after every batch
+        self._pending = deque()
+        self._pending_texts = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self.batches = 0
+        self.requests = 0
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._queue_delays = deque(maxlen=stats_window)
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="encoder-batcher", daemon=True)
+        self._thread.start()
+
+    def __call__(self, texts: list[str]):
+        """Encodes `texts` as part of the next batch and returns their embeddings, in order."""
+        request = _Request(texts)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The encoder batcher has been closed.")
+            self._pending.append(request)
+            self._pending_texts += len(texts)
+            self._condition.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_batch(self) -> list[_Request]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return []
+            deadline = self._pending[0].enqueued_at + self.window
+            while self._pending_texts < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            # Always take the oldest request, even if it alone exceeds max_batch_size.
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0].texts) <= self.max_batch_size):
+                request = self._pending.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._pending_texts -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # Closed
+            started = time.perf_counter()
+            delays = [started - request.enqueued_at for request in batch]
+            texts = [text for request in batch for text in request.texts]
+            try:
+                embeddings = self.encode(texts)
+                offset = 0
+                for request in batch:
+                    request.result = embeddings[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            for request in batch:
+                request.done.set()
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self._batch_sizes.append(len(texts))
+                self._queue_delays.extend(delays)
+            if self.on_batch:
+                try:
+                    self.on_batch(len(texts), delays)
+                except Exception as e:
+                    print(f"[MicroBatcher] ERROR: Batch callback failed: {e}")
+
+    def stats(self) -> dict:
+        """Batch sizes and queueing delays of recent batches, for tuning the window."""
+        with self._stats_lock:
+            sizes = np.array(self._batch_sizes)
+            delays = np.array(self._queue_delays) * 1000
+        if not len(sizes):
+            return {"batches": 0, "requests": 0}
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "batch_size_mean": float(sizes.mean()),
+            "batch_size_max": int(sizes.max()),
+            "queue_delay_ms_p50": float(np.quantile(delays, 0.5)),
+            "queue_delay_ms_p95": float(np.quantile(delays, 0.95)),
+        }
+
+    def close(self):
+        """Finishes the pending requests and stops the batching thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=5)
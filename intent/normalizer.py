@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+from nlp_service import Utterance, analyze_batch, get_nlp, tokenize
+
+
+def spacy_model_id(nlp) -> str:
+    """Identifies the spaCy model a lemma table was built with, e.g. "en_core_web_sm-3.8.0"."""
+    return f"{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+
+
+class SpacyNormalizer:
+    """Lemmatizes with the full spaCy pipeline (tok2vec, tagger, attribute ruler, lemmatizer)."""
+
+    name = "spacy"
+
+    def normalize(self, utterances: list[Utterance]) -> list[str]:
+        return [utterance.lemmatized for utterance in analyze_batch(utterances)]
+
+    def stats(self) -> dict:
+        return {"normalizer": self.name}
+
+
+class LookupNormalizer:
+    """
+    Lemmatizes with a precomputed table (see build_lemma_table.py): the transcript is only
+    tokenized, which is rule-based and takes microseconds, and every token is looked up.
+    Only utterances with a token missing from the table are parsed by spaCy, and the
+    parse is used just for those tokens. It is the Utterance's parse, so NER reuses it.
+    """
+
+    name = "lookup"
+
+    def __init__(self, table: dict[str, str]):
+        self.table = table
+        self.looked_up = 0
+        self.fallbacks = 0
+
+    def _lookup(self, token):
+        """The token's lemma from the table, or None if it is out of vocabulary."""
+        lemma = self.table.get(token.lower_)
+        if lemma is None and (token.like_num or token.is_punct):
+            return token.lower_  # Numbers and punctuation are their own lemma
+        return lemma
+
+    def normalize(self, utterances: list[Utterance]) -> list[str]:
+        tokenized = tokenize([utterance.text for utterance in utterances])
+        looked_up = [[self._lookup(token) for token in tokens] for tokens in tokenized]
+        unknown = [i for i, lemmas in enumerate(looked_up) if None in lemmas]
+        # Out-of-vocabulary tokens need the tagger, so those utterances are parsed in one batch.
+        analyze_batch([utterances[i] for i in unknown])
+        self.looked_up += len(utterances) - len(unknown)
+        self.fallbacks += len(unknown)
+
+        results = []
+        for utterance, lemmas in zip(utterances, looked_up):
+            if None in lemmas:
+                doc = utterance.doc  # Same tokenizer, so its tokens line up with ours
+                lemmas = [lemma if lemma is not None else doc[i].lemma_.lower() for i, lemma in enumerate(lemmas)]
+            results.append(" ".join(lemmas))
+        return results
+
+    def stats(self) -> dict:
+        return {"normalizer": self.name, "looked_up": self.looked_up, "spacy_fallbacks": self.fallbacks}
+
+
+def create_normalizer(mode: str, table_path: Path = None):
+    """
+    The normalizer for `mode` ("spacy" or "lookup"). Without a usable lemma table, the lookup
+    mode falls back to spaCy, so the table is only ever an optimization.
+    """
+    if mode == "spacy":
+        return SpacyNormalizer()
+    if mode != "lookup":
+        raise ValueError(f"Unknown lemmatizer '{mode}', expected 'spacy' or 'lookup'.")
+    try:
+        with open(table_path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Normalizer] No usable lemma table ({e}); lemmatizing with spaCy. "
+              f"Run build_lemma_table.py to create it.")
+        return SpacyNormalizer()
+    model_id = spacy_model_id(get_nlp())
+    if table.get('spacy_model') != model_id:
+        print(f"[Normalizer] The lemma table was built with {table.get('spacy_model')}, not {model_id}; "
+              f"lemmatizing with spaCy. Run build_lemma_table.py again.")
+        return SpacyNormalizer()
+    print(f"[Normalizer] Lemmatizing with a lookup table of {len(table['entries'])} words.")
+    return LookupNormalizer(table['entries'])
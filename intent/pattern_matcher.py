@@ -0,0 +1,212 @@
+import json
+import re
+import time
+from pathlib import Path
+
+# Template placeholders and the agent parameters their values are passed as.
+SLOT_PARAMETERS = {"app_name": "APP_NAME", "expression": "MATH_EXPRESSION", "level": "level"}
+
+_NUMBER_WORDS = ("zero|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|"
+                 "fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|"
+                 "eighty|ninety|hundred|thousand|million")
+_NUMBER = rf"(?:\d+(?:\.\d+)?|(?:{_NUMBER_WORDS})(?:\s+(?:{_NUMBER_WORDS}))*)"
+_OPERATOR = (r"(?:plus|minus|times|multiplied\s+by|divided\s+by|over|x|mod|modulo|to\s+the\s+power\s+of|"
+             r"percent\s+of|[-+*/^%])")
+_FUNCTION = (r"(?:(?:the\s+)?(?:square\s+root|cube\s+root|sine|cosine|tangent|sin|cos|tan|log|logarithm|"
+             r"natural\s+log)\s+of\s+)")
+_POSTFIX = r"(?:\s*(?:factorial|squared|cubed|degrees|!))"
+# Every space belongs to exactly one part of the pattern; otherwise a long text that fails
+# to match at the end would be retried in exponentially many ways.
+_OPERAND = rf"{_FUNCTION}*(?:\(\s*)?{_NUMBER}(?:\s*\))?{_POSTFIX}?"
+# What a slot's value may look like. An expression must be arithmetic: numbers joined by
+# operators, or a number with a function or postfix ("the square root of 144", "3 factorial"),
+# so "what is 1984 about" is not a calculation. App names come from a closed list (see
+# PatternMatcher). Anything these reject goes on to the FastClassifier.
+SLOT_PATTERNS = {
+    "expression": (rf"(?:{_OPERAND}(?:\s*{_OPERATOR}\s*{_OPERAND})+|{_FUNCTION}+(?:\(\s*)?{_NUMBER}(?:\s*\))?{_POSTFIX}?|"
+                   rf"{_NUMBER}{_POSTFIX})"),
+    "level": r"100|[1-9]?\d",  # A volume in percent; other numbers go to NER and the agent's checks
+}
+# Said before or after a slot's value but not part of it: "open the task manager".
+SLOT_PREFIXES = {"app_name": r"(?:(?:the|my)\s+)?"}
+SLOT_SUFFIXES = {"level": r"(?:\s*(?:percent|%))?"}
+
+# Politeness around a command, as in the generated training data.
+_PREFIX = re.compile(r"^(?:(?:please|can you|could you|hey loki|alright|okay)\s+)+")
+_SUFFIX = re.compile(r"(?:\s+(?:for me|please|now|if you could))+$")
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def _literal(text: str) -> str:
+    return re.escape(text).replace(re.escape(" "), r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercases, drops sentence punctuation (but not the decimal point of "2.5") and collapses spaces."""
+    return " ".join(re.sub(r"[,.!?]+(?=\s|$)", " ", text.lower()).split())
+
+
+def _core(text: str) -> str:
+    """A normalized text without the politeness around it."""
+    return _SUFFIX.sub("", _PREFIX.sub("", text))
+
+
+class PatternMatcher:
+    """
+    Tier 0 of intent classification: recognizes commands that follow one of the intent
+    templates (`data/intents.json`) or a user-defined shortcut, and extracts their slots,
+    in microseconds and without any model.
+
+    Phrases without slots are looked up in a dict. Templates with slots are compiled into one
+    regex of alternatives, most specific first, with a named group per alternative that tells
+    which template matched. Polite prefixes and suffixes are stripped first. A match skips the
+    FastClassifier and NER, so slots only take values that leave no doubt: known app names and
+    arithmetic, never free text. "open the garage door" or "launch the missiles" go to the
+    FastClassifier like everything else that does not match. So do the phrases of intents
+    the routing policy holds to a stricter threshold, such as shutting the computer down.
+    """
+
+    def __init__(self, templates: list[dict], shortcuts: list[dict] = None, app_names: list[str] = None,
+                 excluded_intents=()):
+        """
+        :param templates: Intent groups as in intents.json: type, action and prompts.
+        :param shortcuts: Extra phrases, each with type, action, optional fixed parameters
+            and a phrase that may contain slots; they take priority over the templates.
+        :param app_names: The applications "{app_name}" may stand for. Without any, phrases
+            with an app name are left to the FastClassifier and NER.
+        :param excluded_intents: "type" or "type.action" keys, as in the routing policy's
+            `intent_thresholds`, whose phrases are always left to the FastClassifier.
+        """
+        self.shortcuts = shortcuts or []
+        self.excluded_intents = set(excluded_intents)
+        self.slot_patterns = dict(SLOT_PATTERNS)
+        app_names = sorted({normalize(name) for name in app_names or []} - {""}, key=len, reverse=True)
+        if app_names:
+            self.slot_patterns["app_name"] = "|".join(_literal(name) for name in app_names)
+        self.templates_path = None
+        self._compiled = self._compile(templates)
+
+        self.hits = 0
+        self.misses = 0
+        self._seconds = 0.0
+
+    @classmethod
+    def from_files(cls, templates_path: Path, shortcuts: list[dict] = None, app_names: list[str] = None,
+                   excluded_intents=()) -> "PatternMatcher":
+        with open(templates_path, 'r') as f:
+            matcher = cls(json.load(f), shortcuts, app_names, excluded_intents)
+        matcher.templates_path = templates_path
+        return matcher
+
+    def reload(self) -> dict:
+        """
+        Recompiles the templates from `templates_path` without a restart. The new patterns
+        replace the old ones atomically, so a concurrent match sees either set, never a mix.
+        """
+        if self.templates_path is None:
+            raise ValueError("Only a PatternMatcher created with from_files() can be reloaded.")
+        with open(self.templates_path, 'r') as f:
+            self._compiled = self._compile(json.load(f))
+        phrases, _, templates = self._compiled
+        return {"phrases": len(phrases), "templates": len(templates)}
+
+    def _compile(self, templates: list[dict]):
+        """The phrase dict, the combined regex and the (intent, slots) of each regex alternative."""
+        excluded_intents, slot_patterns = self.excluded_intents, self.slot_patterns
+        entries = []
+        for shortcut in self.shortcuts:
+            entries.append((shortcut['phrase'], shortcut['type'], shortcut['action'], shortcut.get('parameters', {})))
+        for group in templates:
+            for prompt in group['prompts']:
+                entries.append((prompt, group['type'], group['action'], {}))
+
+        phrases = {}
+        alternatives = []
+        compiled_templates = []  # The intent and slot names of each regex alternative
+        for phrase, intent_type, action, parameters in entries:
+            phrase = normalize(phrase)
+            excluded = intent_type in excluded_intents or f"{intent_type}.{action}" in excluded_intents
+            intent = None if intent_type == "unknown" or excluded else (intent_type, action, parameters)
+            if not _PLACEHOLDER.search(phrase):
+                phrases.setdefault(phrase, intent)
+                if _core(phrase):
+                    phrases.setdefault(_core(phrase), intent)
+            elif intent and all(slot in slot_patterns for slot in _PLACEHOLDER.findall(phrase)):
+                alternatives.append((_core(phrase), intent))
+
+        # The regex takes the first alternative that matches, so the most literal text goes first:
+        # "open up {app_name}" must be tried before "open {app_name}".
+        alternatives.sort(key=lambda item: -len(_PLACEHOLDER.sub("", item[0])))
+        patterns = []
+        for number, (phrase, intent) in enumerate(alternatives):
+            slots = []
+            pattern, position = "", 0
+            for placeholder in _PLACEHOLDER.finditer(phrase):
+                pattern += _literal(phrase[position:placeholder.start()])
+                slot = placeholder.group(1)
+                slots.append(slot)
+                pattern += SLOT_PREFIXES.get(slot, "")
+                pattern += f"(?P<t{number}_{len(slots)}>{slot_patterns[slot]})"
+                pattern += SLOT_SUFFIXES.get(slot, "")
+                position = placeholder.end()
+            pattern += _literal(phrase[position:])
+            patterns.append(f"(?P<t{number}>{pattern})")
+            compiled_templates.append((intent, slots))
+        regex = re.compile(f"^(?:{'|'.join(patterns)})$") if patterns else None
+        return phrases, regex, compiled_templates
+
+    @staticmethod
+    def _match_template(regex, templates: list, text: str):
+        """The (intent, parameters) of the template a normalized text matches, or (None, None)."""
+        match = regex.match(text) if regex else None
+        if not match:
+            return None, None
+        # The alternative's own group closes after its slots, so it is the last group matched.
+        template = match.lastgroup
+        intent, slots = templates[int(template[1:])]
+        values = {SLOT_PARAMETERS.get(slot, slot): match.group(f"{template}_{i}").strip()
+                  for i, slot in enumerate(slots, start=1)}
+        return intent, values
+
+    def match(self, transcript: str):
+        """
+        :return: The intent with its parameters, like a FastClassifier result, or None if
+            the transcript is not a known command phrase.
+        """
+        started = time.perf_counter()
+        phrases, regex, templates = self._compiled
+        text = normalize(transcript)
+        core = _core(text)
+        intent, values = None, None
+        for candidate in dict.fromkeys((text, core)):
+            if candidate in phrases:
+                intent, values = phrases[candidate], {}
+                break
+        else:
+            if core:
+                intent, values = self._match_template(regex, templates, core)
+
+        self._seconds += time.perf_counter() - started
+        if intent is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        intent_type, action, parameters = intent
+        return {
+            "type": intent_type,
+            "action": action,
+            "confidence": 1.0,
+            "parameters": {**parameters, **values},
+            "transcript": transcript,
+            "route": "fast",
+            "tier": 0,
+        }
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else None,
+            "mean_latency_us": self._seconds / total * 1e6 if total else None,
+        }
@@ -0,0 +1,65 @@
+FAST, LLM, REPEAT = "fast", "llm", "repeat"
+
+
+class RoutingPolicy:
+    """
+    Decides what happens with a fast-path classification:
+
+        fast    - the best intent is trusted and dispatched directly
+        llm     - the LLMClassifier takes another look
+        repeat  - the user is asked to say it again
+
+    The best intent is trusted when its score reaches its threshold (`threshold`, or the
+    entry for "type.action" or "type" in `intent_thresholds`). Below that, it is still
+    trusted when it leads the runner-up intent by at least `margin` and scores at least
+    `margin_floor`, since a clear winner rarely changes in the LLM. Without a runner-up
+    intent the margin is unknown and only the threshold applies. Intents with their own
+    threshold are never accepted on the margin, so risky actions can be held to a stricter bar.
+    Scores below `repeat_below` are treated as noise rather than sent to the LLM; 0 disables
+    this, since cosine scores of unrelated text can be negative.
+    """
+
+    def __init__(self, threshold: float, margin: float = None, margin_floor: float = 0.0,
+                 intent_thresholds: dict = None, repeat_below: float = 0.0):
+        self.threshold = threshold
+        self.margin = margin
+        self.margin_floor = margin_floor
+        self.intent_thresholds = intent_thresholds or {}
+        self.repeat_below = repeat_below
+
+    @classmethod
+    def from_settings(cls, threshold: float, routing_settings: dict) -> "RoutingPolicy":
+        return cls(
+            threshold=threshold,
+            margin=routing_settings['margin'],
+            margin_floor=routing_settings['margin_floor'],
+            intent_thresholds=routing_settings['intent_thresholds'],
+            repeat_below=routing_settings['repeat_below'],
+        )
+
+    def _intent_threshold(self, candidate: dict):
+        """The intent's own threshold, or None if it uses the global one."""
+        for key in (f"{candidate['type']}.{candidate['action']}", candidate['type']):
+            if key in self.intent_thresholds:
+                return self.intent_thresholds[key]
+        return None
+
+    def route(self, candidates: list[dict], margin: float | None) -> str:
+        """
+        :param candidates: The candidate intents of a transcript, best first (see SimilarityIndex).
+        :param margin: How far the best intent's score is ahead of the runner-up intent's,
+            or None if there is no runner-up.
+        """
+        score = candidates[0]["score"] if candidates else 0.0
+        if self.repeat_below > 0 and score < self.repeat_below:
+            return REPEAT
+        if not candidates or candidates[0]["type"] == "unknown":
+            return LLM
+
+        intent_threshold = self._intent_threshold(candidates[0])
+        if score >= (self.threshold if intent_threshold is None else intent_threshold):
+            return FAST
+        if (intent_threshold is None and self.margin is not None and margin is not None and
+                score >= self.margin_floor and margin >= self.margin):
+            return FAST
+        return LLM
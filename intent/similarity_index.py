@@ -0,0 +1,78 @@
+import numpy as np
+
+AGGREGATIONS = ("max", "mean", "vote")
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    """Scales every row to unit length, so a dot product is a cosine similarity."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class SimilarityIndex:
+    """
+    The known intent examples with their embeddings, normalized once when the index is
+    built. Scoring a batch of queries is one matrix product; only the top-k neighbours of
+    each query are kept and grouped by intent:
+
+        max   - the best similarity of any of the intent's examples (a nearest-neighbour match)
+        mean  - the mean similarity of the intent's examples among the top-k
+        vote  - how many of the top-k neighbours belong to the intent
+
+    The index is immutable; reloading the training data builds a new one.
+    """
+
+    def __init__(self, examples: list[dict], embeddings):
+        self.examples = examples
+        self.embeddings = normalize_rows(embeddings) if len(examples) else np.zeros((0, 0), dtype=np.float32)
+        self.intent_keys = [(example["type"], example.get("action")) for example in examples]
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def search(self, query_embeddings, k: int) -> list[list[tuple[int, float]]]:
+        """
+        :return: For every query, its k most similar examples as (example index, similarity),
+            best first.
+        """
+        queries = normalize_rows(query_embeddings)
+        if not len(self.examples):
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self.embeddings.T  # queries x known examples
+        k = min(k, scores.shape[1])
+        # argpartition finds the top k in linear time; only those k are sorted.
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        return [list(zip(row.tolist(), row_scores.tolist())) for row, row_scores in zip(top, top_scores)]
+
+    def aggregate(self, neighbours: list[tuple[int, float]], method: str = "max") -> list[dict]:
+        """
+        Groups the neighbours of one query by intent, best intent first by `method`.
+        The `score` of each candidate is its max or mean similarity; a vote is ranked by
+        its number of votes and scored with its best similarity, so thresholds stay cosine values.
+        """
+        candidates = {}
+        for index, similarity in neighbours:
+            key = self.intent_keys[index]
+            candidate = candidates.get(key)
+            if candidate is None:
+                candidates[key] = candidate = {"type": key[0], "action": key[1], "max": similarity,
+                                               "similarities": []}
+            candidate["similarities"].append(similarity)
+
+        for candidate in candidates.values():
+            similarities = candidate.pop("similarities")
+            candidate["mean"] = sum(similarities) / len(similarities)
+            candidate["votes"] = len(similarities)
+            candidate["score"] = candidate["mean"] if method == "mean" else candidate["max"]
+
+        if method == "vote":
+            rank = lambda candidate: (candidate["votes"], candidate["max"])
+        else:
+            rank = lambda candidate: candidate["score"]
+        return sorted(candidates.values(), key=rank, reverse=True)
@@ -1,234 +1,829 @@
-import queue
+import asyncio
+import json
 import threading
+import time
 from pathlib import Path
 
-import numpy as np
-import sounddevice as sd
 from faster_whisper import WhisperModel
 from pvporcupine import create
 
 from agent_manager import AgentManager
+from audio import AudioRingBuffer, AudioSource, CommandRecorder, WakePhraseTrimmer, create_vad_engine, speech_span
+from component_loader import ComponentLoader
 from config import settings
-from intent import FastClassifier, LLMClassifier
+from endpointing import Endpointer
+from event_bus import (AssistantState, Error, EventBus, Heard, HideWindow, PartialTranscript, Response,
+                       ShowWindow, StateChanged, Status, TextInput)
+from http_api import CommandAPI
+from intent import FastClassifier, LLMClassifier, PatternMatcher, RoutingPolicy
+from intent.normalizer import create_normalizer
+from intent.routing import LLM, REPEAT
+from nlp_service import Utterance
 from ner_predictor import NERPredictor
+from speculative_nlu import SpeculativeNLU
+from streaming_transcriber import StreamingTranscriber, TranscriptionSession
+from metrics import MetricsTraceExporter, create_metrics
+from orchestrator import PipelineOrchestrator
+from tracing import Trace, create_tracer
 from tts import PiperTTSNative
 from tts_manager import TTSManager
+from warmup import warm_up_fast_classifier, warm_up_ner_predictor, warm_up_tts, warm_up_whisper
+
+
+REPEAT_PROMPT = "Sorry, I didn't catch that. Could you say it again?"
 
 
 class LokiWorker:
     """
-    Encapsulates the entire LOKI voice assistant pipeline to be run in a background thread.
-    Communicates with the main GUI thread via a queue.
+    Encapsulates the entire LOKI voice assistant pipeline. Front-ends either await
+    `serve()` as an asyncio task or call `run()` on a background thread.
+    Communicates with the front-end through an EventBus: typed events out, commands in.
     """
 
-    def __init__(self, message_queue: queue.Queue, stop_event: threading.Event):
-        self.queue = message_queue
+    # How long shutdown waits for commands in flight to finish; None waits for all of them.
+    drain_timeout = 5
+
+    def __init__(self, bus: EventBus, stop_event: threading.Event):
+        self.bus = bus
         self.stop_event = stop_event
+        self.components = None
+        self.tracer = None
+        self.metrics = None
         self.porcupine = None
-        self.tts_manager = None
-        self.tts_engine = None
+        self.ring = None
+        self.capture = None
+        self.wake_phrase_trimmer = None
+        self.recorder = None
+        self.orchestrator = None
+        self.api = None
+        self.cancel_on_wake_word = settings['orchestrator']['cancel_on_wake_word']
+        self.input_thread = None
+        self._last_reported_loss = 0
+
+    # --- Components are loaded in parallel; using one waits for it to finish loading ---
+    @property
+    def whisper(self) -> WhisperModel:
+        return self.components.get('whisper')
+
+    @property
+    def fast_classifier(self) -> FastClassifier:
+        return self.components.get('fast_classifier')
+
+    @property
+    def llm_classifier(self) -> LLMClassifier:
+        return self.components.get('llm_classifier')
+
+    @property
+    def ner_predictor(self) -> NERPredictor:
+        return self.components.get('ner_predictor')
+
+    @property
+    def agent_manager(self) -> AgentManager:
+        return self.components.get('agent_manager')
+
+    @property
+    def tts_manager(self) -> TTSManager:
+        return self.components.get('tts_manager')
+
+    # --- Optional accelerations are simply skipped until they are ready ---
+    @property
+    def streamer(self) -> StreamingTranscriber:
+        return self.components.peek('streamer') if self.components else None
+
+    @property
+    def speculative_nlu(self) -> SpeculativeNLU:
+        return self.components.peek('speculative_nlu') if self.components else None
+
+    @property
+    def endpointer(self) -> Endpointer:
+        return self.components.peek('endpointer') if self.components else None
 
     def _initialize_components(self):
-        """Loads all configuration and initializes LOKI components from the settings object."""
-        self.queue.put("STATUS: Loading configuration...")
+        """
+        Loads all configuration and starts loading LOKI components from the settings object.
 
-        # Get secrets and paths from the unified settings object
-        ACCESS_KEY = settings['picovoice']['access_key']
-        PORCUPINE_MODEL_PATH = settings['picovoice']['model_path']
-        PORCUPINE_KEYWORD_PATH = settings['picovoice']['keyword_path']
-        PORCUPINE_SENSITIVITY = settings['picovoice']['sensitivity']
+        Components load in parallel on a thread pool. This only waits for Porcupine, so the
+        assistant can listen for the wake word while the larger models are still loading.
+        """
+        self.bus.publish(Status("Loading configuration..."))
 
+        # Get secrets and paths from the unified settings object
         WHISPER_MODEL_SIZE = settings['stt']['model_size']
         WHISPER_DEVICE = settings['stt']['device']
         WHISPER_COMPUTE_TYPE = settings['stt']['compute_type']
 
         INTENTS_JSON_PATH = settings['intent']['training_data_path']
-        FAST_CLASSIFIER_MODEL = settings['intent']['fast_classifier']['model']
-        FAST_CLASSIFIER_THRESHOLD = settings['intent']['fast_classifier']['threshold']
+        EMBEDDING_CACHE_DIR = settings['intent']['fast_classifier']['embedding_cache_dir']
         OLLAMA_MODEL = settings['intent']['llm_classifier']['model']
 
         NER_MODEL_PATH = settings['ner']['model_path']
         PIPER_MODEL_PATH = settings['tts']['model_path']
 
-        if not ACCESS_KEY:
-            self.queue.put("ERROR: ACCESS_KEY not found in .env file.")
-            return False
-
-        self.queue.put("STATUS: Initializing LOKI components...")
+        self.bus.publish(Status("Initializing LOKI components..."))
         project_root = Path(__file__).parent
 
         # Resolve relative paths to absolute paths
-        porcupine_model_path = str(project_root / PORCUPINE_MODEL_PATH)
-        porcupine_keyword_path = str(project_root / PORCUPINE_KEYWORD_PATH)
         intents_json_path = project_root / INTENTS_JSON_PATH
         piper_model_path = str(project_root / PIPER_MODEL_PATH)
         ner_model_path = project_root / NER_MODEL_PATH
+        embedding_cache_dir = project_root / EMBEDDING_CACHE_DIR if EMBEDDING_CACHE_DIR else None
+
+        self.metrics = create_metrics(settings['metrics'], project_root)
+        self._register_metrics()
+        self.tracer = create_tracer(settings['tracing'], project_root,
+                                    extra_exporters=(MetricsTraceExporter(self.metrics),))
+        self.components = components = ComponentLoader(max_workers=settings['startup']['max_workers'])
+        warm = settings['startup']['warmup']
+        components.submit('porcupine', self._create_wake_word_engine)
+        components.submit('whisper', lambda: WhisperModel(
+            WHISPER_MODEL_SIZE, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE
+        ), warmup=warm_up_whisper if warm else None)
+        components.submit('fast_classifier', lambda: self._create_fast_classifier(intents_json_path, embedding_cache_dir),
+                          warmup=warm_up_fast_classifier if warm else None)
+        components.submit('ner_predictor', lambda: NERPredictor(ner_model_path),
+                          warmup=warm_up_ner_predictor if warm else None)
+        tier0 = settings['intent']['tier0']
+        if tier0['enabled']:
+            components.submit('pattern_matcher', lambda: PatternMatcher.from_files(
+                project_root / tier0['templates_path'], tier0['shortcuts'], tier0['app_names'],
+                # Intents with a stricter threshold must always go through the routing policy.
+                excluded_intents=settings['intent']['routing']['intent_thresholds'].keys()))
+        components.submit('llm_classifier', lambda: LLMClassifier(model_name=OLLAMA_MODEL))
+        components.submit('agent_manager', AgentManager)
+        components.submit('tts_engine', lambda: PiperTTSNative(model_path=piper_model_path),
+                          warmup=warm_up_tts if warm else None)
+        components.submit('tts_manager', lambda: self._create_tts_manager(components.get('tts_engine')),
+                          depends_on=('tts_engine',))
 
-        # --- Component Initialization (No changes needed here) ---
-        self.ner_predictor = NERPredictor(ner_model_path)
-        self.porcupine = create(
-            access_key=ACCESS_KEY,
-            model_path=porcupine_model_path,
-            keyword_paths=[porcupine_keyword_path],
-            sensitivities=[PORCUPINE_SENSITIVITY]
-        )
+        try:
+            self.porcupine = components.get('porcupine')
+        except Exception as e:
+            self.bus.publish(Error(f"Failed to initialize the wake word engine: {e}"))
+            components.shutdown()
+            return False
 
-        self.queue.put(f"STATUS: Loading Whisper model '{WHISPER_MODEL_SIZE}'...")
-        self.whisper = WhisperModel(WHISPER_MODEL_SIZE, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE)
+        return True
 
-        self.fast_classifier = FastClassifier(
+    def _register_metrics(self):
+        """
+        Creates the counters the pipeline updates directly. Stage latencies are collected
+        from the command traces instead (see MetricsTraceExporter).
+        """
+        metrics = self.metrics
+        self.wake_activations = metrics.counter("loki_wake_word_activations_total", "Wake word detections.")
+        self.commands_total = metrics.counter("loki_commands_total", "Commands run through intent classification.")
+        self.tier0_hits = metrics.counter("loki_tier0_hits_total", "Commands recognized by the pattern matcher.")
+        self.tier0_misses = metrics.counter("loki_tier0_misses_total", "Commands the pattern matcher passed on.")
+        self.llm_fallbacks = metrics.counter("loki_llm_fallbacks_total", "Commands the fast classifier could not handle.")
+        self.repeat_requests = metrics.counter("loki_repeat_requests_total",
+                                               "Commands too unclear to classify; the user was asked again.")
+        self.empty_transcriptions = metrics.counter("loki_empty_transcriptions_total", "Recordings without any speech.")
+        metrics.gauge("loki_llm_fallback_ratio", "Share of commands that needed the LLM.",
+                      source=lambda: self.llm_fallbacks.value / max(self.commands_total.value, 1))
+        metrics.gauge("loki_tts_queue_depth", "Responses waiting to be synthesized.",
+                      source=lambda: self.components.peek('tts_manager').task_queue.qsize())
+        metrics.gauge("loki_audio_dropped_frames", "Frames lost because the listener fell behind.",
+                      source=lambda: self.capture.stats()['dropped_frames'])
+
+    def _create_fast_classifier(self, intents_json_path: Path, embedding_cache_dir: Path) -> FastClassifier:
+        fast_classifier_settings = settings['intent']['fast_classifier']
+        fast_classifier = self._observe_batches(FastClassifier(
             intents_path=intents_json_path,
-            model_name=FAST_CLASSIFIER_MODEL,
-            threshold=FAST_CLASSIFIER_THRESHOLD
+            model_name=fast_classifier_settings['model'],
+            threshold=fast_classifier_settings['threshold'],
+            batch_window_ms=fast_classifier_settings['batch_window_ms'],
+            max_batch_size=fast_classifier_settings['max_batch_size'],
+            embedding_cache_dir=embedding_cache_dir,
+            top_k=fast_classifier_settings['top_k'],
+            aggregation=fast_classifier_settings['aggregation'],
+            routing_policy=RoutingPolicy.from_settings(fast_classifier_settings['threshold'],
+                                                       settings['intent']['routing']),
+            normalizer=create_normalizer(fast_classifier_settings['lemmatizer'],
+                                         Path(__file__).parent / fast_classifier_settings['lemma_table_path'])
+        ))
+        if fast_classifier_settings['watch_training_data']:
+            fast_classifier.watch(fast_classifier_settings['watch_interval_s'], on_reload=self._reload_pattern_matcher)
+        return fast_classifier
+
+    def _reload_pattern_matcher(self) -> dict:
+        """Recompiles the tier-0 templates, so they stay in step with the fast classifier's examples."""
+        pattern_matcher = self.components.peek('pattern_matcher')
+        if not pattern_matcher:
+            return {}
+        summary = pattern_matcher.reload()
+        print(f"[LokiWorker] Reloaded the tier-0 templates: {summary}")
+        return summary
+
+    def _observe_batches(self, fast_classifier: FastClassifier) -> FastClassifier:
+        """Records the encoder's batch sizes and queueing delays, to tune batch_window_ms."""
+        if fast_classifier.batcher:
+            batch_sizes = self.metrics.summary("loki_encoder_batch_size", "Texts per encoder batch.")
+            queue_delays = self.metrics.summary("loki_encoder_queue_delay_seconds",
+                                                "Time a classification waited for its encoder batch.")
+
+            def observe(batch_size: int, delays: list[float]):
+                batch_sizes.observe(batch_size)
+                for delay in delays:
+                    queue_delays.observe(delay)
+
+            fast_classifier.batcher.on_batch = observe
+        return fast_classifier
+
+    def _create_wake_word_engine(self):
+        """Creates the Porcupine wake-word engine. Its frame format drives the whole audio pipeline."""
+        access_key = settings['picovoice']['access_key']
+        if not access_key:
+            raise ValueError("ACCESS_KEY not found in .env file.")
+        project_root = Path(__file__).parent
+        return create(
+            access_key=access_key,
+            model_path=str(project_root / settings['picovoice']['model_path']),
+            keyword_paths=[str(project_root / settings['picovoice']['keyword_path'])],
+            sensitivities=[settings['picovoice']['sensitivity']]
         )
-        self.llm_classifier = LLMClassifier(model_name=OLLAMA_MODEL)
-
-        self.agent_manager = AgentManager()
 
-        self.tts_engine = PiperTTSNative(model_path=piper_model_path)
-        self.tts_manager = TTSManager(tts_engine=self.tts_engine)
-
-        return True
+    def _create_tts_manager(self, tts_engine: PiperTTSNative) -> TTSManager:
+        return TTSManager(tts_engine=tts_engine)
+
+    def _create_audio_source(self, sample_rate: int, frame_length: int) -> AudioSource:
+        """Creates the source of the listener's frames: the microphone, unless overridden."""
+        # Imported here so that replaying files does not need PortAudio.
+        from audio.capture import AudioCapture
+        return AudioCapture(sample_rate, frame_length, settings['capture']['queue_frames'])
+
+    def _publish_report(self, report: dict):
+        """Called with the transcript, intent and per-stage timings of every finished command."""
+        timings = ", ".join(f"{stage} {secs * 1000:.0f}ms" for stage, secs in report['timings'].items())
+        print(f"[LokiWorker] Command timings: {timings}")
+
+    def _on_all_components_loaded(self):
+        """Announces readiness once every component has finished loading."""
+        summary = ", ".join(f"{name} {secs:.1f}s" for name, secs in sorted(self.components.load_times.items()))
+        print(f"[LokiWorker] Component load times: {summary}")
+        if self.components.warmup_times:
+            summary = ", ".join(f"{name} {secs:.1f}s" for name, secs in sorted(self.components.warmup_times.items()))
+            print(f"[LokiWorker] Component warm-up times: {summary}")
+        failed = self.components.failed()
+        if failed:
+            self.bus.publish(Error(f"Failed to load: {', '.join(failed)}"))
+        self.bus.publish(Status("Loki is online."))
+        tts_manager = self.components.peek('tts_manager')
+        if tts_manager:
+            tts_manager.speak_async("Loki is online.")
+        self.bus.publish(Status("Listening for 'Hey Loki'..."))
 
     def _send_hide_window(self):
         """Callback to send HIDE_WINDOW message after TTS completes."""
         print("[DEBUG WORKER] TTS completed, sending HIDE_WINDOW message")
-        self.queue.put("HIDE_WINDOW")
-        self.queue.put("STATUS: LISTENING_IDLE")
+        self.bus.publish(HideWindow())
+        self.bus.publish(StateChanged(AssistantState.IDLE))
 
     def run(self):
-        """The main loop of the voice assistant."""
-        if not self._initialize_components():
+        """Runs the assistant until `stop_event` is set. Blocks, so call it on a background thread."""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """
+        The main coroutine of the voice assistant.
+
+        Work is split so the microphone is never starved:
+          - the sounddevice callback copies audio into a bounded frame queue,
+          - a listener thread consumes frames for wake-word detection and VAD,
+          - every finished utterance or typed command becomes an asyncio task on this
+            loop, whose blocking stages (Whisper, classification, NER, agent dispatch)
+            run on executors sized per kind of work.
+        Cancelling the task stops the assistant like setting `stop_event` does.
+        """
+        if not await asyncio.to_thread(self._initialize_components):
             return
 
         SAMPLE_RATE, FRAME_LENGTH = self.porcupine.sample_rate, self.porcupine.frame_length
 
-        self.queue.put("STATUS: Loki is online.")
-        self.tts_manager.speak_async("Loki is online.")
-        self.queue.put("STATUS: Listening for 'Hey Loki'...")
-
+        # Audio is written once into a preallocated ring buffer; wake-word detection,
+        # VAD and Whisper all read views of it instead of copying frames around.
+        self.ring = AudioRingBuffer(int(settings['capture']['buffer_seconds'] * SAMPLE_RATE))
+        self.frame_duration = FRAME_LENGTH / SAMPLE_RATE
+        self.recorder = recorder = CommandRecorder(
+            self.ring,
+            frame_length=FRAME_LENGTH,
+            vad=create_vad_engine(settings['vad'], SAMPLE_RATE, Path(__file__).parent),
+            silence_frames_after_speech=settings['vad']['silence_frames_after_speech'],
+            no_speech_timeout_frames=settings['vad']['no_speech_timeout_frames'],
+            max_recording_frames=settings['vad']['max_recording_frames'],
+            on_speech_start=lambda: self.bus.publish(Status("Speech detected...")),
+        )
+        self.speech_pad = int(settings['vad']['speech_pad_ms'] * SAMPLE_RATE / 1000)
+        self.preroll_frames = round(settings['capture']['preroll_ms'] * SAMPLE_RATE / 1000 / FRAME_LENGTH)
+        wake_phrase = settings['capture']['wake_phrase']
+        self.wake_phrase_trimmer = WakePhraseTrimmer(wake_phrase) if wake_phrase else None
+        orchestration = settings['orchestrator']
+        self.orchestrator = PipelineOrchestrator(orchestration['executors'], orchestration['timeouts_s'])
+        self.orchestrator.attach(asyncio.get_running_loop())
+        streaming = settings['stt']['streaming']
+        if streaming['enabled']:
+            # Until Whisper and the classifiers are loaded, commands use the batch path.
+            self.components.submit('streamer', lambda: StreamingTranscriber(
+                self.whisper, SAMPLE_RATE, self.speech_pad,
+                interval=streaming['interval_ms'] / 1000,
+                min_window=int(streaming['min_window_ms'] * SAMPLE_RATE / 1000),
+                on_partial=self._publish_partial,
+                # Partial passes share the stt executor with final transcriptions.
+                executor=self.orchestrator.executors['stt']
+            ), depends_on=('whisper',))
+            self.components.submit('speculative_nlu', lambda: SpeculativeNLU(
+                self.fast_classifier, self.ner_predictor, cache_size=streaming['nlu_cache_size']
+            ), depends_on=('fast_classifier', 'ner_predictor'))
+        endpointing = settings['endpointing']
+        if streaming['enabled'] and endpointing['enabled']:
+            self.components.submit('endpointer', lambda: Endpointer(
+                self.components.get('speculative_nlu'),
+                confidence=endpointing['confidence'],
+                required_entities=endpointing['required_entities']
+            ), depends_on=('speculative_nlu',))
+        self.capture = await asyncio.to_thread(self._create_audio_source, SAMPLE_RATE, FRAME_LENGTH)
+
+        api = settings['api']
+        if api['port']:
+            self.api = CommandAPI(self, self.orchestrator, api['max_in_flight'], api['request_timeout_s'])
+            self.api.start(api['port'])
+        self.input_thread = threading.Thread(target=self._input_loop, name="input", daemon=True)
+        self.input_thread.start()
+
+        # The wake word already works; the rest of the pipeline announces itself when loaded.
+        self.bus.publish(Status("Listening for 'Hey Loki'... (still loading models)"))
+        self.components.when_all_loaded(self._on_all_components_loaded)
+
+        listener = asyncio.ensure_future(asyncio.to_thread(self._capture_and_listen, recorder))
         try:
-            with (sd.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='int16', blocksize=FRAME_LENGTH) as stream):
-                while not self.stop_event.is_set():
-                    # Check for text input messages from GUI
-                    try:
-                        message = self.queue.get_nowait()
-                        if message.startswith("TEXT_INPUT:"):
-                            text_input = message.replace("TEXT_INPUT:", "").strip()
-                            self.process_text_input(text_input)
-                            continue
-                    except queue.Empty:
-                        pass
-
-                    pcm, _ = stream.read(FRAME_LENGTH)
-                    if self.porcupine.process(pcm.flatten()) >= 0:
-                        self.queue.put("SHOW_WINDOW")
-                        self.queue.put("STATUS: Wake word detected!")
-                        self.tts_manager.speak_async("Yes?")
-                        self.queue.put("STATUS: LISTENING_ACTIVE")
-
-                        VAD_THRESHOLD = settings['vad']['threshold']
-                        VAD_SILENCE_FRAMES_AFTER_SPEECH = settings['vad']['silence_frames_after_speech']
-                        VAD_NO_SPEECH_TIMEOUT_FRAMES = settings['vad']['no_speech_timeout_frames']
-                        VAD_MAX_RECORDING_FRAMES = settings['vad']['max_recording_frames']
-
-                        self.queue.put("STATUS: Listening for command...")
-                        audio_chunks = []
-                        has_started_speaking = False
-                        consecutive_silent_frames = 0
-
-                        while True:
-                            chunk, _ = stream.read(FRAME_LENGTH)
-                            audio_chunks.append(chunk)
-                            audio_float32_chunk = chunk.flatten().astype(np.float32) / 32768.0
-                            rms = np.sqrt(np.mean(audio_float32_chunk ** 2))
-                            if rms > VAD_THRESHOLD:
-                                if not has_started_speaking:
-                                    self.queue.put("STATUS: Speech detected...")
-                                    has_started_speaking = True
-                                consecutive_silent_frames = 0
-                            else:
-                                if has_started_speaking:
-                                    consecutive_silent_frames += 1
-                            if has_started_speaking and consecutive_silent_frames > VAD_SILENCE_FRAMES_AFTER_SPEECH:
-                                break
-                            if not has_started_speaking and len(audio_chunks) > VAD_NO_SPEECH_TIMEOUT_FRAMES:
-                                break
-                            if len(audio_chunks) > VAD_MAX_RECORDING_FRAMES:
-                                break
-                        # --- End of VAD ---
-                        self.queue.put("STATUS: PROCESSING")
-                        audio_int16 = np.concatenate([c.flatten() for c in audio_chunks])
-                        audio_float32 = audio_int16.astype(np.float32) / 32768.0
-
-                        self.queue.put("STATUS: Transcribing...")
-                        segments, _ = self.whisper.transcribe(audio_float32, language="en", vad_filter=True)
-                        transcription = " ".join(s.text for s in segments).strip()
-
-                        if not transcription:
-                            self.queue.put("HEARD: Heard nothing.")
-                            # Use callback to hide window after TTS completes
-                            self.tts_manager.speak_async("I did not hear anything.", on_complete=self._send_hide_window)
-                            continue
-
-                        self.queue.put(f'HEARD: "{transcription}"')
-                        intent = self.fast_classifier.classify(transcription)
-
-                        if (intent['type'] == 'unknown' or
-                                intent['confidence'] < self.fast_classifier.SIMILARITY_THRESHOLD):
-                            self.queue.put("STATUS: Fast path failed. Falling back to LLM...")
-                            intent = self.llm_classifier.classify(transcription)
-
-                        if intent['type'] != 'unknown':
-                            entities = self.ner_predictor.predict(transcription)
-                            intent.setdefault('parameters', {}).update(entities)
-
-                        response_text = self.agent_manager.dispatch(intent)
-                        self.queue.put(f'LOKI: "{response_text}"')
-                        # Use callback to hide window after TTS completes
-                        self.tts_manager.speak_async(response_text, on_complete=self._send_hide_window)
+            await asyncio.shield(listener)
+        except asyncio.CancelledError:
+            # The listener notices within one frame timeout; wait for it before cleaning up.
+            self.stop_event.set()
+            await listener
+            raise
+        finally:
+            await self._shutdown()
 
+    def _capture_and_listen(self, recorder: CommandRecorder):
+        """Body of the listener thread."""
+        try:
+            with self.capture:
+                self._listen(recorder)
         except Exception as e:
-            self.queue.put(f"ERROR: An exception occurred: {e}")
-        finally:
-            self.cleanup()
+            self.bus.publish(Error(f"An exception occurred: {e}"))
+
+    def _listen(self, recorder: CommandRecorder):
+        """Consumes captured frames: wake-word detection while idle, VAD while recording."""
+        is_recording = False
+        session = None
+        while not self.stop_event.is_set():
+            frame = self.capture.frames.get(timeout=0.1)
+            if frame is None:
+                if self.capture.finished:
+                    break  # A replayed file source has run out of audio
+                continue
+            frame_start = self.ring.write(frame)
+
+            if is_recording:
+                if recorder.process_frame(frame_start):
+                    is_recording = False
+                    if session:
+                        session.stop()
+                    saved_seconds = recorder.saved_frames * self.frame_duration
+                    endpointer = self.endpointer
+                    if endpointer:
+                        endpointer.record(saved_seconds)
+                    self.bus.publish(StateChanged(AssistantState.PROCESSING))
+                    recorded_samples = self.ring.total_written - recorder.start_index
+                    speech_segments = recorder.speech_segments()
+                    trace.add_span(
+                        "voice_capture", capture_start, time.perf_counter(),
+                        samples=recorded_samples, bytes=recorded_samples * 2,
+                        speech_segments=len(speech_segments), ended_early=recorder.ended_early
+                    )
+                    # Follows the command through the stages; latency is measured from here.
+                    report = self._new_report(
+                        trace,
+                        source="voice",
+                        wake_index=wake_index,
+                        recording_seconds=recorded_samples / self.capture.sample_rate,
+                        ended_early=recorder.ended_early,
+                        saved_seconds=saved_seconds,
+                    )
+                    self.orchestrator.submit(
+                        self._handle_voice_command, recorder.start_index, self.ring.total_written,
+                        speech_segments, session, report, voice=True
+                    )
+                    self._report_capture_stats()
+                continue
+
+            wake_start = time.perf_counter()
+            if self.porcupine.process(self.ring.pcm(frame_start)) >= 0:
+                self.wake_activations.inc()
+                if self.cancel_on_wake_word:
+                    # The user is starting over; drop what is left of the previous command.
+                    self.orchestrator.cancel_voice_commands()
+                trace = self.tracer.start_trace("voice_command")
+                trace.add_span("wake_detect", wake_start, time.perf_counter(),
+                               engine=type(self.porcupine).__name__, sample_index=frame_start)
+                self.bus.publish(ShowWindow())
+                self.bus.publish(Status("Wake word detected!"))
+                tts_manager = self.components.peek('tts_manager')
+                if tts_manager and settings['capture']['acknowledge_wake_word']:
+                    tts_manager.speak_async("Yes?")
+                self.bus.publish(StateChanged(AssistantState.LISTENING))
+                self.bus.publish(Status("Listening for command..."))
+                wake_index = self.ring.total_written
+                recorder.start(self.preroll_frames)
+                streamer = self.streamer
+                session = streamer.begin(recorder) if streamer else None
+                capture_start = time.perf_counter()
+                is_recording = True
+
+    def _input_loop(self):
+        """Waits for commands from the front-end, so the listener never has to poll for them."""
+        while True:
+            command = self.bus.commands.get()
+            if command is None:
+                break  # Channel closed on shutdown
+            if isinstance(command, TextInput):
+                report = self._new_report(self.tracer.start_trace("text_command"), source="text")
+                self.orchestrator.submit(self._handle_text_command, command.text.strip(), report)
+
+    def _report_capture_stats(self):
+        """Logs the capture counters whenever frames have been dropped since the last report."""
+        stats = self.capture.stats()
+        lost = stats['dropped_frames'] + stats.get('input_overflows', 0)
+        if lost != self._last_reported_loss:
+            self._last_reported_loss = lost
+            print(f"[LokiWorker] WARNING: Audio capture lost data: {stats}")
+
+    def get_audio_stats(self) -> dict:
+        """Returns the dropped-frame and overflow counters of the audio capture."""
+        return self.capture.stats() if self.capture else {}
+
+    async def _component(self, name: str):
+        """Returns a component, waiting for it to load without blocking the event loop."""
+        return self.components.peek(name) or await asyncio.to_thread(self.components.get, name)
+
+    async def _handle_voice_command(self, start: int, end: int, speech_segments: list[tuple[int, int]],
+                                    session: TranscriptionSession, report: dict):
+        """Task for one recorded utterance: transcription, then the command itself."""
+        try:
+            transcription = await self._transcribe_utterance(start, end, speech_segments, session, report)
+            if transcription:
+                await self.process_voice_command(transcription, report)
+        except asyncio.CancelledError:
+            self._fail_report(report, asyncio.CancelledError("Cancelled before it finished."))
+            raise
+        except Exception as e:
+            self.bus.publish(Error(f"Command processing failed: {e}"))
+            self._fail_report(report, e)
 
-    def process_text_input(self, transcription: str):
-        """Process text input as if it were transcribed speech."""
-        self.queue.put("STATUS: PROCESSING")
+    async def _handle_text_command(self, transcription: str, report: dict):
+        """Task for one typed command. Runs alongside voice commands."""
+        try:
+            await self.process_text_input(transcription, report)
+        except asyncio.CancelledError:
+            self._fail_report(report, asyncio.CancelledError("Cancelled before it finished."))
+            raise
+        except Exception as e:
+            self.bus.publish(Error(f"Command processing failed: {e}"))
+            self._fail_report(report, e)
+
+    async def _transcribe_utterance(self, start: int, end: int, speech_segments: list[tuple[int, int]],
+                                    session: TranscriptionSession = None, report: dict = None) -> str:
+        """
+        Transcribes a recorded utterance. Returns the transcript, or "" once the user has
+        been told that nothing was heard.
+        """
+        # VAD already ran on the live stream, so Whisper only gets the detected speech
+        # and its own vad_filter pass is skipped. No speech at all means nothing to transcribe.
+        span = speech_span(speech_segments, end - start, self.speech_pad)
+        transcription = ""
+        report = report if report is not None else self._new_report(self.tracer.start_trace("voice_command"))
+        trace = report['trace']
+        with trace.span("transcribe", model=settings['stt']['model_size'], streaming=session is not None) as stage:
+            if session:
+                # Most of the command was already transcribed while it was being spoken.
+                transcription = await self.orchestrator.run_stage(
+                    "transcribe", "stt", session.finalize, speech_segments, end
+                )
+                stage.set(partial_passes=session.passes)
+            elif span:
+                self.bus.publish(Status("Transcribing..."))
+                audio_float32 = self.ring.samples(start + span[0], start + span[1])
+                stage.set(audio_seconds=len(audio_float32) / self.capture.sample_rate, bytes=audio_float32.nbytes)
+
+                whisper = await self._component('whisper')
+
+                def transcribe():
+                    # Segments are generated lazily, so they are consumed on the executor too.
+                    segments, _ = whisper.transcribe(audio_float32, language="en", vad_filter=False)
+                    return " ".join(s.text for s in segments).strip()
+
+                transcription = await self.orchestrator.run_stage("transcribe", "stt", transcribe)
+            stage.set(characters=len(transcription))
+
+        # The listener keeps writing while we transcribe; make sure the audio was not recycled.
+        if span and not self.ring.contains(start + span[0]):
+            self.bus.publish(Error("Audio was overwritten before it could be transcribed."))
+            self._fail_report(report, RuntimeError("Audio was overwritten before it could be transcribed."))
+            return ""
+        if self.wake_phrase_trimmer:
+            transcription = self.wake_phrase_trimmer.trim(transcription)
 
         if not transcription:
-            self.queue.put("HEARD: Empty input.")
-            self.tts_manager.speak_async("Please enter a command.")
-            self.queue.put("STATUS: LISTENING_IDLE")
+            self.bus.publish(Heard("Heard nothing."))
+            self.empty_transcriptions.inc()
+            # Use callback to hide window after TTS completes
+            report['transcript'] = ""
+            self._finish_report(report)
+            tts_manager = await self._component('tts_manager')
+            tts_manager.speak_async("I did not hear anything.", on_complete=self._send_hide_window, trace=trace)
+            return ""
+
+        self.bus.publish(Heard(transcription))
+        return transcription
+
+    def _publish_partial(self, text: str, speech_end: int):
+        """
+        Callback for the streaming transcriber's partial hypotheses. Each hypothesis is
+        classified speculatively; if it is already a complete command, the recorder may
+        stop after a much shorter silence.
+        """
+        if self.wake_phrase_trimmer:
+            text = self.wake_phrase_trimmer.trim(text)
+        if not text:
             return
-
-        self.queue.put(f'HEARD: "{transcription}"')
-        intent = self.fast_classifier.classify(transcription)
-
-        if (intent['type'] == 'unknown' or
-                intent['confidence'] < self.fast_classifier.SIMILARITY_THRESHOLD):
-            self.queue.put("STATUS: Fast path failed. Falling back to LLM...")
-            intent = self.llm_classifier.classify(transcription)
-
+        self.bus.publish(PartialTranscript(text))
+        endpointer, speculative_nlu = self.endpointer, self.speculative_nlu
+        if endpointer:
+            if endpointer.is_complete(text):
+                self.recorder.mark_complete(speech_end, settings['endpointing']['silence_frames'])
+        elif speculative_nlu:
+            speculative_nlu.speculate(text)
+
+    async def _classify_intent(self, transcription: str, trace: Trace, intent: dict = None,
+                               announce: bool = True, utterance: Utterance = None) -> dict:
+        """
+        Classifies a transcript with the pattern matcher, then the fast classifier, falling
+        back to the LLM when its routing policy says so. `intent` is an existing fast-path
+        result, e.g. a speculative one. Pass the `utterance` on to NER to reuse its parse.
+        """
+        self.commands_total.inc()
+        if intent is None:
+            intent = self._match_pattern(transcription, trace)
+        if intent is None:
+            # Stage timeouts start once the component has loaded.
+            fast_classifier = await self._component('fast_classifier')
+            with trace.span("fast_classify", model=settings['intent']['fast_classifier']['model']) as stage:
+                intent = await self.orchestrator.run_stage("fast_classify", "nlu", fast_classifier.classify,
+                                                           utterance or transcription)
+                stage.set(intent=intent.get('action', intent['type']), confidence=intent['confidence'],
+                          margin=intent['margin'], route=intent['route'])
+
+        if intent['route'] == REPEAT:
+            self.repeat_requests.inc()
+        elif intent['route'] == LLM:
+            if announce:
+                self.bus.publish(Status("Fast path failed. Falling back to LLM..."))
+            self.llm_fallbacks.inc()
+            llm_classifier = await self._component('llm_classifier')
+            with trace.span("llm_fallback", model=settings['intent']['llm_classifier']['model']) as stage:
+                intent = await self.orchestrator.run_stage("llm_fallback", "llm", llm_classifier.classify,
+                                                           transcription)
+                stage.set(intent=intent.get('action', intent['type']))
+        return intent
+
+    def _match_pattern(self, transcription: str, trace: Trace):
+        """
+        Tier 0: the intent and slots of a transcript that follows a known command template,
+        or None. It takes microseconds, so it runs on the event loop, and it is skipped
+        rather than waited for while it is still being compiled.
+        """
+        pattern_matcher = self.components.peek('pattern_matcher')
+        if not pattern_matcher:
+            return None
+        with trace.span("tier0_match") as stage:
+            intent = pattern_matcher.match(transcription)
+            stage.set(hit=intent is not None)
+        (self.tier0_hits if intent else self.tier0_misses).inc()
+        return intent
+
+    async def _extract_entities(self, transcription: str, trace: Trace, utterance: Utterance = None) -> dict:
+        ner_predictor = await self._component('ner_predictor')
+        with trace.span("ner") as stage:
+            entities = await self.orchestrator.run_stage("ner", "nlu", ner_predictor.predict,
+                                                         utterance or transcription)
+            stage.set(entities=sorted(entities))
+        return entities
+
+    async def _resolve_and_dispatch(self, transcription: str, report: dict, announce: bool = True) -> str:
+        """
+        Runs the intent pipeline on a transcript and returns the agent's response.
+        The intent, entities and the spans of every stage are recorded in `report`.
+        """
+        trace = report['trace']
+        # A partial transcript identical to the final one has already been classified.
+        speculative_nlu = self.speculative_nlu
+        speculated = speculative_nlu.lookup(transcription) if speculative_nlu else None
+        report['speculative_hit'] = speculated is not None
+        intent, entities = speculated or (None, None)
+        # Parsed by spaCy on first use, then shared by the fast classifier and NER.
+        utterance = Utterance(transcription)
+        intent = await self._classify_intent(transcription, trace, intent, announce=announce, utterance=utterance)
+        if intent.get('route') == REPEAT:
+            report['intent'] = {key: intent.get(key) for key in ('type', 'confidence', 'route')}
+            report['entities'] = {}
+            return REPEAT_PROMPT
+
+        if intent.get('tier') == 0:
+            entities = dict(intent['parameters'])  # The pattern matcher extracted the slots already
         if intent['type'] != 'unknown':
-            entities = self.ner_predictor.predict(transcription)
+            if entities is None:
+                entities = await self._extract_entities(transcription, trace, utterance)
             intent.setdefault('parameters', {}).update(entities)
 
-        response_text = self.agent_manager.dispatch(intent)
-        self.queue.put(f'LOKI: "{response_text}"')
-        self.tts_manager.speak_async(response_text)
+        report['intent'] = {key: intent.get(key) for key in ('type', 'action', 'confidence')}
+        report['entities'] = entities or {}
+        agent_manager = await self._component('agent_manager')
+        with trace.span("dispatch", intent_type=intent['type']) as stage:
+            response_text = await self.orchestrator.run_stage("dispatch", "agents", agent_manager.dispatch, intent)
+            stage.set(characters=len(response_text or ""))
+        return response_text
+
+    # --- Entry points of the HTTP API (see http_api.py); nothing is shown in the front-ends ---
+    async def api_command(self, text: str, speak: bool = False) -> dict:
+        """Runs a text command end to end and returns its transcript, intent, entities and response."""
+        report = self._new_report(self.tracer.start_trace("api_command"), source="api", transcript=text)
+        trace = report['trace']
+        try:
+            response_text = await self._resolve_and_dispatch(text, report, announce=False)
+        except BaseException as e:
+            self._fail_report(report, e)
+            raise
+        report['response'] = response_text
+        self._finish_report(report)
+        if speak:
+            tts_manager = await self._component('tts_manager')
+            tts_manager.speak_async(response_text, trace=trace)
+        else:
+            trace.finish()
+        return {key: report[key] for key in ('transcript', 'intent', 'entities', 'response', 'timings')}
+
+    async def api_classify(self, text: str) -> dict:
+        """Classifies a text, with the LLM fallback, without extracting entities or dispatching it."""
+        trace = self.tracer.start_trace("api_classify")
+        try:
+            intent = await self._classify_intent(text, trace, announce=False)
+        finally:
+            trace.finish()
+        return {"text": text, "intent": {key: intent.get(key) for key in ('type', 'action', 'confidence')}}
+
+    async def api_classify_batch(self, texts: tuple[str, ...]) -> dict:
+        """
+        Classifies many texts with one batched pass of the fast classifier. Only the texts
+        it is not confident about go to the LLM.
+        """
+        trace = self.tracer.start_trace("api_classify_batch", batch_size=len(texts))
+        try:
+            fast_classifier = await self._component('fast_classifier')
+            with trace.span("fast_classify", model=settings['intent']['fast_classifier']['model'],
+                            batch_size=len(texts)):
+                intents = await self.orchestrator.run_stage("fast_classify", "nlu", fast_classifier.classify_batch,
+                                                            list(texts))
+            intents = await asyncio.gather(*(
+                self._classify_intent(text, trace, intent, announce=False) for text, intent in zip(texts, intents)
+            ))
+        finally:
+            trace.finish()
+        return {"results": [
+            {"text": text, "intent": {key: intent.get(key) for key in ('type', 'action', 'confidence')}}
+            for text, intent in zip(texts, intents)
+        ]}
+
+    async def api_entities(self, text: str) -> dict:
+        """Extracts the entities of a text."""
+        trace = self.tracer.start_trace("api_entities")
+        try:
+            entities = await self._extract_entities(text, trace)
+        finally:
+            trace.finish()
+        return {"text": text, "entities": entities}
+
+    async def api_reload_intents(self) -> dict:
+        """Reloads the fast classifier's training data, encoding only the examples that are new."""
+        fast_classifier = await self._component('fast_classifier')
+        summary = await asyncio.to_thread(fast_classifier.reload)
+        tier0 = await asyncio.to_thread(self._reload_pattern_matcher)
+        return {"version": fast_classifier.version, **summary, "tier0": tier0}
+
+    @staticmethod
+    def _new_report(trace: Trace, **fields) -> dict:
+        """Starts the report of one command; its end-to-end latency is measured from now."""
+        return {**fields, "trace": trace, "latency_start": time.perf_counter()}
+
+    def _finish_report(self, report: dict):
+        """
+        Publishes the report once the response is known. The trace stays open for the
+        TTS spans and is finished by the TTSManager after synthesis.
+        """
+        trace = report.pop('trace')
+        report['trace_id'] = trace.trace_id
+        report['timings'] = {**trace.durations(), 'end_to_end': time.perf_counter() - report.pop('latency_start')}
+        try:
+            self._publish_report(report)
+        except Exception as e:
+            print(f"[LokiWorker] ERROR: Failed to publish the command report: {e}")
+
+    def _fail_report(self, report: dict, error: Exception):
+        if report is not None and 'latency_start' in report:
+            trace = report['trace']
+            report['error'] = f"{type(error).__name__}: {error}"
+            self._finish_report(report)
+            trace.finish()
+
+    async def process_voice_command(self, transcription: str, report: dict = None):
+        """Process a transcribed voice command."""
+        report = report if report is not None else self._new_report(self.tracer.start_trace("voice_command"))
+        trace = report['trace']
+        report['transcript'] = transcription
+        response_text = await self._resolve_and_dispatch(transcription, report)
+        report['response'] = response_text
+        self._finish_report(report)
+        self.bus.publish(Response(response_text))
+        # Use callback to hide window after TTS completes
+        tts_manager = await self._component('tts_manager')
+        tts_manager.speak_async(response_text, on_complete=self._send_hide_window, trace=trace)
+
+    async def process_text_input(self, transcription: str, report: dict = None):
+        """Process text input as if it were transcribed speech."""
+        self.bus.publish(StateChanged(AssistantState.PROCESSING))
+
+        if not transcription:
+            self.bus.publish(Heard("Empty input."))
+            tts_manager = await self._component('tts_manager')
+            tts_manager.speak_async("Please enter a command.")
+            self.bus.publish(StateChanged(AssistantState.IDLE))
+            return
+
+        self.bus.publish(Heard(transcription))
+        report = report if report is not None else self._new_report(self.tracer.start_trace("text_command"))
+        trace = report['trace']
+        report['transcript'] = transcription
+        response_text = await self._resolve_and_dispatch(transcription, report)
+        report['response'] = response_text
+        self._finish_report(report)
+        self.bus.publish(Response(response_text))
+        tts_manager = await self._component('tts_manager')
+        tts_manager.speak_async(response_text, trace=trace)
         print("[DEBUG WORKER] Text input - NOT sending HIDE_WINDOW (manual input)")
         # Don't send HIDE_WINDOW for text input - it's manual interaction
-        self.queue.put("STATUS: LISTENING_IDLE")
+        self.bus.publish(StateChanged(AssistantState.IDLE))
+
+    async def _shutdown(self):
+        """Stops taking commands, lets the ones in flight finish, then cleans up."""
+        self.bus.publish(Status("Shutting down..."))
+        self.bus.commands.close()
+        if self.input_thread:
+            await asyncio.to_thread(self.input_thread.join, 1)
+        if self.api:
+            await asyncio.to_thread(self.api.close)
+        await self.orchestrator.drain(self.drain_timeout)
+        self.orchestrator.shutdown()
+        await asyncio.to_thread(self.cleanup)
 
     def cleanup(self):
         """Cleans up resources."""
-        self.queue.put("STATUS: Shutting down...")
-        if self.tts_manager:
-            self.tts_manager.shutdown()
+        if self.capture:
+            print(f"[LokiWorker] Audio capture stats: {self.capture.stats()}")
+        if self.endpointer:
+            print(f"[LokiWorker] Endpointing stats: {self.endpointer.stats()}")
+        if self.speculative_nlu:
+            print(f"[LokiWorker] Speculative NLU stats: {self.speculative_nlu.stats()}")
+        pattern_matcher = self.components.peek('pattern_matcher') if self.components else None
+        if pattern_matcher:
+            print(f"[LokiWorker] Pattern matcher stats: {pattern_matcher.stats()}")
+        fast_classifier = self.components.peek('fast_classifier') if self.components else None
+        if fast_classifier:
+            print(f"[LokiWorker] Lemmatizer stats: {fast_classifier.normalizer.stats()}")
+            if fast_classifier.batcher:
+                print(f"[LokiWorker] Encoder batching stats: {fast_classifier.batcher.stats()}")
+            fast_classifier.close()
+        if self.components:
+            self.components.shutdown()
+            tts_manager = self.components.peek('tts_manager')
+            if tts_manager:
+                tts_manager.shutdown()
+            tts_engine = self.components.peek('tts_engine')
+            if tts_engine:
+                tts_engine.close()
         if self.porcupine:
             self.porcupine.delete()
-        if self.tts_engine:
-            self.tts_engine.close()
+        if self.tracer:
+            self.tracer.close()
+        if self.metrics:
+            print(f"[LokiWorker] Metrics: {json.dumps(self.metrics.snapshot())}")
+            self.metrics.close()
         print("Loki Worker cleaned up resources.")
@@ -1,61 +1,109 @@
-import queue
+import asyncio
 import threading
+from pathlib import Path
 
-from loki_worker import LokiWorker
+from config import settings
+from engine_link import RemoteBus, connect_to_engine, engine_address
+from event_bus import Error, EventBus, Heard, PartialTranscript, Response, StateChanged, Status
 
 
-def main():
+def format_event(event) -> str:
+    """Formats a worker event for the console, or returns None for events it ignores."""
+    if isinstance(event, Status):
+        # Light blue for status messages
+        return f"\033[94m[STATUS] {event.text}\033[0m"
+    if isinstance(event, StateChanged):
+        return f"\033[94m[STATUS] {event.state.value}\033[0m"
+    if isinstance(event, Heard):
+        # Yellow for user's speech
+        return f'\033[93m[HEARD]  "{event.text}"\033[0m'
+    if isinstance(event, PartialTranscript):
+        # Grey for the live transcript while the user is still speaking
+        return f'\033[90m[...]    "{event.text}"\033[0m'
+    if isinstance(event, Response):
+        # Green for LOKI's response
+        return f'\033[92m[LOKI]   "{event.text}"\033[0m'
+    if isinstance(event, Error):
+        # Red for errors
+        return f"\033[91m[ERROR]  {event.message}\033[0m"
+    return None  # Window events only matter to the GUI
+
+
+async def print_events(bus: EventBus | RemoteBus):
+    """Prints the worker's events until cancelled, or until a remote engine goes away."""
+    while True:
+        # Waiting happens on a thread, so the worker's commands keep running on the loop.
+        events = await asyncio.to_thread(bus.events.get_batch, 0.5)
+        if not events and bus.events.closed:
+            break
+        for event in events:
+            line = format_event(event)
+            if line:
+                print(line)
+
+
+async def attach(bus: RemoteBus):
+    """Follows a resident engine (engine.py). Leaving only detaches; the engine keeps running."""
+    print("--- Attached to the LOKI engine ---")
+    try:
+        await print_events(bus)
+    finally:
+        bus.close()
+
+
+async def run_in_process():
     """
-    Console-based front-end for the LOKI Voice Assistant.
-    
-    This script initializes the LokiWorker in a separate thread and then
-    listens for messages from it, printing them to the console.
+    Runs the LokiWorker as an asyncio task next to a task that listens for its events
+    and prints them to the console.
     """
-    message_queue = queue.Queue()
+    # Only imported when needed: attaching to an engine must not load the model libraries.
+    from loki_worker import LokiWorker
+
+    bus = EventBus()
     stop_event = threading.Event()
 
-    # 1. Create and start the LOKI worker thread
+    # 1. Create and start the LOKI worker task
     print("--- Initializing LOKI Console Mode ---")
-    worker = LokiWorker(message_queue, stop_event)
-    worker_thread = threading.Thread(target=worker.run, daemon=True)
-    worker_thread.start()
+    worker = LokiWorker(bus, stop_event)
+    worker_task = asyncio.create_task(worker.serve())
 
-    # 2. Main loop to process messages from the worker
+    # 2. Print events from the worker until it stops
+    printer_task = asyncio.create_task(print_events(bus))
     try:
-        while worker_thread.is_alive():
-            try:
-                # Wait for a message from the worker thread
-                message = message_queue.get(timeout=1.0)
-
-                # Simple parsing of the message prefix to format the output
-                if message.startswith("STATUS:"):
-                    # Light blue for status messages
-                    print(f"\033[94m[STATUS] {message.replace('STATUS: ', '')}\033[0m")
-                elif message.startswith("HEARD:"):
-                    # Yellow for user's speech
-                    print(f"\033[93m[HEARD]  {message.replace('HEARD: ', '')}\033[0m")
-                elif message.startswith("LOKI:"):
-                    # Green for LOKI's response
-                    print(f"\033[92m[LOKI]   {message.replace('LOKI: ', '')}\033[0m")
-                elif message.startswith("ERROR:"):
-                    # Red for errors
-                    print(f"\033[91m[ERROR]  {message.replace('ERROR: ', '')}\033[0m")
-                else:
-                    print(message)  # Default print for any other message
-
-            except queue.Empty:
-                # The timeout allows this loop to check if the thread is still alive
-                # and to be interrupted by Ctrl+C.
-                continue
+        await worker_task
+    finally:
+        # 3. Cancelling the worker stops it; it cleans up before the task finishes
+        if not worker_task.done():
+            worker_task.cancel()
+            await asyncio.gather(worker_task, return_exceptions=True)
+        printer_task.cancel()
+        for event in bus.events.drain():
+            line = format_event(event)
+            if line:
+                print(line)
+
+
+async def main_async():
+    """
+    Console-based front-end for the LOKI Voice Assistant.
 
+    Attaches to a running LOKI engine if there is one; otherwise loads the models and
+    runs the assistant in this process.
+    """
+    engine = settings['engine']
+    bus = connect_to_engine(engine_address(engine, Path(__file__).parent), engine['connect_timeout_s'])
+    if bus:
+        await attach(bus)
+    else:
+        await run_in_process()
+
+
+def main():
+    try:
+        asyncio.run(main_async())
     except KeyboardInterrupt:
         print("\n🛑 SIGINT received. Shutting down LOKI...")
-    finally:
-        # 3. Signal the worker thread to stop and wait for it to clean up
-        if worker_thread.is_alive():
-            stop_event.set()
-            worker_thread.join(timeout=5)  # Wait for the thread to finish
-        print("--- LOKI Console Mode Terminated ---")
+    print("--- LOKI Console Mode Terminated ---")
 
 
 if __name__ == '__main__':
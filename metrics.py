@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing count. `inc()` is cheap enough for the audio loop."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, {}, self.value
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """A value that goes up and down. Either set explicitly, or read from `source()` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, source=None):
+        self.name = name
+        self.description = description
+        self.source = source
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        if self.source is None:
+            return self.value
+        try:
+            return self.source()
+        except Exception:
+            return float('nan')
+
+    def samples(self):
+        yield self.name, {}, self.get()
+
+    def snapshot(self):
+        return self.get()
+
+
+class Summary:
+    """
+    Latency distribution per label set. Quantiles are computed at scrape time over the
+    last `window` observations, so `observe()` is only an append under a lock.
+    """
+
+    kind = "summary"
+
+    def __init__(self, name: str, description: str, label_names: tuple = (), window: int = 1024):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.window = window
+        self._series: dict[tuple, list] = {}  # label values -> [recent observations, count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [deque(maxlen=self.window), 0, 0.0]
+            series[0].append(value)
+            series[1] += 1
+            series[2] += value
+
+    def _stats(self):
+        with self._lock:
+            series = [(key, np.array(recent), count, total) for key, (recent, count, total) in self._series.items()]
+        for key, recent, count, total in series:
+            quantiles = np.quantile(recent, QUANTILES) if len(recent) else [float('nan')] * len(QUANTILES)
+            yield dict(zip(self.label_names, key)), dict(zip(QUANTILES, quantiles)), count, total
+
+    def samples(self):
+        for labels, quantiles, count, total in self._stats():
+            for quantile, value in quantiles.items():
+                yield self.name, {**labels, "quantile": quantile}, value
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+    def snapshot(self):
+        return [{
+            **labels,
+            "count": count,
+            "sum": total,
+            **{f"p{round(quantile * 100)}": value for quantile, value in quantiles.items()},
+        } for labels, quantiles, count, total in self._stats()]
+
+
+class MetricsRegistry:
+    """
+    Process-wide latency and throughput metrics, exposed in the Prometheus text format
+    over an optional local HTTP endpoint and as a periodically rewritten JSON snapshot.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self.http_port = None
+        self._stop_event = threading.Event()
+        self._snapshot_thread = None
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description))
+
+    def gauge(self, name: str, description: str = "", source=None) -> Gauge:
+        gauge = self._get_or_create(name, lambda: Gauge(name, description, source))
+        if source is not None:
+            gauge.source = source
+        return gauge
+
+    def summary(self, name: str, description: str = "", label_names: tuple = ()) -> Summary:
+        return self._get_or_create(name, lambda: Summary(name, description, label_names, self.window))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {"timestamp": time.time(), **{metric.name: metric.snapshot() for metric in metrics}}
+
+    def write_snapshot(self, path: Path):
+        """Writes the snapshot atomically, so readers never see a half-written file."""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot(), indent=2), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1"):
+        """Serves GET /metrics in the Prometheus text format on a background thread."""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        self.http_port = self._server.server_port
+        print(f"[Metrics] Serving http://{host}:{self.http_port}/metrics")
+
+    def start_snapshots(self, path: Path, interval: float):
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        def write_periodically():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.write_snapshot(path)
+                except Exception as e:
+                    print(f"[Metrics] ERROR: Failed to write snapshot: {e}")
+            self.write_snapshot(path)  # Final state on shutdown
+
+        self._snapshot_thread = threading.Thread(target=write_periodically, name="metrics-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def close(self):
+        self._stop_event.set()
+        if self._snapshot_thread:
+            self._snapshot_thread.join(timeout=5)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class MetricsTraceExporter:
+    """
+    Feeds every finished command trace into the registry: one latency series per stage,
+    plus the per-agent execution time taken from the dispatch span.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.stages = registry.summary(
+            "loki_stage_duration_seconds", "Duration of each pipeline stage per command.", ("stage",)
+        )
+        self.agents = registry.summary(
+            "loki_agent_execute_seconds", "Time spent in an agent's execute().", ("agent",)
+        )
+
+    def export(self, trace, epoch: float):
+        for span in trace.spans:
+            if span.start is None or span.end is None:
+                continue
+            self.stages.observe(span.end - span.start, stage=span.name)
+            if span.name == "dispatch":
+                self.agents.observe(span.end - span.start, agent=span.attributes.get("intent_type", ""))
+
+    def close(self):
+        pass
+
+
+def create_metrics(metrics_settings: dict, project_root: Path) -> MetricsRegistry:
+    """
+    Builds the MetricsRegistry described by the `metrics` section of config.yaml. Metrics
+    are always collected; the HTTP endpoint and the snapshot file are optional.
+    """
+    registry = MetricsRegistry(window=metrics_settings['window'])
+    if metrics_settings['http_port']:
+        registry.start_http_server(metrics_settings['http_port'])
+    if metrics_settings['snapshot_path']:
+        registry.start_snapshots(project_root / metrics_settings['snapshot_path'],
+                                 metrics_settings['snapshot_interval_s'])
+    return registry
@@ -1,8 +1,6 @@
-import spacy
 from spacy.tokens import Doc
 
-# Load the spaCy model once for efficiency
-nlp = spacy.load("en_core_web_sm")
+from nlp_service import get_nlp, pipeline_lock
 
 
 def get_word_shape(word):
@@ -92,14 +90,16 @@ def sent2features(sent):
     from the pre-tokenized words to ensure our tokens and labels always match.
     """
     tokens = sent2tokens(sent)
+    nlp = get_nlp()  # The same pipeline the NERPredictor uses, so training and prediction features match
 
     # 1. Create a spaCy Doc from our list of tokens
     doc = Doc(nlp.vocab, words=tokens)
 
     # 2. Process the doc with the components of the pipeline (e.g., tagger, parser).
     #    This adds the linguistic annotations (like POS tags) without changing tokenization.
-    for name, proc in nlp.pipeline:
-        doc = proc(doc)
+    with pipeline_lock:
+        for name, proc in nlp.pipeline:
+            doc = proc(doc)
 
     return [word2features(doc, i) for i in range(len(doc))]
 
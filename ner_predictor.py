@@ -1,10 +1,10 @@
 from pathlib import Path
 
 import joblib
-import spacy
 
 # Import the feature engineering functions from our existing script
 from ner_feature_engineering import word2features
+from nlp_service import Utterance, get_nlp
 
 
 class NERPredictor:
@@ -21,8 +21,8 @@ class NERPredictor:
         self.model = joblib.load(model_path)
         print("NER model loaded successfully.")
 
-        # Load the spaCy model for feature extraction
-        self.nlp = spacy.load("en_core_web_sm")
+        # The spaCy pipeline for feature extraction is shared with the FastClassifier
+        self.nlp = get_nlp()
         print("NER Predictor is ready.")
 
     def _extract_entities_from_tags(self, tokens, tags):
@@ -65,15 +65,17 @@ class NERPredictor:
 
         return entities
 
-    def predict(self, transcript: str):
+    def predict(self, transcript: str | Utterance):
         """
-        Predicts entities in a given transcript.
+        Predicts entities in a given transcript, or in an Utterance that may already
+        have been parsed for the FastClassifier.
         """
-        if not transcript:
+        utterance = Utterance.coerce(transcript)
+        if not utterance.text:
             return {}
 
-        # Use spaCy to tokenize the text
-        doc = self.nlp(transcript)
+        # spaCy tokenizes and tags the text (once per utterance)
+        doc = utterance.doc
         tokens = [token.text for token in doc]
 
         # 1. Convert the new transcript into features
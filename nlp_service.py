@@ -0,0 +1,83 @@
+import threading
+
+import spacy
+
+SPACY_MODEL = "en_core_web_sm"
+# Lemmas and the CRF features only need the tagger, attribute ruler and lemmatizer (and the
+# tok2vec they share); the parser and spaCy's own NER are never used.
+EXCLUDED_COMPONENTS = ["parser", "ner", "senter"]
+
+_nlp = None
+_nlp_lock = threading.Lock()
+# spaCy does not promise that a Language object can be called from several threads at
+# once, and the nlu executor, the speculative NLU, the micro-batcher and the warm-ups all
+# share this one. Every call into the pipeline (tokenizer included) holds this lock.
+pipeline_lock = threading.Lock()
+
+
+def get_nlp():
+    """The process-wide spaCy pipeline, loaded on first use. Shared by the FastClassifier and NER."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                print(f"[NLP] Loading spaCy model '{SPACY_MODEL}' without {', '.join(EXCLUDED_COMPONENTS)}...")
+                _nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+    return _nlp
+
+
+def tokenize(texts: list[str]) -> list:
+    """Tokenizes transcripts without running the rest of the pipeline."""
+    tokenizer = get_nlp().tokenizer
+    with pipeline_lock:
+        return [tokenizer(text) for text in texts]
+
+
+class Utterance:
+    """
+    One transcript, parsed by spaCy at most once however many stages look at it. The
+    FastClassifier takes its lemmas and the NER model its tokens and tags from the same Doc.
+
+    The parse happens on first access, on the thread of whichever stage needs it first, so
+    commands the pattern matcher recognizes are never parsed at all.
+    """
+
+    __slots__ = ("text", "_doc", "_lock")
+
+    def __init__(self, text: str, doc=None):
+        self.text = text
+        self._doc = doc
+        self._lock = threading.Lock()
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            with self._lock:
+                if self._doc is None:
+                    nlp = get_nlp()
+                    with pipeline_lock:
+                        self._doc = nlp(self.text)
+        return self._doc
+
+    @property
+    def lemmatized(self) -> str:
+        """The lowercased lemmas, as the FastClassifier embeds them."""
+        return " ".join(token.lemma_.lower() for token in self.doc)
+
+    @classmethod
+    def coerce(cls, utterance) -> "Utterance":
+        """Accepts a transcript or an Utterance, so callers can pass either."""
+        return utterance if isinstance(utterance, cls) else cls(utterance)
+
+
+def analyze_batch(utterances: list) -> list[Utterance]:
+    """Parses many transcripts (or Utterances) with one nlp.pipe call; parsed ones are kept."""
+    utterances = [Utterance.coerce(utterance) for utterance in utterances]
+    pending = [utterance for utterance in utterances if utterance._doc is None]
+    if pending:
+        nlp = get_nlp()
+        with pipeline_lock:
+            docs = list(nlp.pipe(utterance.text for utterance in pending))
+        for utterance, doc in zip(pending, docs):
+            utterance._doc = doc
+    return utterances
@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class PipelineOrchestrator:
+    """
+    Runs commands as asyncio tasks on the worker's event loop.
+
+    Every blocking stage (Whisper, the classifiers, NER, agents) is awaited on a thread
+    pool sized for that kind of work, with a per-stage timeout. Voice and text commands are
+    independent tasks, so a slow LLM fallback for typed text does not hold up the next
+    spoken command. A new wake word can cancel the voice command still in flight.
+
+    The listener and input threads hand work over with `submit()`, which is thread-safe.
+    """
+
+    def __init__(self, executor_sizes: dict[str, int], timeouts: dict[str, float]):
+        self.executors = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=name)
+            for name, size in executor_sizes.items()
+        }
+        self.timeouts = timeouts
+        self.loop = None
+        self._tasks = set()
+        self._voice_tasks = set()
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    async def run_stage(self, stage: str, executor: str, fn, *args):
+        """
+        Runs `fn(*args)` on the named executor and waits at most the stage's timeout.
+
+        A timed-out or cancelled stage stops being awaited, but a call that has already
+        started keeps running on its thread; its result is discarded.
+        """
+        future = asyncio.get_running_loop().run_in_executor(self.executors[executor], fn, *args)
+        timeout = self.timeouts.get(stage)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"'{stage}' did not finish within {timeout}s.") from None
+
+    def submit(self, coroutine_fn, *args, voice: bool = False):
+        """Schedules `coroutine_fn(*args)` as a task. Safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._start, coroutine_fn, args, voice)
+
+    def _start(self, coroutine_fn, args, voice: bool):
+        task = self.loop.create_task(coroutine_fn(*args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if voice:
+            self._voice_tasks.add(task)
+            task.add_done_callback(self._voice_tasks.discard)
+
+    def call(self, coroutine_fn, *args) -> Future:
+        """
+        Like submit(), but returns a future for the result, so a thread that needs the
+        answer (e.g. an HTTP request handler) can wait for it.
+        """
+        return asyncio.run_coroutine_threadsafe(self._tracked(coroutine_fn(*args)), self.loop)
+
+    async def _tracked(self, coroutine):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await coroutine
+
+    def cancel_voice_commands(self):
+        """Cancels voice commands that are still being processed. Safe to call from any thread."""
+        self.loop.call_soon_threadsafe(lambda: [task.cancel() for task in list(self._voice_tasks)])
+
+    async def drain(self, timeout: float = None):
+        """Waits for the commands in flight, e.g. before shutting down."""
+        # Let callbacks scheduled by submit() from other threads create their tasks first.
+        await asyncio.sleep(0)
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
+
+    def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
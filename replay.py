@@ -0,0 +1,190 @@
+import argparse
+import json
+import threading
+from pathlib import Path
+
+from audio import AudioRingBuffer, AudioSource, FileAudioSource
+from config import settings
+from event_bus import EventBus, StateChanged, Status
+from loki_worker import LokiWorker
+from tts import PiperTTSNative
+from tts_manager import TTSManager
+
+# Porcupine's frame format; the rest of the pipeline is built around it.
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+
+class FileStartWakeWord:
+    """
+    Stands in for Porcupine when replaying files that do not start with "Hey Loki":
+    fires once at the beginning of every file, so each file is recorded as one command.
+    """
+
+    sample_rate = SAMPLE_RATE
+    frame_length = FRAME_LENGTH
+
+    def __init__(self):
+        self.file_starts = []
+        self.ring = None
+        self._next_file = 0
+
+    def attach(self, file_starts: list, ring: AudioRingBuffer):
+        self.file_starts = file_starts
+        self.ring = ring
+
+    def process(self, pcm) -> int:
+        """Same contract as Porcupine: 0 for a detection, -1 otherwise."""
+        if self._next_file < len(self.file_starts) and self.file_starts[self._next_file][0] < self.ring.total_written:
+            self._next_file += 1
+            return 0
+        return -1
+
+    def delete(self):
+        pass
+
+
+class ReplayWorker(LokiWorker):
+    """
+    Runs the complete LokiWorker pipeline on audio files instead of the microphone and
+    writes one JSON line per command: file, transcript, intent, entities, response and
+    per-stage timings. Files in which no command was detected are reported too.
+
+    Unless paced in real time, the files are replayed one command at a time: the source
+    holds back the next frames while a recorded command is still being processed, so the
+    ring buffer never overwrites an utterance that is waiting for Whisper.
+    """
+
+    # Replays always finish the commands that were already recorded.
+    drain_timeout = None
+
+    def __init__(self, bus: EventBus, stop_event: threading.Event, paths: list,
+                 report_path: Path, realtime: bool = False, wake_word: str = "file",
+                 gap_seconds: float = None, play_audio: bool = False):
+        super().__init__(bus, stop_event)
+        # Every file starts with a "wake word"; the previous file's command must still finish.
+        self.cancel_on_wake_word = False
+        self.paths = paths
+        self.report_path = report_path
+        self.realtime = realtime
+        self.wake_word = wake_word
+        self.gap_seconds = gap_seconds
+        self.play_audio = play_audio
+        self._reported_files = set()
+        self._report_lock = threading.Lock()
+        self._pending_commands = 0
+        self._report_file = None
+
+    def _create_wake_word_engine(self):
+        if self.wake_word == "file":
+            return FileStartWakeWord()
+        return super()._create_wake_word_engine()
+
+    def _create_tts_manager(self, tts_engine: PiperTTSNative) -> TTSManager:
+        return TTSManager(tts_engine=tts_engine, play_audio=self.play_audio)
+
+    def _create_audio_source(self, sample_rate: int, frame_length: int) -> AudioSource:
+        # Streaming and speculative NLU are skipped until loaded, which would make runs
+        # differ depending on load order. Replays start with everything in place.
+        loaded = threading.Event()
+        self.components.when_all_loaded(loaded.set)
+        loaded.wait()
+
+        gap_seconds = self.gap_seconds
+        if gap_seconds is None:
+            # Long enough for the VAD to end the recording before the next file starts.
+            gap_seconds = (settings['vad']['silence_frames_after_speech'] + 2) * frame_length / sample_rate + 0.5
+        source = FileAudioSource(
+            self.paths, sample_rate, frame_length, settings['capture']['queue_frames'],
+            realtime=self.realtime, gap_seconds=gap_seconds, hold=lambda: self._pending_commands > 0
+        )
+        if isinstance(self.porcupine, FileStartWakeWord):
+            self.porcupine.attach(source.file_starts, self.ring)
+        self._report_file = open(self.report_path, 'w', encoding='utf-8')
+        return source
+
+    def _file_at(self, index: int):
+        """The replayed file that was playing at absolute sample `index`."""
+        current = None
+        for start, path in self.capture.file_starts:
+            if start >= index:
+                break
+            current = path
+        return current
+
+    def _write(self, record: dict):
+        with self._report_lock:
+            self._report_file.write(json.dumps(record) + "\n")
+            self._report_file.flush()
+
+    def _new_report(self, trace, **fields) -> dict:
+        # Called by the listener when a recording ends; every report is published exactly once.
+        if fields.get('source') == "voice":
+            with self._report_lock:
+                self._pending_commands += 1
+        return super()._new_report(trace, **fields)
+
+    def _publish_report(self, report: dict):
+        super()._publish_report(report)
+        record = dict(report)
+        if report.get('source') == "voice":
+            path = self._file_at(report['wake_index'])
+            record['file'] = str(path) if path else None
+            with self._report_lock:
+                self._reported_files.add(path)
+                self._pending_commands -= 1
+        self._write(record)
+
+    def cleanup(self):
+        super().cleanup()
+        if not self._report_file:
+            return
+        for _, path in self.capture.file_starts:
+            if path not in self._reported_files:
+                self._write({"source": "voice", "file": str(path), "transcript": None,
+                             "error": "No command was detected."})
+        self._report_file.close()
+        print(f"[Replay] Report written to {self.report_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay WAV/FLAC files through the full LOKI pipeline.")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories of audio files.")
+    parser.add_argument("--report", type=Path, default=Path("replay_report.jsonl"),
+                        help="Where to write the JSONL report.")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Pace the audio like a microphone instead of replaying as fast as possible.")
+    parser.add_argument("--wake-word", choices=["file", "porcupine"], default="file",
+                        help="'file' starts a command at the beginning of every file; "
+                             "'porcupine' expects the files to contain the wake word.")
+    parser.add_argument("--gap", type=float, default=None,
+                        help="Seconds of silence inserted after each file.")
+    parser.add_argument("--play-audio", action="store_true", help="Play LOKI's spoken responses.")
+    parser.add_argument("--trace", action="store_true",
+                        help="Export per-command stage spans to the paths configured under 'tracing'.")
+    parser.add_argument("--verbose", action="store_true", help="Print every status message.")
+    args = parser.parse_args()
+    if args.trace:
+        settings['tracing']['enabled'] = True
+
+    bus = EventBus()
+    stop_event = threading.Event()
+    worker = ReplayWorker(
+        bus, stop_event, args.paths, args.report, realtime=args.realtime,
+        wake_word=args.wake_word, gap_seconds=args.gap, play_audio=args.play_audio
+    )
+    worker_thread = threading.Thread(target=worker.run, daemon=True)
+    worker_thread.start()
+
+    try:
+        while worker_thread.is_alive():
+            for event in bus.events.get_batch(timeout=0.5):
+                if args.verbose or not isinstance(event, (Status, StateChanged)):
+                    print(event)
+    except KeyboardInterrupt:
+        stop_event.set()
+        worker_thread.join(timeout=5)
+
+
+if __name__ == '__main__':
+    main()
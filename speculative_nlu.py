@@ -0,0 +1,90 @@
+import copy
+import re
+import threading
+from collections import OrderedDict
+
+from intent import FastClassifier
+from ner_predictor import NERPredictor
+from nlp_service import Utterance
+
+
+class SpeculativeNLU:
+    """
+    Runs intent classification and entity extraction on partial transcripts while the
+    user is still speaking, and caches the results by normalized text.
+
+    When the final transcript normalizes to the same text as a partial one, the worker
+    takes the cached intent and entities instead of classifying again. Only the
+    understanding step is speculative: agents are still dispatched on the final transcript.
+    The cache is dropped whenever the classifier reloads its training data.
+    """
+
+    def __init__(self, fast_classifier: FastClassifier, ner_predictor: NERPredictor, cache_size: int):
+        self.fast_classifier = fast_classifier
+        self.ner_predictor = ner_predictor
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._classifier_version = fast_classifier.version
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(transcript: str) -> str:
+        """Lowercases and drops punctuation, which Whisper often changes between passes."""
+        return " ".join(re.sub(r"[^\w\s'+]", " ", transcript.lower()).split())
+
+    def speculate(self, transcript: str):
+        """
+        Classifies a partial transcript (or returns the cached result for it).
+
+        :return: (intent, entities); entities is None when the intent is unknown, since
+            the pipeline never runs NER for unknown intents.
+        """
+        key = self.normalize(transcript)
+        version = self.fast_classifier.version
+        with self._lock:
+            self._drop_stale(version)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        utterance = Utterance(transcript)  # Parsed once for both
+        intent = self.fast_classifier.classify(utterance)
+        entities = None
+        if intent['type'] != 'unknown':
+            entities = self.ner_predictor.predict(utterance)
+
+        with self._lock:
+            if self._classifier_version != version:
+                return intent, entities  # Classified against examples that were replaced meanwhile
+            self._cache[key] = (intent, entities)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return intent, entities
+
+    def lookup(self, transcript: str):
+        """
+        Returns copies of the speculative (intent, entities) for a final transcript,
+        or None if it was never speculated on.
+        """
+        with self._lock:
+            self._drop_stale(self.fast_classifier.version)
+            cached = self._cache.get(self.normalize(transcript))
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        intent, entities = copy.deepcopy(cached)
+        intent['transcript'] = transcript
+        return intent, entities
+
+    def _drop_stale(self, version: int):
+        """Forgets results classified against older training data. Called with the lock held."""
+        if version != self._classifier_version:
+            self._cache.clear()
+            self._classifier_version = version
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import CancelledError, Executor
+
+from faster_whisper import WhisperModel
+
+from audio import AudioRingBuffer, CommandRecorder
+
+
+class TranscriptionSession:
+    """
+    Transcribes one command in the background while it is still being recorded.
+
+    Every `interval` seconds the session re-transcribes the speech that has not been
+    confirmed yet. All Whisper segments except the last one are confirmed and never
+    transcribed again; the last one is kept as the current hypothesis. When recording
+    ends, only speech heard after the latest pass has to be transcribed, and if the
+    trailing silence gave the session time to cover all speech, the hypothesis is the
+    final transcript and Whisper is not run again at all.
+
+    `on_partial(text, speech_end)` is called after every pass with the current hypothesis
+    and the absolute ring-buffer index up to which it covers the speech, but never once
+    `stop()` has returned, so it cannot act on the recorder's next recording.
+
+    Partial passes run on `executor` when one is given, the one final transcriptions run
+    on, so Whisper is never run by two commands at once.
+    """
+
+    def __init__(self, whisper: WhisperModel, recorder: CommandRecorder, sample_rate: int,
+                 speech_pad: int, interval: float, min_window: int, on_partial=None,
+                 executor: Executor = None):
+        self.whisper = whisper
+        self.recorder = recorder
+        self.ring: AudioRingBuffer = recorder.ring
+        self.start_index = recorder.start_index
+        self.sample_rate = sample_rate
+        self.speech_pad = speech_pad
+        self.interval = interval
+        self.min_window = min_window
+        self.on_partial = on_partial
+        self.executor = executor
+
+        # Offsets are relative to the start of the recording.
+        self._confirmed = []
+        self._confirmed_end = 0
+        self._hypothesis = ""
+        self._covered_speech_end = 0
+        self.passes = 0
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()  # Orders stop() against submitting and publishing a pass
+        self._pending = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._step()
+            except CancelledError:
+                break  # finalize() took over before the pass started
+            except Exception as e:
+                # A failed partial pass only costs latency; finalize() still transcribes.
+                print(f"[StreamingTranscriber] ERROR: Partial transcription failed: {e}")
+
+    def _window(self, speech_segments: list[tuple[int, int]], length: int):
+        """The not-yet-confirmed part of the speech, padded and clamped to the recording."""
+        window_start = max(self._confirmed_end, speech_segments[0][0] - self.speech_pad, 0)
+        window_end = min(speech_segments[-1][1] + self.speech_pad, length)
+        return window_start, window_end
+
+    def _transcribe(self, window_start: int, window_end: int) -> list:
+        audio = self.ring.samples(self.start_index + window_start, self.start_index + window_end)
+        segments, _ = self.whisper.transcribe(
+            audio, language="en", vad_filter=False,
+            initial_prompt=" ".join(self._confirmed) or None
+        )
+        return [s for s in segments if s.text.strip()]
+
+    def _transcribe_partial(self, window_start: int, window_end: int) -> list:
+        if self.executor is None:
+            return self._transcribe(window_start, window_end)
+        with self._lock:
+            if self._stop_event.is_set():
+                raise CancelledError()
+            self._pending = self.executor.submit(self._transcribe, window_start, window_end)
+        return self._pending.result()
+
+    def _step(self):
+        speech_segments = self.recorder.speech_segments()
+        if not speech_segments:
+            return
+        speech_end = speech_segments[-1][1]
+        if speech_end <= self._covered_speech_end:
+            return  # No new speech since the last pass
+
+        length = self.ring.total_written - self.start_index
+        window_start, window_end = self._window(speech_segments, length)
+        if window_end - window_start < self.min_window:
+            return
+
+        segments = self._transcribe_partial(window_start, window_end)
+        self.passes += 1
+        if len(segments) > 1:
+            self._confirmed.extend(s.text.strip() for s in segments[:-1])
+            self._confirmed_end = window_start + int(segments[-2].end * self.sample_rate)
+        self._hypothesis = segments[-1].text.strip() if segments else ""
+        self._covered_speech_end = speech_end
+
+        if self.on_partial:
+            with self._lock:
+                if not self._stop_event.is_set():
+                    self.on_partial(self._join(self._hypothesis), self.start_index + speech_end)
+
+    def _join(self, tail: str) -> str:
+        return " ".join(self._confirmed + [tail]).strip()
+
+    def stop(self):
+        """
+        Stops scheduling new passes without waiting for one in progress, which will not
+        publish its result. Called by the listener as soon as the recording ends, before
+        the recorder can be reused for the next command.
+        """
+        with self._lock:
+            self._stop_event.set()
+            if self._pending:
+                # Not started yet; finalize() may be the call it is queued behind.
+                self._pending.cancel()
+
+    def finalize(self, speech_segments: list[tuple[int, int]], end: int) -> str:
+        """
+        Stops the background passes and returns the final transcript.
+
+        :param speech_segments: The recorder's speech segments for the finished recording.
+        :param end: Absolute ring-buffer index where the recording ended.
+        """
+        self.stop()
+        self._thread.join()
+
+        if not speech_segments:
+            return ""
+        if speech_segments[-1][1] <= self._covered_speech_end:
+            return self._join(self._hypothesis)
+
+        window_start, window_end = self._window(speech_segments, end - self.start_index)
+        segments = self._transcribe(window_start, window_end)
+        return self._join(" ".join(s.text.strip() for s in segments))
+
+
+class StreamingTranscriber:
+    """Starts a TranscriptionSession per command, sharing the already-loaded WhisperModel."""
+
+    def __init__(self, whisper: WhisperModel, sample_rate: int, speech_pad: int,
+                 interval: float, min_window: int, on_partial=None, executor: Executor = None):
+        self.whisper = whisper
+        self.sample_rate = sample_rate
+        self.speech_pad = speech_pad
+        self.interval = interval
+        self.min_window = min_window
+        self.on_partial = on_partial
+        self.executor = executor
+
+    def begin(self, recorder: CommandRecorder) -> TranscriptionSession:
+        """Starts transcribing the recording `recorder` has just started."""
+        return TranscriptionSession(
+            self.whisper, recorder, self.sample_rate, self.speech_pad,
+            self.interval, self.min_window, self.on_partial, self.executor
+        )
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from http_api import CommandAPI
+from orchestrator import PipelineOrchestrator
+
+
+class SlowWorker:
+    """Stands in for LokiWorker: each call waits until released and counts its runs."""
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.release = threading.Event()
+        self.calls = []
+
+    async def api_command(self, text, speak=False):
+        self.calls.append(("command", text))
+        await asyncio.to_thread(self.release.wait, 5)
+        return {"transcript": text, "response": f"Done: {text}"}
+
+    async def api_classify(self, text):
+        self.calls.append(("classify", text))
+        await asyncio.to_thread(self.release.wait, 5)
+        return {"text": text, "intent": {"type": "system_control"}}
+
+    async def api_entities(self, text):
+        # Runs a blocking stage that always exceeds its timeout.
+        return await self.orchestrator.run_stage("ner", "nlu", self.release.wait, 5)
+
+
+@pytest.fixture
+def api():
+    orchestrator = PipelineOrchestrator({'nlu': 1}, {'ner': 0.05})
+    loop = asyncio.new_event_loop()
+    orchestrator.attach(loop)
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    worker = SlowWorker(orchestrator)
+    api = CommandAPI(worker, orchestrator, max_in_flight=4, request_timeout=5)
+    api.start(0)
+    yield api, worker
+    worker.release.set()
+    api.close()
+    orchestrator.shutdown()
+    loop.call_soon_threadsafe(loop.stop)
+    loop_thread.join(timeout=1)
+
+
+def post(api, path, body):
+    request = urllib.request.Request(f"http://127.0.0.1:{api.port}{path}", data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_identical_requests_in_flight_are_coalesced(api):
+    """
+    Test that concurrent identical requests run the pipeline once and all get its result.
+    """
+    api, worker = api
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(post, api, "/v1/classify", {"text": "open chrome"}) for _ in range(3)]
+        futures.append(pool.submit(post, api, "/v1/command", {"text": "open chrome"}))
+        while len(worker.calls) < 2 or api.coalescer.coalesced < 2:
+            threading.Event().wait(0.01)
+        worker.release.set()
+        results = [future.result() for future in futures]
+
+    assert sorted(worker.calls) == [("classify", "open chrome"), ("command", "open chrome")]
+    assert results[:3] == [(200, {"text": "open chrome", "intent": {"type": "system_control"}})] * 3
+    assert results[3] == (200, {"transcript": "open chrome", "response": "Done: open chrome"})
+
+
+def test_requests_beyond_the_limit_are_rejected(api):
+    """
+    Test that requests beyond max_in_flight get 503 instead of queueing.
+    """
+    api, worker = api
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(post, api, "/v1/classify", {"text": f"command {i}"}) for i in range(4)]
+        while len(worker.calls) < 4:
+            threading.Event().wait(0.01)
+        status, body = post(api, "/v1/classify", {"text": "one too many"})
+        worker.release.set()
+        assert all(future.result()[0] == 200 for future in futures)
+
+    assert status == 503
+
+
+def test_stage_timeout_is_reported_as_504(api):
+    """
+    Test that a stage exceeding its timeout answers 504 with the name of the stage.
+    """
+    api, _ = api
+    status, body = post(api, "/v1/entities", {"text": "open chrome"})
+
+    assert status == 504
+    assert "ner" in body["error"]
+
+
+def test_invalid_requests_are_rejected(api):
+    """
+    Test that unknown endpoints and requests without text are rejected without reaching the worker.
+    """
+    api, worker = api
+    assert post(api, "/v1/unknown", {"text": "open chrome"})[0] == 404
+    assert post(api, "/v1/command", {"text": "  "})[0] == 400
+    assert post(api, "/v1/command", ["open chrome"])[0] == 400
+    assert worker.calls == []
+
+
+def test_batch_classification_is_routed_to_the_batch_handler(api):
+    """
+    Test that a list of texts is classified in one call, and an invalid list is rejected.
+    """
+    api, worker = api
+    batches = []
+
+    async def api_classify_batch(texts):
+        batches.append(texts)
+        return {"results": [{"text": text} for text in texts]}
+
+    worker.api_classify_batch = api_classify_batch
+
+    status, body = post(api, "/v1/classify", {"texts": ["open chrome", " what time is it "]})
+
+    assert status == 200
+    assert batches == [("open chrome", "what time is it")]
+    assert body == {"results": [{"text": "open chrome"}, {"text": "what time is it"}]}
+    assert post(api, "/v1/classify", {"texts": ["open chrome", ""]})[0] == 400
@@ -0,0 +1,122 @@
+import sys
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from audio import AudioRingBuffer, CommandRecorder, FileAudioSource, RMSVAD, read_audio_file
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512
+
+
+def write_wav(path, audio: np.ndarray, rate: int, channels: int = 1):
+    with wave.open(str(path), 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(audio.astype(np.int16).tobytes())
+
+
+def drain(source: FileAudioSource) -> np.ndarray:
+    frames = []
+    while not source.finished:
+        frame = source.frames.get(timeout=1)
+        if frame is not None:
+            frames.append(frame.copy())
+    return np.concatenate(frames)
+
+
+def test_read_audio_file_downmixes_and_resamples(tmp_path):
+    """
+    Test that stereo audio at another sample rate is read as mono int16 at the target rate.
+    """
+    stereo = np.repeat(np.full(8000, 1000, dtype=np.int16), 2)  # 1 s at 8 kHz, interleaved
+    write_wav(tmp_path / "stereo.wav", stereo, rate=8000, channels=2)
+
+    audio = read_audio_file(tmp_path / "stereo.wav", SAMPLE_RATE)
+
+    assert audio.dtype == np.int16
+    assert len(audio) == SAMPLE_RATE
+    assert np.all(audio == 1000)
+
+
+def test_replay_delivers_every_frame_in_fast_mode(tmp_path):
+    """
+    Test that a fast replay never drops frames, even with a tiny queue, and pads each file with silence.
+    """
+    write_wav(tmp_path / "a.wav", np.full(1000, 500), SAMPLE_RATE)
+    write_wav(tmp_path / "b.wav", np.full(2000, -500), SAMPLE_RATE)
+    source = FileAudioSource([tmp_path], SAMPLE_RATE, FRAME_LENGTH, queue_frames=2, gap_seconds=0.1)
+
+    with source:
+        audio = drain(source)
+
+    gap = int(0.1 * SAMPLE_RATE)
+    first_length = -(-(1000 + gap) // FRAME_LENGTH) * FRAME_LENGTH
+    assert source.frames.dropped_frames == 0
+    assert [start for start, _ in source.file_starts] == [0, first_length]
+    assert [path.name for _, path in source.file_starts] == ["a.wav", "b.wav"]
+    assert np.all(audio[:1000] == 500) and np.all(audio[1000:first_length] == 0)
+    assert np.all(audio[first_length:first_length + 2000] == -500)
+
+
+def test_fast_replay_waits_for_pending_commands(tmp_path):
+    """
+    Test that a fast replay of more audio than the ring buffer holds transcribes every file, because
+    the source holds back frames while a recorded command is still waiting for the slow transcriber.
+    """
+    for i in range(6):
+        write_wav(tmp_path / f"{i}.wav", np.concatenate([np.full(4 * FRAME_LENGTH, 1000 * (i + 1)),
+                                                          np.zeros(FRAME_LENGTH)]), SAMPLE_RATE)
+    ring = AudioRingBuffer(capacity=16 * FRAME_LENGTH)  # Less than two files
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=1,
+                               no_speech_timeout_frames=4, max_recording_frames=8)
+    pending = []
+    lock = threading.Lock()
+    source = FileAudioSource([tmp_path], SAMPLE_RATE, FRAME_LENGTH, queue_frames=4,
+                             gap_seconds=3 * FRAME_LENGTH / SAMPLE_RATE, hold=lambda: bool(pending))
+    transcripts = []
+
+    def transcribe(start, end):
+        threading.Event().wait(0.05)  # Much slower than recording
+        if not ring.contains(start):
+            transcripts.append(None)
+        else:
+            transcripts.append(int(ring.pcm(start, end).max()))
+        with lock:
+            pending.pop()
+
+    with source, ThreadPoolExecutor(1) as stt:
+        recording, next_file = False, 0
+        while not source.finished:
+            frame = source.frames.get(timeout=0.1)
+            if frame is None:
+                continue
+            frame_start = ring.write(frame)
+            if recording and recorder.process_frame(frame_start):
+                recording = False
+                with lock:
+                    pending.append(recorder.start_index)
+                stt.submit(transcribe, recorder.start_index, ring.total_written)
+            elif not recording and next_file < len(source.file_starts) and \
+                    source.file_starts[next_file][0] <= frame_start:
+                next_file += 1
+                recorder.start(preroll_frames=1)
+                recording = True
+
+    assert ring.total_written >= 3 * ring.capacity
+    assert transcripts == [1000 * (i + 1) for i in range(6)]
+
+
+def test_flac_without_soundfile_is_reported(tmp_path, monkeypatch):
+    """
+    Test that reading FLAC without the optional soundfile package raises a clear ImportError.
+    """
+    monkeypatch.setitem(sys.modules, 'soundfile', None)
+    (tmp_path / "command.flac").write_bytes(b"")
+
+    with pytest.raises(ImportError, match="soundfile"):
+        read_audio_file(tmp_path / "command.flac", SAMPLE_RATE)
@@ -0,0 +1,60 @@
+import threading
+
+import numpy as np
+
+from audio import FrameQueue
+
+
+def test_frames_come_out_in_order():
+    """
+    Test that frames are returned first-in, first-out.
+    """
+    frames = FrameQueue(num_slots=4, frame_length=3)
+    for value in range(3):
+        frames.put(np.full((3, 1), value, dtype=np.int16))
+
+    assert [int(frames.get(timeout=0)[0]) for _ in range(3)] == [0, 1, 2]
+
+
+def test_full_queue_drops_and_counts_frames():
+    """
+    Test that the producer never blocks: frames beyond capacity are dropped and counted.
+    """
+    frames = FrameQueue(num_slots=2, frame_length=3)
+    results = [frames.put(np.zeros(3, dtype=np.int16)) for _ in range(5)]
+
+    assert results == [True, True, False, False, False]
+    assert frames.dropped_frames == 3
+
+
+def test_slot_is_held_until_next_get():
+    """
+    Test that the slot being read is not reused by the producer until the consumer moves on.
+    """
+    frames = FrameQueue(num_slots=1, frame_length=2)
+    frames.put(np.array([7, 7], dtype=np.int16))
+    view = frames.get(timeout=0)
+
+    assert frames.put(np.array([9, 9], dtype=np.int16)) is False
+    assert view.tolist() == [7, 7]
+
+
+def test_get_times_out_when_empty():
+    """
+    Test that an empty queue returns None after the timeout.
+    """
+    frames = FrameQueue(num_slots=2, frame_length=2)
+    assert frames.get(timeout=0.01) is None
+
+
+def test_consumer_wakes_up_for_producer_thread():
+    """
+    Test that a waiting consumer receives a frame put by another thread.
+    """
+    frames = FrameQueue(num_slots=2, frame_length=2)
+    timer = threading.Timer(0.05, frames.put, args=(np.array([5, 5], dtype=np.int16),))
+    timer.start()
+
+    frame = frames.get(timeout=2)
+    timer.join()
+    assert frame.tolist() == [5, 5]
@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+
+from audio import AudioRingBuffer, CommandRecorder, RMSVAD
+
+FRAME_LENGTH = 4
+
+
+def make_frame(value, length=FRAME_LENGTH):
+    """Creates an int16 frame shaped like the (n, 1) blocks sounddevice returns."""
+    return np.full((length, 1), value, dtype=np.int16)
+
+
+def test_write_stores_pcm_and_float_views():
+    """
+    Test that a written frame is readable back as int16 and as normalized float32.
+    """
+    ring = AudioRingBuffer(capacity=16)
+    start = ring.write(make_frame(16384))
+
+    assert start == 0
+    assert ring.pcm(start).tolist() == [16384] * FRAME_LENGTH
+    assert np.allclose(ring.samples(start), 0.5)
+    assert ring.samples(start).dtype == np.float32
+
+
+def test_views_are_contiguous_across_wraparound():
+    """
+    Test that a window spanning the physical end of the buffer is still one zero-copy view.
+    """
+    ring = AudioRingBuffer(capacity=10)
+    for value in range(1, 4):
+        ring.write(make_frame(value))  # 12 samples written, so the last frame wraps
+
+    window = ring.pcm(4)
+    assert window.tolist() == [2] * 4 + [3] * 4
+    assert window.base is not None  # a view into the ring, not a copy
+
+
+def test_overwritten_window_is_rejected():
+    """
+    Test that asking for samples older than the buffer capacity raises an error.
+    """
+    ring = AudioRingBuffer(capacity=8)
+    for value in range(3):
+        ring.write(make_frame(value))
+
+    with pytest.raises(ValueError):
+        ring.samples(0)
+
+
+def test_recorder_stops_after_trailing_silence():
+    """
+    Test that the recorder ends the command once speech is followed by enough silence.
+    """
+    ring = AudioRingBuffer(capacity=64)
+    speech_events = []
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=2,
+                               no_speech_timeout_frames=10, max_recording_frames=12,
+                               on_speech_start=lambda: speech_events.append(True))
+    recorder.start()
+
+    frames = [make_frame(8000), make_frame(8000), make_frame(0), make_frame(0), make_frame(0)]
+    finished = [recorder.process_frame(ring.write(frame)) for frame in frames]
+
+    assert finished == [False, False, False, False, True]
+    assert speech_events == [True]
+    assert recorder.utterance().shape[0] == len(frames) * FRAME_LENGTH
+    assert recorder.speech_segments() == [(0, 2 * FRAME_LENGTH)]
+
+
+def test_recorder_gives_up_without_speech():
+    """
+    Test that the recorder stops when nobody speaks before the no-speech timeout.
+    """
+    ring = AudioRingBuffer(capacity=64)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=2,
+                               no_speech_timeout_frames=3, max_recording_frames=12)
+    recorder.start()
+
+    results = [recorder.process_frame(ring.write(make_frame(0))) for _ in range(4)]
+    assert results[-1] is True
+    assert not recorder.has_started_speaking
+
+
+def test_recorder_seeds_from_preroll():
+    """
+    Test that speech buffered before the recording started is kept, without arming the silence timeout.
+    """
+    ring = AudioRingBuffer(capacity=64)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=1,
+                               no_speech_timeout_frames=10, max_recording_frames=12)
+    for value in (0, 8000, 8000):
+        ring.write(make_frame(value))
+
+    recorder.start(preroll_frames=2)
+    assert recorder.start_index == FRAME_LENGTH
+    assert not recorder.has_started_speaking
+
+    results = [recorder.process_frame(ring.write(make_frame(value))) for value in (8000, 0, 0)]
+    assert results == [False, False, True]
+    assert recorder.speech_segments() == [(0, 3 * FRAME_LENGTH)]
+
+
+def test_preroll_is_classified_in_one_batch():
+    """
+    Test that the pre-roll frames reach the VAD engine as one vectorized batch, not frame by frame.
+    """
+    class CountingVAD(RMSVAD):
+        def __init__(self, threshold):
+            super().__init__(threshold)
+            self.batches = []
+
+        def detect(self, samples, frame_length):
+            self.batches.append(samples.shape[0] // frame_length)
+            return super().detect(samples, frame_length)
+
+    ring = AudioRingBuffer(capacity=64)
+    vad = CountingVAD(0.01)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=vad, silence_frames_after_speech=1,
+                               no_speech_timeout_frames=10, max_recording_frames=12)
+    for value in (0, 8000, 8000, 0):
+        ring.write(make_frame(value))
+
+    recorder.start(preroll_frames=4)
+    recorder.process_frame(ring.write(make_frame(8000)))
+    assert vad.batches == [4, 1]
+    assert recorder.speech_segments() == [(FRAME_LENGTH, 3 * FRAME_LENGTH), (4 * FRAME_LENGTH, 5 * FRAME_LENGTH)]
+
+
+def test_preroll_speech_alone_is_not_a_command():
+    """
+    Test that the wake word captured by the pre-roll is dropped when nothing follows it.
+    """
+    ring = AudioRingBuffer(capacity=64)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=1,
+                               no_speech_timeout_frames=2, max_recording_frames=12)
+    ring.write(make_frame(8000))
+
+    recorder.start(preroll_frames=5)
+    while not recorder.process_frame(ring.write(make_frame(0))):
+        pass
+    assert recorder.speech_segments() == []
+
+
+def test_complete_command_ends_after_short_silence():
+    """
+    Test that a recording marked complete ends early and reports the silence it saved.
+    """
+    ring = AudioRingBuffer(capacity=128)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=10,
+                               no_speech_timeout_frames=10, max_recording_frames=20)
+    recorder.start()
+    recorder.process_frame(ring.write(make_frame(8000)))
+    recorder.mark_complete(recorder.last_speech_end, silence_frames=2)
+
+    results = [recorder.process_frame(ring.write(make_frame(0))) for _ in range(3)]
+    assert results == [False, False, True]
+    assert recorder.ended_early
+    assert recorder.saved_frames == 8
+
+
+def test_completion_is_ignored_once_speech_resumes():
+    """
+    Test that more speech after the complete transcript falls back to the regular silence timeout.
+    """
+    ring = AudioRingBuffer(capacity=128)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=4,
+                               no_speech_timeout_frames=10, max_recording_frames=20)
+    recorder.start()
+    recorder.process_frame(ring.write(make_frame(8000)))
+    recorder.mark_complete(recorder.last_speech_end, silence_frames=1)
+    recorder.process_frame(ring.write(make_frame(8000)))
+
+    results = [recorder.process_frame(ring.write(make_frame(0))) for _ in range(5)]
+    assert results == [False, False, False, False, True]
+    assert not recorder.ended_early
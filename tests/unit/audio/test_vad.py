@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from audio import AdaptiveVAD, RMSVAD, create_vad_engine, speech_span
+
+FRAME_LENGTH = 512
+
+
+def tone(amplitude, frames=1):
+    """Creates a float32 sine tone of the given amplitude, `frames` frames long."""
+    t = np.arange(frames * FRAME_LENGTH) / 16000
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_rms_vectorized_detect_matches_per_frame():
+    """
+    Test that the vectorized RMS path agrees with classifying frame by frame.
+    """
+    vad = RMSVAD(threshold=0.01)
+    samples = np.concatenate([tone(0.001, 2), tone(0.2, 3), tone(0.0, 1)])
+
+    per_frame = [vad.is_speech(samples[i * FRAME_LENGTH:(i + 1) * FRAME_LENGTH]) for i in range(6)]
+    assert vad.detect(samples, FRAME_LENGTH).tolist() == per_frame == [False, False, True, True, True, False]
+
+
+def test_adaptive_threshold_follows_noise_floor():
+    """
+    Test that a louder background is learned so it stops counting as speech, while real speech still does.
+    """
+    vad = AdaptiveVAD(min_threshold=0.005, ratio=3.0, adaptation_rate=0.05)
+
+    for _ in range(20):
+        vad.is_speech(tone(0.002))  # quiet room
+    assert vad.threshold == pytest.approx(0.005)
+    assert vad.is_speech(tone(0.3)) is True
+
+    noisy_room = [vad.is_speech(tone(0.02)) for _ in range(200)]
+    assert noisy_room[0] is True
+    assert noisy_room[-1] is False
+    assert vad.is_speech(tone(0.3)) is True
+
+
+def test_speech_span_pads_and_clamps():
+    """
+    Test that speech segments collapse into one padded range inside the utterance.
+    """
+    assert speech_span([(100, 300), (500, 900)], length=1000, pad=200) == (0, 1000)
+    assert speech_span([(400, 500)], length=1000, pad=50) == (350, 550)
+    assert speech_span([], length=1000, pad=50) is None
+
+
+def test_unknown_engine_is_rejected():
+    """
+    Test that a misspelled engine name fails loudly instead of silently falling back.
+    """
+    with pytest.raises(ValueError):
+        create_vad_engine({'engine': 'webrtc'}, 16000, Path('.'))
@@ -0,0 +1,18 @@
+import pytest
+
+from audio import WakePhraseTrimmer
+
+
+@pytest.mark.parametrize("transcript, expected", [
+    ("Hey, Loki. Open Chrome.", "Open Chrome."),
+    ("Loki open chrome", "open chrome"),
+    ("open chrome", "open chrome"),
+    ("hey there", "hey there"),
+    ("what does loki mean", "what does loki mean"),
+    ("Lokis are fun", "Lokis are fun"),
+])
+def test_trims_leading_wake_phrase(transcript, expected):
+    """
+    Tests that only a leading wake phrase (or its tail) is removed from a transcript.
+    """
+    assert WakePhraseTrimmer("hey loki").trim(transcript) == expected
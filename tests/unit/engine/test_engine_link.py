@@ -0,0 +1,173 @@
+import time
+
+import pytest
+
+from engine_link import EngineServer, connect_to_engine
+from event_bus import (AssistantState, Error, EventBus, Heard, StateChanged, Status, TextInput, decode_message,
+                       encode_message)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def collect(bus, count, timeout=2.0):
+    events = []
+    deadline = time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events.extend(bus.events.get_batch(timeout=0.1))
+    return events
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def engine(request, tmp_path):
+    address = str(tmp_path / "engine.sock") if request.param == "unix" else ("127.0.0.1", 0)
+    bus = EventBus()
+    server = EngineServer(bus, address)
+    server.start()
+    yield bus, server
+    server.close()
+
+
+def test_messages_survive_encoding():
+    """
+    Test that events and commands, including the assistant state, round-trip through the wire format.
+    """
+    for message in (StateChanged(AssistantState.PROCESSING), Heard("open chrome"), TextInput("what time is it")):
+        assert decode_message(encode_message(message).strip()) == message
+
+
+def test_unknown_messages_are_rejected():
+    """
+    Test that malformed or unknown messages raise ValueError instead of building an object.
+    """
+    for line in (b"not json", b'{"type": "os.system", "command": "rm"}', b'{"type": "Heard"}'):
+        with pytest.raises(ValueError):
+            decode_message(line)
+
+
+def test_events_reach_every_attached_front_end(engine):
+    """
+    Test that each event published by the worker is delivered to all attached front-ends.
+    """
+    bus, server = engine
+    gui, console = connect_to_engine(server.address), connect_to_engine(server.address)
+    assert wait_for(lambda: server.client_count == 2)
+
+    bus.publish(Heard("open chrome"))
+
+    assert collect(gui, 1) == [Heard("open chrome")]
+    assert collect(console, 1) == [Heard("open chrome")]
+    gui.close()
+    console.close()
+
+
+def test_late_front_end_receives_current_state(engine):
+    """
+    Test that a front-end attaching later first gets the current state and status.
+    """
+    bus, server = engine
+    first = connect_to_engine(server.address)
+    assert wait_for(lambda: server.client_count == 1)
+    bus.publish(StateChanged(AssistantState.LISTENING))
+    bus.publish(Status("Listening for command..."))
+    assert len(collect(first, 2)) == 2
+
+    late = connect_to_engine(server.address)
+
+    assert collect(late, 2) == [StateChanged(AssistantState.LISTENING), Status("Listening for command...")]
+    first.close()
+    late.close()
+
+
+def test_text_commands_reach_the_worker(engine):
+    """
+    Test that a text command sent by a front-end arrives on the worker's command channel.
+    """
+    bus, server = engine
+    front_end = connect_to_engine(server.address)
+
+    front_end.submit(TextInput("open notepad"))
+
+    assert bus.commands.get(timeout=2) == TextInput("open notepad")
+    front_end.close()
+
+
+def test_detaching_leaves_the_engine_running(engine):
+    """
+    Test that a front-end can detach and a new one attach without restarting the engine.
+    """
+    bus, server = engine
+    connect_to_engine(server.address).close()
+    assert wait_for(lambda: server.client_count == 0)
+
+    again = connect_to_engine(server.address)
+    assert wait_for(lambda: server.client_count == 1)
+    bus.publish(Heard("still here"))
+    assert collect(again, 1) == [Heard("still here")]
+    again.close()
+
+
+def test_front_end_notices_engine_shutdown(engine):
+    """
+    Test that the front-end reports an error and closes its channel when the engine goes away.
+    """
+    bus, server = engine
+    front_end = connect_to_engine(server.address)
+    assert wait_for(lambda: server.client_count == 1)
+
+    server.close()
+
+    events = collect(front_end, 1)
+    assert wait_for(lambda: not front_end.connected)
+    assert isinstance(events[0], Error)
+
+
+def test_connect_returns_none_without_engine(tmp_path):
+    """
+    Test that looking for an engine that is not running fails fast instead of raising.
+    """
+    assert connect_to_engine(str(tmp_path / "missing.sock"), timeout=0.1) is None
+
+
+def test_second_engine_is_refused_without_leaking_the_probe(tmp_path, monkeypatch):
+    """
+    Test that starting an engine on a live engine's socket raises, and closes the socket used to probe it.
+    """
+    import engine_link
+
+    address = str(tmp_path / "engine.sock")
+    first = EngineServer(EventBus(), address)
+    first.start()
+    probes = []
+
+    def connect(*args, **kwargs):
+        probes.append(original_connect(*args, **kwargs))
+        return probes[-1]
+
+    original_connect = engine_link._connect
+    monkeypatch.setattr(engine_link, "_connect", connect)
+    try:
+        with pytest.raises(RuntimeError, match="already listening"):
+            EngineServer(EventBus(), address).start()
+    finally:
+        first.close()
+    assert probes[0].fileno() == -1
+
+
+def test_second_engine_is_refused_on_tcp():
+    """
+    Test that the TCP fallback also refuses to start on the port of a live engine.
+    """
+    first = EngineServer(EventBus(), ("127.0.0.1", 0))
+    first.start()
+    try:
+        with pytest.raises(RuntimeError, match="already listening"):
+            EngineServer(EventBus(), first.address).start()
+    finally:
+        first.close()
@@ -0,0 +1,51 @@
+import threading
+
+from event_bus import Channel, EventBus, Heard, Status, TextInput
+
+
+def test_burst_is_delivered_as_one_batch():
+    """
+    Test that events queued in a burst are handed over together, in order.
+    """
+    channel = Channel()
+    for i in range(5):
+        channel.put(Status(f"step {i}"))
+
+    assert channel.get_batch(timeout=1) == [Status(f"step {i}") for i in range(5)]
+    assert channel.drain() == []
+
+
+def test_consumer_blocks_until_an_item_arrives():
+    """
+    Test that get() waits for a producer instead of polling, and returns None on timeout.
+    """
+    channel = Channel()
+    assert channel.get(timeout=0.01) is None
+
+    threading.Timer(0.05, channel.put, args=(TextInput("open chrome"),)).start()
+
+    assert channel.get(timeout=2) == TextInput("open chrome")
+
+
+def test_close_wakes_waiting_consumer_after_remaining_items():
+    """
+    Test that closing a channel still delivers queued items, then unblocks the consumer with None.
+    """
+    channel = Channel()
+    channel.put(TextInput("what time is it"))
+    channel.close()
+
+    assert channel.get() == TextInput("what time is it")
+    assert channel.get() is None
+
+
+def test_events_and_commands_use_separate_channels():
+    """
+    Test that the worker's events never show up on the command channel it reads, and vice versa.
+    """
+    bus = EventBus()
+    bus.publish(Heard("open chrome"))
+    bus.submit(TextInput("mute"))
+
+    assert bus.commands.drain() == [TextInput("mute")]
+    assert bus.events.drain() == [Heard("open chrome")]
@@ -0,0 +1,76 @@
+import numpy as np
+
+from intent.embedding_cache import EmbeddingCache
+
+
+class CountingEncoder:
+    """Encodes a text as [len(text), number of vowels]; records which texts it was asked for."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(text), sum(c in "aeiou" for c in text)] for text in texts], dtype=np.float32)
+
+
+def test_unchanged_data_is_loaded_without_encoding(tmp_path):
+    """
+    Test that a second start with the same examples loads the cached, memory-mapped embeddings.
+    """
+    texts = ["open chrome", "what time is it", "mute the volume"]
+    first_encoder, second_encoder = CountingEncoder(), CountingEncoder()
+
+    first = EmbeddingCache(tmp_path, "mpnet", "rev1").load_or_encode(texts, first_encoder)
+    second = EmbeddingCache(tmp_path, "mpnet", "rev1").load_or_encode(texts, second_encoder)
+
+    assert first_encoder.encoded == texts
+    assert second_encoder.encoded == []
+    assert isinstance(second, np.memmap)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_only_changed_examples_are_encoded(tmp_path):
+    """
+    Test that after editing the training data only the new examples are encoded, in the new order.
+    """
+    EmbeddingCache(tmp_path, "mpnet", "rev1").load_or_encode(["open chrome", "what time is it"], CountingEncoder())
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(tmp_path, "mpnet", "rev1")
+
+    embeddings = cache.load_or_encode(["what time is it", "close notepad", "open chrome"], encoder)
+
+    assert encoder.encoded == ["close notepad"]
+    assert (cache.reused, cache.encoded) == (2, 1)
+    np.testing.assert_array_equal(embeddings, CountingEncoder()(["what time is it", "close notepad", "open chrome"]))
+    assert len(list(cache.path.glob("embeddings-*.npy"))) == 1  # The previous version was removed
+
+
+def test_new_model_revision_does_not_reuse_embeddings(tmp_path):
+    """
+    Test that embeddings cached for one model revision are not used for another.
+    """
+    texts = ["open chrome"]
+    EmbeddingCache(tmp_path, "mpnet", "rev1").load_or_encode(texts, CountingEncoder())
+    encoder = CountingEncoder()
+
+    EmbeddingCache(tmp_path, "mpnet", "rev2").load_or_encode(texts, encoder)
+
+    assert encoder.encoded == texts
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    """
+    Test that a damaged cache file is ignored and re-encoded instead of crashing startup.
+    """
+    texts = ["open chrome", "what time is it"]
+    cache = EmbeddingCache(tmp_path, "mpnet", "rev1")
+    cache.load_or_encode(texts, CountingEncoder())
+    for path in cache.path.glob("embeddings-*.npy"):
+        path.write_bytes(b"garbage")
+    encoder = CountingEncoder()
+
+    embeddings = EmbeddingCache(tmp_path, "mpnet", "rev1").load_or_encode(texts, encoder)
+
+    assert encoder.encoded == texts
+    assert embeddings.shape == (2, 2)
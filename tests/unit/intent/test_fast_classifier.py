@@ -1,9 +1,11 @@
 import json
+import time
 from pathlib import Path
 
 import pytest
 
-from intent import FastClassifier
+from intent import FastClassifier, RoutingPolicy
+from nlp_service import Utterance
 
 # Define a small, controlled set of intents for testing
 TEST_INTENTS = [
@@ -82,3 +84,123 @@ def test_empty_transcript(fast_classifier_instance):
     result = fast_classifier_instance.classify(transcript)
     assert result['type'] == 'unknown'
     assert result['confidence'] == 0.0
+
+
+def test_classify_batch_matches_classify(fast_classifier_instance):
+    """
+    Test that classifying a batch gives the same results, in the same order, as classifying each item.
+    """
+    transcripts = ["can you launch notepad", "", "calculate what is 10 x 5", "what is the weather like in london"]
+    batch_results = fast_classifier_instance.classify_batch(transcripts)
+    single_results = [fast_classifier_instance.classify(transcript) for transcript in transcripts]
+
+    assert len(batch_results) == len(transcripts)
+    for batch_result, single_result in zip(batch_results, single_results):
+        assert batch_result.keys() == single_result.keys()
+        assert batch_result['type'] == single_result['type']
+        assert batch_result.get('action') == single_result.get('action')
+        assert batch_result['confidence'] == pytest.approx(single_result['confidence'], abs=1e-5)
+
+
+def test_classify_batch_of_nothing(fast_classifier_instance):
+    """
+    Test that an empty batch returns an empty list without running the model.
+    """
+    assert fast_classifier_instance.classify_batch([]) == []
+
+
+def test_reload_encodes_only_new_examples(tmp_path):
+    """
+    Test that reloading picks up added and removed examples and encodes only the added ones.
+    """
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps(TEST_INTENTS))
+    classifier = FastClassifier(intents_path=intents_path, model_name="all-MiniLM-L6-v2", threshold=0.70)
+
+    added = {"text": "mute the volume", "type": "system_control", "action": "mute"}
+    intents_path.write_text(json.dumps(TEST_INTENTS[1:] + [added]))
+    summary = classifier.reload()
+
+    assert summary["added"] == 1
+    assert summary["removed"] == 1
+    assert summary["encoded"] == 1
+    assert classifier.version == 1
+    assert len(classifier.known_intents) == len(classifier.known_embeddings) == len(TEST_INTENTS)
+    assert classifier.classify("mute the volume")["action"] == "mute"
+
+
+def test_watcher_reloads_changed_file(tmp_path):
+    """
+    Test that the watcher reloads the examples after the file changes, and then calls on_reload.
+    """
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps(TEST_INTENTS))
+    classifier = FastClassifier(intents_path=intents_path, model_name="all-MiniLM-L6-v2", threshold=0.70)
+    reloads = []
+    classifier.watch(interval=0.01, on_reload=lambda: reloads.append(classifier.version))
+    try:
+        intents_path.write_text(json.dumps(TEST_INTENTS[:3]))
+        deadline = time.monotonic() + 5
+        while classifier.version == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        classifier.close()
+
+    assert classifier.version >= 1
+    assert len(classifier.known_intents) == 3
+    assert reloads and reloads[0] >= 1
+
+
+def test_result_lists_candidate_intents(fast_classifier_instance):
+    """
+    Test that a result carries the candidate intents of its nearest examples, best first.
+    """
+    result = fast_classifier_instance.classify("launch notepad")
+    candidates = result["candidates"]
+
+    assert candidates[0]["action"] == result["action"]
+    assert candidates[0]["score"] == result["confidence"]
+    assert [c["score"] for c in candidates] == sorted((c["score"] for c in candidates), reverse=True)
+    assert sum(c["votes"] for c in candidates) == min(fast_classifier_instance.top_k, len(TEST_INTENTS))
+
+
+def test_result_reports_margin_and_route(fast_classifier_instance):
+    """
+    Test that results carry the margin over the runner-up intent and the route chosen for them.
+    """
+    result = fast_classifier_instance.classify("launch notepad")
+    candidates = result["candidates"]
+
+    assert result["route"] == "fast"
+    if len(candidates) > 1:
+        assert result["margin"] == pytest.approx(candidates[0]["score"] - candidates[1]["score"])
+    assert fast_classifier_instance.classify("")["route"] == "llm"
+
+
+def test_margin_is_unknown_without_a_runner_up_intent(tmp_path):
+    """
+    Test that when every neighbour is of one intent, the margin is None and cannot accept a weak match.
+    """
+    intents_path = tmp_path / "intents.json"
+    intents_path.write_text(json.dumps(TEST_INTENTS))
+    classifier = FastClassifier(intents_path=intents_path, model_name="all-MiniLM-L6-v2", threshold=0.99,
+                                top_k=1, routing_policy=RoutingPolicy(0.99, margin=0.0, margin_floor=0.0))
+
+    result = classifier.classify("open notepad")
+
+    assert len(result["candidates"]) == 1
+    assert result["margin"] is None
+    assert result["route"] == "llm"
+
+
+def test_classify_accepts_parsed_utterance(fast_classifier_instance):
+    """
+    Test that an Utterance (whose parse NER reuses) classifies the same as its plain text.
+    """
+    utterance = Utterance("can you launch notepad")
+    by_utterance = fast_classifier_instance.classify(utterance)
+    by_text = fast_classifier_instance.classify("can you launch notepad")
+
+    assert by_utterance["transcript"] == "can you launch notepad"
+    assert by_utterance["action"] == by_text["action"]
+    assert by_utterance["confidence"] == pytest.approx(by_text["confidence"])
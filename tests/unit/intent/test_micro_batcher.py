@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from intent import MicroBatcher
+
+
+class RecordingEncoder:
+    """Encodes a text as [len(text), index of the call]; records the size of every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        return np.array([[len(text), len(self.calls)] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_calls_share_one_encode():
+    """
+    Test that calls arriving within the window are encoded together and each caller gets its own rows.
+    """
+    encoder = RecordingEncoder()
+    batcher = MicroBatcher(encoder, window=0.2, max_batch_size=32)
+    texts = [["a"], ["bb", "ccc"], ["dddd"]]
+    try:
+        with ThreadPoolExecutor(3) as pool:
+            results = list(pool.map(batcher, texts))
+    finally:
+        batcher.close()
+
+    assert encoder.calls == [4]
+    assert [result[:, 0].tolist() for result in results] == [[1], [2, 3], [4]]
+    assert batcher.stats()["batches"] == 1
+    assert batcher.stats()["requests"] == 3
+
+
+def test_full_batch_does_not_wait_for_the_window():
+    """
+    Test that a batch is encoded as soon as max_batch_size texts are pending.
+    """
+    encoder = RecordingEncoder()
+    batcher = MicroBatcher(encoder, window=10, max_batch_size=2)
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            futures = [pool.submit(batcher, ["a"]), pool.submit(batcher, ["b"])]
+            results = [future.result(timeout=2) for future in futures]
+    finally:
+        batcher.close()
+
+    assert [len(result) for result in results] == [1, 1]
+    assert sum(encoder.calls) == 2
+
+
+def test_oversized_request_is_encoded_alone():
+    """
+    Test that a single request larger than max_batch_size is still encoded, in one call.
+    """
+    encoder = RecordingEncoder()
+    batcher = MicroBatcher(encoder, window=0.001, max_batch_size=2)
+    try:
+        result = batcher(["a", "b", "c", "d"])
+    finally:
+        batcher.close()
+
+    assert encoder.calls == [4]
+    assert len(result) == 4
+
+
+def test_encoder_errors_reach_every_caller():
+    """
+    Test that an exception raised by the encoder is re-raised in the waiting callers.
+    """
+    def failing_encoder(texts):
+        raise ValueError("model crashed")
+
+    batcher = MicroBatcher(failing_encoder, window=0.001, max_batch_size=8)
+    try:
+        with pytest.raises(ValueError, match="model crashed"):
+            batcher(["a"])
+    finally:
+        batcher.close()
+
+
+def test_batch_callback_reports_size_and_delays():
+    """
+    Test that the on_batch callback receives the batch size and one queueing delay per request.
+    """
+    observed = []
+    batcher = MicroBatcher(RecordingEncoder(), window=0.001, max_batch_size=8)
+    batcher.on_batch = lambda size, delays: observed.append((size, len(delays)))
+    try:
+        batcher(["a", "b"])
+    finally:
+        batcher.close()
+
+    assert observed == [(2, 1)]
+    assert batcher.stats()["queue_delay_ms_p95"] >= 0
+
+
+def test_closed_batcher_rejects_calls():
+    """
+    Test that calling a closed batcher raises instead of blocking forever.
+    """
+    batcher = MicroBatcher(RecordingEncoder(), window=0.001, max_batch_size=8)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher(["a"])
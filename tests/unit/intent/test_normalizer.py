@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from build_lemma_table import vocabulary_lemmas
+from intent import LookupNormalizer, SpacyNormalizer
+from intent.normalizer import create_normalizer, spacy_model_id
+from nlp_service import Utterance, get_nlp
+
+TEXTS = ["open chrome", "could you launch notepad please", "make it louder", "what is 5 times 8",
+         "Turn the volume down.", "what time is it"]
+
+
+def test_lookup_agrees_with_spacy_on_its_vocabulary():
+    """
+    Test that a table built from some texts lemmatizes them exactly like the full pipeline.
+    """
+    table, _ = vocabulary_lemmas(TEXTS)
+    lookup = LookupNormalizer(table)
+
+    assert lookup.normalize([Utterance(text) for text in TEXTS]) == \
+        SpacyNormalizer().normalize([Utterance(text) for text in TEXTS])
+
+
+def test_known_words_are_not_parsed():
+    """
+    Test that an utterance made of table words and numbers is lemmatized without running spaCy.
+    """
+    lookup = LookupNormalizer({"launch": "launch", "notepad": "notepad", "what": "what", "is": "be",
+                               "times": "time"})
+    utterances = [Utterance("Launch notepad"), Utterance("what is 12 times 3")]
+
+    assert lookup.normalize(utterances) == ["launch notepad", "what be 12 time 3"]
+    assert all(utterance._doc is None for utterance in utterances)
+    assert lookup.stats()["spacy_fallbacks"] == 0
+
+
+def test_unknown_words_fall_back_to_spacy():
+    """
+    Test that only the out-of-vocabulary words take their lemma from the spaCy parse.
+    """
+    lookup = LookupNormalizer({"open": "OPEN-FROM-TABLE"})
+    utterance = Utterance("open blender")
+
+    lemmas = lookup.normalize([utterance])[0]
+
+    assert lemmas == "OPEN-FROM-TABLE " + utterance.doc[1].lemma_.lower()
+    assert lookup.stats()["spacy_fallbacks"] == 1
+
+
+def test_create_normalizer_needs_a_matching_table(tmp_path):
+    """
+    Test that the lookup mode falls back to spaCy without a table or with one built for another model.
+    """
+    table_path = tmp_path / "lemma_table.json"
+    assert isinstance(create_normalizer("lookup", table_path), SpacyNormalizer)
+
+    table_path.write_text(json.dumps({"spacy_model": "en_other_model-0.0.1", "entries": {}}))
+    assert isinstance(create_normalizer("lookup", table_path), SpacyNormalizer)
+
+    table_path.write_text(json.dumps({"spacy_model": spacy_model_id(get_nlp()), "entries": {"open": "open"}}))
+    assert isinstance(create_normalizer("lookup", table_path), LookupNormalizer)
+
+    with pytest.raises(ValueError):
+        create_normalizer("stemmer", table_path)
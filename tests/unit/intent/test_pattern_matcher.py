@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+from intent import PatternMatcher
+
+TEMPLATES = [
+    {"type": "system_control", "action": "launch_application",
+     "prompts": ["open {app_name}", "open up {app_name}", "please launch {app_name} for me", "run {app_name}",
+                 "load {app_name}", "show me {app_name}"]},
+    {"type": "calculation", "action": "evaluate_expression", "prompts": ["what is {expression}"]},
+    {"type": "volume_control", "action": "set_volume",
+     "prompts": ["set volume to {level}", "volume {level} percent please"]},
+    {"type": "volume_control", "action": "increase_volume", "prompts": ["volume up", "louder please"]},
+    {"type": "power_control", "action": "shutdown", "prompts": ["shutdown", "shut down the computer"]},
+    {"type": "unknown", "action": "unhandled", "prompts": ["open the garage door", "what is the meaning of life"]},
+]
+
+
+@pytest.fixture
+def matcher():
+    shortcuts = [{"phrase": "browser", "type": "system_control", "action": "launch_application",
+                  "parameters": {"APP_NAME": "chrome"}}]
+    return PatternMatcher(TEMPLATES, shortcuts, app_names=["Chrome", "Visual Studio", "notepad", "task manager"])
+
+
+@pytest.mark.parametrize("transcript, action, parameters", [
+    ("Open Chrome.", "launch_application", {"APP_NAME": "chrome"}),
+    ("open up visual studio please", "launch_application", {"APP_NAME": "visual studio"}),
+    ("Can you launch notepad for me?", "launch_application", {"APP_NAME": "notepad"}),
+    ("what is 5 times 8?", "evaluate_expression", {"MATH_EXPRESSION": "5 times 8"}),
+    ("what is two plus two", "evaluate_expression", {"MATH_EXPRESSION": "two plus two"}),
+    ("open the task manager", "launch_application", {"APP_NAME": "task manager"}),
+    ("what is (10 + 5) * 3", "evaluate_expression", {"MATH_EXPRESSION": "(10 + 5) * 3"}),
+    ("what is the square root of 144", "evaluate_expression", {"MATH_EXPRESSION": "the square root of 144"}),
+    ("what is 3 factorial", "evaluate_expression", {"MATH_EXPRESSION": "3 factorial"}),
+    ("what is 2 to the power of 8", "evaluate_expression", {"MATH_EXPRESSION": "2 to the power of 8"}),
+    ("set volume to 50 percent", "set_volume", {"level": "50"}),
+    ("volume 40 percent", "set_volume", {"level": "40"}),
+    ("set volume to 100", "set_volume", {"level": "100"}),
+    ("set volume to 0", "set_volume", {"level": "0"}),
+    ("louder", "increase_volume", {}),
+    ("browser", "launch_application", {"APP_NAME": "chrome"}),
+])
+def test_matches_templates_and_extracts_slots(matcher, transcript, action, parameters):
+    """
+    Test that commands following a template (politeness and punctuation aside) are recognized with their slots.
+    """
+    intent = matcher.match(transcript)
+    assert intent["action"] == action
+    assert intent["parameters"] == parameters
+    assert intent["transcript"] == transcript
+    assert intent["tier"] == 0
+
+
+@pytest.mark.parametrize("transcript", [
+    "open the garage door",
+    "please open the garage door",
+    "what is the meaning of life",
+    "what is the capital of france",
+    "play some music",
+    "",
+    "open the door",
+    "run a marathon",
+    "launch the missiles",
+    "load the dishwasher",
+    "show me how to cook pasta",
+    "open obsidian",
+    "what is 1984 about",
+    "what is 1984",
+    "what is one direction",
+    "set volume to 500",
+    "set volume to 101 percent",
+])
+def test_passes_on_everything_else(matcher, transcript):
+    """
+    Test that unknown-intent phrases, free text in a slot and texts that fit no template are left to the FastClassifier.
+    """
+    assert matcher.match(transcript) is None
+
+
+def test_stats_count_hits_and_misses(matcher):
+    """
+    Test that the hit rate and latency are reported.
+    """
+    matcher.match("volume up")
+    matcher.match("play some music")
+
+    stats = matcher.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["mean_latency_us"] > 0
+
+
+def test_app_name_templates_need_known_apps():
+    """
+    Test that without a list of app names, no free text is ever taken for one.
+    """
+    matcher = PatternMatcher(TEMPLATES)
+    assert matcher.match("open chrome") is None
+    assert matcher.match("what is 5 times 8")["parameters"] == {"MATH_EXPRESSION": "5 times 8"}
+
+
+def test_intents_with_their_own_threshold_are_left_to_the_classifier():
+    """
+    Test that power_control phrases fall through to the classifier, so its stricter threshold still applies.
+    """
+    assert PatternMatcher(TEMPLATES).match("shutdown")["action"] == "shutdown"
+
+    matcher = PatternMatcher(TEMPLATES, excluded_intents={"power_control": 0.75}.keys())
+    assert matcher.match("shutdown") is None
+    assert matcher.match("please shut down the computer") is None
+    assert matcher.match("volume up")["action"] == "increase_volume"
+    assert PatternMatcher(TEMPLATES, excluded_intents=["power_control.shutdown"]).match("shutdown") is None
+
+
+def test_reload_picks_up_edited_templates(tmp_path):
+    """
+    Test that reloading recompiles the templates file, so tier 0 follows edits without a restart.
+    """
+    templates_path = tmp_path / "intents.json"
+    templates_path.write_text(json.dumps(TEMPLATES))
+    matcher = PatternMatcher.from_files(templates_path, app_names=["chrome"])
+    assert matcher.match("fire up chrome") is None
+
+    edited = TEMPLATES + [{"type": "system_control", "action": "launch_application", "prompts": ["fire up {app_name}"]}]
+    templates_path.write_text(json.dumps(edited))
+    matcher.reload()
+
+    assert matcher.match("fire up chrome")["parameters"] == {"APP_NAME": "chrome"}
+    with pytest.raises(ValueError):
+        PatternMatcher(TEMPLATES).reload()
@@ -0,0 +1,58 @@
+from intent import RoutingPolicy
+from intent.routing import FAST, LLM, REPEAT
+
+
+def candidate(score: float, intent_type: str = "system_control", action: str = "launch_application") -> dict:
+    return {"type": intent_type, "action": action, "score": score}
+
+
+def test_threshold_only_policy_matches_previous_behaviour():
+    """
+    Test that without a margin, only scores below the threshold go to the LLM.
+    """
+    policy = RoutingPolicy(threshold=0.6)
+    assert policy.route([candidate(0.6)], margin=0.0) == FAST
+    assert policy.route([candidate(0.59)], margin=0.5) == LLM
+    assert policy.route([], margin=0.0) == LLM
+
+
+def test_clear_winner_below_threshold_takes_fast_path():
+    """
+    Test that an intent far ahead of the runner-up is trusted below the threshold, but not below the floor.
+    """
+    policy = RoutingPolicy(threshold=0.6, margin=0.15, margin_floor=0.45)
+    assert policy.route([candidate(0.5), candidate(0.3, "calculation")], margin=0.2) == FAST
+    assert policy.route([candidate(0.5), candidate(0.4, "calculation")], margin=0.1) == LLM
+    assert policy.route([candidate(0.4), candidate(0.1, "calculation")], margin=0.3) == LLM
+    assert policy.route([candidate(0.5)], margin=None) == LLM  # No runner-up intent to lead
+
+
+def test_intent_thresholds_are_not_relaxed_by_margin():
+    """
+    Test that intents with their own threshold need to reach it, whatever the margin.
+    """
+    policy = RoutingPolicy(threshold=0.6, margin=0.1, intent_thresholds={"power_control": 0.8,
+                                                                         "general.get_time": 0.5})
+    assert policy.route([candidate(0.7, "power_control", "shutdown")], margin=0.7) == LLM
+    assert policy.route([candidate(0.8, "power_control", "shutdown")], margin=0.0) == FAST
+    assert policy.route([candidate(0.55, "general", "get_time")], margin=0.0) == FAST
+
+
+def test_unknown_and_unclear_transcripts():
+    """
+    Test that unknown-intent matches go to the LLM and very low scores ask the user to repeat.
+    """
+    policy = RoutingPolicy(threshold=0.6, repeat_below=0.2)
+    assert policy.route([candidate(0.9, "unknown", "unhandled")], margin=0.5) == LLM
+    assert policy.route([candidate(0.1)], margin=0.1) == REPEAT
+    assert policy.route([], margin=0.0) == REPEAT
+
+
+def test_default_policy_never_asks_to_repeat():
+    """
+    Test that with repeat_below at its default of 0, negative scores and empty results still reach the LLM.
+    """
+    policy = RoutingPolicy(threshold=0.6, margin=0.15, margin_floor=0.45)
+    assert policy.route([candidate(-0.2)], margin=None) == LLM
+    assert policy.route([candidate(-0.1), candidate(-0.3, "calculation")], margin=0.2) == LLM
+    assert policy.route([], margin=None) == LLM
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from intent import SimilarityIndex
+
+EXAMPLES = [
+    {"text": "open chrome", "type": "system_control", "action": "launch_application"},
+    {"text": "launch notepad", "type": "system_control", "action": "launch_application"},
+    {"text": "what is 2 plus 2", "type": "calculation", "action": "evaluate_expression"},
+    {"text": "hello there", "type": "unknown"},
+]
+EMBEDDINGS = np.array([
+    [1.0, 0.0, 0.0],
+    [0.8, 0.6, 0.0],
+    [0.0, 1.0, 0.0],
+    [0.0, 0.0, 2.0],  # Not unit length: the index normalizes it
+], dtype=np.float32)
+
+
+@pytest.fixture
+def index():
+    return SimilarityIndex(EXAMPLES, EMBEDDINGS)
+
+
+def test_search_matches_cosine_similarity(index):
+    """
+    Test that the neighbours and their scores are the cosine similarities, best first.
+    """
+    query = np.array([[2.0, 1.0, 0.0], [0.0, 0.0, 1.0]], dtype=np.float32)
+    expected = (query / np.linalg.norm(query, axis=1, keepdims=True)) @ \
+        (EMBEDDINGS / np.linalg.norm(EMBEDDINGS, axis=1, keepdims=True)).T
+
+    results = index.search(query, k=2)
+
+    for row, neighbours in enumerate(results):
+        best = np.argsort(-expected[row])[:2].tolist()
+        assert [i for i, _ in neighbours] == best
+        assert [score for _, score in neighbours] == pytest.approx(expected[row, best].tolist(), abs=1e-6)
+
+
+def test_search_with_k_larger_than_index(index):
+    """
+    Test that asking for more neighbours than there are examples returns all of them.
+    """
+    assert len(index.search(np.ones((1, 3)), k=10)[0]) == len(EXAMPLES)
+
+
+def test_empty_index_finds_nothing():
+    """
+    Test that an index without examples returns no neighbours instead of failing.
+    """
+    assert SimilarityIndex([], None).search(np.ones((2, 3)), k=5) == [[], []]
+
+
+def test_aggregation_methods(index):
+    """
+    Test that max, mean and vote rank the intents of the neighbours as documented.
+    """
+    neighbours = [(2, 0.9), (0, 0.85), (1, 0.8)]
+
+    by_max = index.aggregate(neighbours, "max")
+    assert by_max[0]["type"] == "calculation"
+    assert by_max[0]["score"] == 0.9
+
+    by_mean = index.aggregate(neighbours, "mean")
+    assert by_mean[0]["type"] == "calculation"
+    assert by_mean[1]["score"] == pytest.approx(0.825)
+
+    by_vote = index.aggregate(neighbours, "vote")
+    assert by_vote[0]["action"] == "launch_application"
+    assert by_vote[0]["votes"] == 2
+    assert by_vote[0]["score"] == 0.85
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from speculative_nlu import SpeculativeNLU
+
+
+@pytest.fixture
+def nlu():
+    fast_classifier = MagicMock()
+    fast_classifier.classify.side_effect = lambda utterance: {
+        "type": "system_control", "action": "launch_application", "confidence": 0.9,
+        "parameters": {}, "transcript": utterance.text
+    }
+    ner_predictor = MagicMock()
+    ner_predictor.predict.return_value = {"APP_NAME": "chrome"}
+    return SpeculativeNLU(fast_classifier, ner_predictor, cache_size=2)
+
+
+def test_final_transcript_reuses_partial_result(nlu):
+    """
+    Test that a final transcript differing only in case and punctuation is a cache hit.
+    """
+    nlu.speculate("open chrome")
+    intent, entities = nlu.lookup("Open Chrome.")
+
+    assert intent["action"] == "launch_application"
+    assert intent["transcript"] == "Open Chrome."
+    assert entities == {"APP_NAME": "chrome"}
+    assert nlu.fast_classifier.classify.call_count == 1
+    assert nlu.stats()["hits"] == 1
+
+
+def test_lookup_returns_independent_copies(nlu):
+    """
+    Test that mutating a looked-up intent (as the worker does with parameters) leaves the cache intact.
+    """
+    nlu.speculate("open chrome")
+    intent, _ = nlu.lookup("open chrome")
+    intent["parameters"]["APP_NAME"] = "mutated"
+
+    assert nlu.lookup("open chrome")[0]["parameters"] == {}
+
+
+def test_repeated_partials_are_classified_once(nlu):
+    """
+    Test that the same partial transcript is only classified once.
+    """
+    nlu.speculate("open chrome")
+    nlu.speculate("open chrome")
+    assert nlu.fast_classifier.classify.call_count == 1
+
+
+def test_cache_evicts_oldest_entries(nlu):
+    """
+    Test that the cache keeps only the most recently used partial transcripts.
+    """
+    for text in ("open", "open chrome", "open chrome please"):
+        nlu.speculate(text)
+
+    assert nlu.lookup("open") is None
+    assert nlu.lookup("open chrome please") is not None
+
+
+def test_reloaded_training_data_clears_cache(nlu):
+    """
+    Test that results cached before the classifier reloaded its examples are not reused.
+    """
+    nlu.fast_classifier.version = 0
+    nlu._classifier_version = 0
+    nlu.speculate("open chrome")
+    nlu.fast_classifier.version = 1
+
+    assert nlu.lookup("open chrome") is None
+    assert nlu.stats()["cached"] == 0
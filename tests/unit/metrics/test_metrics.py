@@ -0,0 +1,79 @@
+import json
+import urllib.request
+
+import pytest
+
+from metrics import MetricsRegistry, MetricsTraceExporter
+from tracing import Tracer
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry(window=100)
+    yield registry
+    registry.close()
+
+
+def test_summary_reports_percentiles_over_recent_window(registry):
+    """
+    Test that quantiles only cover the most recent `window` observations while count and sum cover all.
+    """
+    summary = registry.summary("loki_stt_seconds", "STT latency.")
+    for _ in range(50):
+        summary.observe(10.0)  # Pushed out of the window below
+    for value in range(1, 101):
+        summary.observe(value / 100)
+
+    [series] = summary.snapshot()
+    assert series["count"] == 150
+    assert series["sum"] == pytest.approx(500 + 50.5)
+    assert series["p50"] == pytest.approx(0.505)
+    assert series["p99"] == pytest.approx(0.9901)
+
+
+def test_prometheus_text_format(registry):
+    """
+    Test that counters, gauges and labelled summaries render in the Prometheus text format.
+    """
+    registry.counter("loki_wake_word_activations_total", "Wake word detections.").inc(3)
+    registry.gauge("loki_tts_queue_depth", "Queued responses.", source=lambda: 2)
+    registry.summary("loki_agent_execute_seconds", "Agent time.", ("agent",)).observe(0.25, agent="calculation")
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE loki_wake_word_activations_total counter\nloki_wake_word_activations_total 3\n" in text
+    assert "loki_tts_queue_depth 2\n" in text
+    assert 'loki_agent_execute_seconds{agent="calculation",quantile="0.95"} 0.25\n' in text
+    assert 'loki_agent_execute_seconds_count{agent="calculation"} 1\n' in text
+
+
+def test_http_endpoint_and_snapshot_file(registry, tmp_path):
+    """
+    Test that /metrics is served locally and the snapshot file is valid JSON.
+    """
+    registry.counter("loki_commands_total").inc()
+    registry.start_http_server(port=0)
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{registry.http_port}/metrics", timeout=5) as response:
+        body = response.read().decode()
+    registry.write_snapshot(tmp_path / "metrics.json")
+
+    assert "loki_commands_total 1" in body
+    assert json.loads((tmp_path / "metrics.json").read_text())["loki_commands_total"] == 1
+
+
+def test_finished_traces_feed_stage_and_agent_latencies(registry):
+    """
+    Test that every span of a finished trace becomes a stage latency, and dispatch spans an agent latency.
+    """
+    tracer = Tracer([MetricsTraceExporter(registry)])
+    trace = tracer.start_trace("voice_command")
+    trace.add_span("transcribe", 0.0, 0.4)
+    trace.add_span("dispatch", 0.4, 0.5, intent_type="system_control")
+    trace.finish()
+
+    stages = {series["stage"]: series for series in registry.summary("loki_stage_duration_seconds").snapshot()}
+    [agent] = registry.summary("loki_agent_execute_seconds").snapshot()
+    assert stages["transcribe"]["p50"] == pytest.approx(0.4)
+    assert stages["dispatch"]["count"] == 1
+    assert agent["agent"] == "system_control"
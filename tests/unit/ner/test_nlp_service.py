@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nlp_service
+from nlp_service import Utterance, analyze_batch, get_nlp
+
+
+class CountingNLP:
+    """Wraps the shared pipeline and counts the texts it parses."""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.parsed = []
+
+    def __call__(self, text):
+        self.parsed.append(text)
+        return self.nlp(text)
+
+    def pipe(self, texts):
+        texts = list(texts)
+        self.parsed.extend(texts)
+        return self.nlp.pipe(texts)
+
+
+@pytest.fixture
+def counting_nlp(monkeypatch):
+    nlp = CountingNLP(get_nlp())
+    monkeypatch.setattr(nlp_service, "_nlp", nlp)
+    return nlp
+
+
+def test_pipeline_is_shared():
+    """
+    Test that every caller gets the same spaCy pipeline instead of loading its own.
+    """
+    assert get_nlp() is get_nlp()
+    assert not set(nlp_service.EXCLUDED_COMPONENTS) & set(get_nlp().pipe_names)
+
+
+def test_utterance_is_parsed_once(counting_nlp):
+    """
+    Test that an utterance is parsed on first use only, however often its Doc and lemmas are read.
+    """
+    utterance = Utterance("Open Chrome")
+    assert counting_nlp.parsed == []
+
+    assert [token.text for token in utterance.doc] == ["Open", "Chrome"]
+    assert utterance.lemmatized == utterance.lemmatized.lower()
+    utterance.doc
+    assert counting_nlp.parsed == ["Open Chrome"]
+
+
+def test_analyze_batch_parses_only_new_utterances(counting_nlp):
+    """
+    Test that a batch keeps the parse of utterances that already have one and pipes the rest.
+    """
+    parsed = Utterance("volume up")
+    parsed.doc
+    utterances = analyze_batch([parsed, "open chrome", Utterance("mute")])
+
+    assert utterances[0] is parsed
+    assert [utterance.text for utterance in utterances] == ["volume up", "open chrome", "mute"]
+    assert counting_nlp.parsed == ["volume up", "open chrome", "mute"]
+
+
+def test_pipeline_calls_never_overlap(monkeypatch):
+    """
+    Test that utterances parsed on many threads at once reach the shared pipeline one call at a time.
+    """
+    class OverlapCheckingNLP(CountingNLP):
+        def __init__(self, nlp):
+            super().__init__(nlp)
+            self.active = 0
+            self.max_active = 0
+            self.tokenizer = nlp.tokenizer
+
+        def __call__(self, text):
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            time.sleep(0.005)
+            doc = super().__call__(text)
+            self.active -= 1
+            return doc
+
+    nlp = OverlapCheckingNLP(get_nlp())
+    monkeypatch.setattr(nlp_service, "_nlp", nlp)
+    start = threading.Barrier(8)
+
+    def parse(i):
+        start.wait()
+        return Utterance(f"open app number {i}").doc
+
+    with ThreadPoolExecutor(8) as pool:
+        docs = list(pool.map(parse, range(8)))
+
+    assert len(docs) == 8 and len(nlp.parsed) == 8
+    assert nlp.max_active == 1
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from orchestrator import PipelineOrchestrator
+
+
+def make_orchestrator(timeouts=None):
+    return PipelineOrchestrator({'stt': 1, 'llm': 1}, timeouts or {})
+
+
+def test_stage_runs_on_its_executor():
+    """
+    Test that a stage runs on a thread of the executor it was given, not on the event loop.
+    """
+    orchestrator = make_orchestrator()
+
+    async def main():
+        return await orchestrator.run_stage("transcribe", "stt", lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(main()).startswith("stt")
+    finally:
+        orchestrator.shutdown()
+
+
+def test_stage_timeout_raises_timeout_error():
+    """
+    Test that a stage exceeding its timeout fails with a TimeoutError naming the stage.
+    """
+    orchestrator = make_orchestrator({"llm_fallback": 0.05})
+    release = threading.Event()
+
+    async def main():
+        await orchestrator.run_stage("llm_fallback", "llm", release.wait, 5)
+
+    try:
+        with pytest.raises(TimeoutError, match="llm_fallback"):
+            asyncio.run(main())
+    finally:
+        release.set()
+        orchestrator.shutdown()
+
+
+def test_text_command_is_not_held_up_by_voice_command():
+    """
+    Test that a text command finishes while a voice command is still waiting on a slow stage.
+    """
+    orchestrator = make_orchestrator()
+    release = threading.Event()
+    finished = []
+
+    async def voice():
+        await orchestrator.run_stage("transcribe", "stt", release.wait, 5)
+        finished.append("voice")
+
+    async def text():
+        await orchestrator.run_stage("llm_fallback", "llm", lambda: None)
+        finished.append("text")
+        release.set()
+
+    async def main():
+        orchestrator.attach(asyncio.get_running_loop())
+        orchestrator.submit(voice, voice=True)
+        orchestrator.submit(text)
+        await orchestrator.drain(timeout=5)
+
+    try:
+        asyncio.run(main())
+    finally:
+        orchestrator.shutdown()
+    assert finished == ["text", "voice"]
+
+
+def test_cancel_voice_commands_only_cancels_voice_tasks():
+    """
+    Test that cancelling voice commands (on a new wake word) leaves text commands running.
+    """
+    orchestrator = make_orchestrator()
+    outcome = {}
+
+    async def command(name):
+        try:
+            await asyncio.sleep(0.2)
+            outcome[name] = "finished"
+        except asyncio.CancelledError:
+            outcome[name] = "cancelled"
+            raise
+
+    async def main():
+        orchestrator.attach(asyncio.get_running_loop())
+        orchestrator.submit(command, "voice", voice=True)
+        orchestrator.submit(command, "text")
+        await asyncio.sleep(0.05)
+        # Called from another thread, like the listener does.
+        threading.Thread(target=orchestrator.cancel_voice_commands).start()
+        await orchestrator.drain(timeout=5)
+
+    try:
+        asyncio.run(main())
+    finally:
+        orchestrator.shutdown()
+    assert outcome == {"voice": "cancelled", "text": "finished"}
+
+
+def test_drain_waits_for_commands_submitted_from_other_threads():
+    """
+    Test that drain() also waits for commands that were just submitted from another thread.
+    """
+    orchestrator = make_orchestrator()
+    finished = []
+
+    async def command():
+        await orchestrator.run_stage("transcribe", "stt", time.sleep, 0.05)
+        finished.append(True)
+
+    async def main():
+        orchestrator.attach(asyncio.get_running_loop())
+        submitter = threading.Thread(target=orchestrator.submit, args=(command,))
+        submitter.start()
+        await asyncio.to_thread(submitter.join)
+        await orchestrator.drain(timeout=5)
+
+    try:
+        asyncio.run(main())
+    finally:
+        orchestrator.shutdown()
+    assert finished == [True]
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from component_loader import ComponentLoader
+
+
+@pytest.fixture
+def loader():
+    loader = ComponentLoader(max_workers=4)
+    yield loader
+    loader.shutdown()
+
+
+def test_fast_component_is_ready_while_slow_one_loads(loader):
+    """
+    Test that a component can be used while an unrelated, slower one is still loading.
+    """
+    release = threading.Event()
+    loader.submit('slow', lambda: release.wait(5) and "whisper")
+    loader.submit('fast', lambda: "porcupine")
+
+    assert loader.get('fast', timeout=1) == "porcupine"
+    assert loader.peek('slow') is None
+    release.set()
+    assert loader.get('slow', timeout=1) == "whisper"
+
+
+def test_dependent_component_loads_after_its_dependency(loader):
+    """
+    Test that a component only starts loading once the components it depends on are loaded.
+    """
+    order = []
+    release = threading.Event()
+    loader.submit('engine', lambda: release.wait(5) and order.append('engine') or "engine")
+    loader.submit('manager', lambda: order.append('manager') or f"manager({loader.get('engine')})",
+                  depends_on=('engine',))
+
+    assert not loader.is_ready('manager')
+    release.set()
+    assert loader.get('manager', timeout=1) == "manager(engine)"
+    assert order == ['engine', 'manager']
+
+
+def test_failed_dependency_fails_dependents(loader):
+    """
+    Test that a load error is re-raised by get() and propagates to dependent components.
+    """
+    def broken():
+        raise OSError("model not found")
+
+    loader.submit('engine', broken)
+    loader.submit('manager', lambda: "manager", depends_on=('engine',))
+
+    with pytest.raises(OSError):
+        loader.get('engine', timeout=1)
+    with pytest.raises(RuntimeError):
+        loader.get('manager', timeout=1)
+    assert loader.failed() == ['engine', 'manager']
+
+
+def test_when_all_loaded_runs_once_everything_finished(loader):
+    """
+    Test that the all-loaded callback fires once, after every component, including failed ones.
+    """
+    def broken():
+        raise ValueError("bad config")
+
+    done = threading.Event()
+    calls = []
+    loader.submit('a', lambda: 1)
+    loader.submit('b', broken)
+    loader.submit('c', lambda: 3, depends_on=('a',))
+    loader.when_all_loaded(lambda: calls.append(sorted(loader.load_times)) or done.set())
+
+    assert done.wait(1)
+    assert calls == [['a', 'c']]
+
+
+def test_component_is_warmed_up_before_it_is_handed_out(loader):
+    """
+    Test that get() only returns a component after its warm-up ran, and records the timing.
+    """
+    warmed = []
+    loader.submit('whisper', lambda: "whisper", warmup=warmed.append)
+
+    assert loader.get('whisper', timeout=1) == "whisper"
+    assert warmed == ["whisper"]
+    assert 'whisper' in loader.warmup_times
+
+
+def test_failed_warm_up_still_loads_component(loader):
+    """
+    Test that a warm-up error is logged but the (cold) component is still usable.
+    """
+    def broken(component):
+        raise RuntimeError("warm-up failed")
+
+    loader.submit('tts_engine', lambda: "piper", warmup=broken)
+
+    assert loader.get('tts_engine', timeout=1) == "piper"
+    assert 'tts_engine' not in loader.warmup_times
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from warmup import warm_up_whisper
+
+
+def test_whisper_warm_up_consumes_segments():
+    """
+    Test that the Whisper warm-up passes float32 audio and actually runs the lazy decoder.
+    """
+    decoded = []
+
+    def segments():
+        decoded.append(True)
+        yield SimpleNamespace(text="")
+
+    whisper = MagicMock()
+    whisper.transcribe.return_value = (segments(), None)
+
+    warm_up_whisper(whisper)
+
+    audio = whisper.transcribe.call_args.args[0]
+    assert audio.dtype == np.float32 and len(audio) == 16000
+    assert decoded == [True]
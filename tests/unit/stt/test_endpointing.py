@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from endpointing import Endpointer
+
+
+@pytest.fixture
+def endpointer():
+    return Endpointer(MagicMock(), confidence=0.8, required_entities={
+        "launch_application": ["APP_NAME"],
+        "get_time": [],
+    })
+
+
+def classified_as(endpointer, action, confidence, entities=None):
+    intent = {"type": "system_control", "action": action, "confidence": confidence}
+    endpointer.nlu.speculate.return_value = (intent, entities or {})
+
+
+def test_confident_intent_with_entities_is_complete(endpointer):
+    """
+    Test that a confident intent with all of its required entities counts as complete.
+    """
+    classified_as(endpointer, "launch_application", 0.9, {"APP_NAME": "chrome"})
+    assert endpointer.is_complete("open chrome")
+
+
+def test_missing_required_entity_is_not_complete(endpointer):
+    """
+    Test that an intent missing a required entity ("open" with no app) is not complete.
+    """
+    classified_as(endpointer, "launch_application", 0.9)
+    assert not endpointer.is_complete("open")
+
+
+def test_low_confidence_is_not_complete(endpointer):
+    """
+    Test that a low-confidence classification never ends the recording early.
+    """
+    classified_as(endpointer, "get_time", 0.7)
+    assert not endpointer.is_complete("what time")
+
+
+def test_unlisted_action_never_ends_early(endpointer):
+    """
+    Test that actions not listed in required_entities always wait for the full timeout.
+    """
+    classified_as(endpointer, "set_volume", 0.95)
+    assert not endpointer.is_complete("set volume to")
+
+
+def test_record_accumulates_saved_latency(endpointer):
+    """
+    Test that saved latency is accumulated only for utterances that ended early.
+    """
+    endpointer.record(0.5)
+    endpointer.record(0.0)
+    assert endpointer.stats() == {"utterances": 2, "early_endings": 1, "total_saved_seconds": 0.5}
@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from audio import AudioRingBuffer, CommandRecorder, RMSVAD
+from streaming_transcriber import StreamingTranscriber
+
+FRAME_LENGTH = 160
+SAMPLE_RATE = 1600  # 10 frames per second keeps the arithmetic readable
+
+
+def segment(text, end):
+    return SimpleNamespace(text=text, end=end)
+
+
+@pytest.fixture
+def recording():
+    """A recorder that has captured one second of speech followed by silence."""
+    ring = AudioRingBuffer(capacity=100 * FRAME_LENGTH)
+    recorder = CommandRecorder(ring, FRAME_LENGTH, vad=RMSVAD(0.01), silence_frames_after_speech=5,
+                               no_speech_timeout_frames=50, max_recording_frames=80)
+    recorder.start()
+    for _ in range(10):
+        recorder.process_frame(ring.write(np.full(FRAME_LENGTH, 8000, dtype=np.int16)))
+    for _ in range(3):
+        recorder.process_frame(ring.write(np.zeros(FRAME_LENGTH, dtype=np.int16)))
+    return recorder
+
+
+def make_streamer(whisper, partials):
+    return StreamingTranscriber(whisper, SAMPLE_RATE, speech_pad=0, interval=3600,
+                                min_window=FRAME_LENGTH,
+                                on_partial=lambda text, speech_end: partials.append(text))
+
+
+def test_hypothesis_covering_all_speech_is_reused(recording):
+    """
+    Test that when a partial pass already covered all speech, finalizing does not run Whisper again.
+    """
+    whisper = MagicMock()
+    whisper.transcribe.return_value = ([segment(" open chrome", 1.0)], None)
+    partials = []
+    session = make_streamer(whisper, partials).begin(recording)
+
+    session._step()
+    final = session.finalize(recording.speech_segments(), recording.ring.total_written)
+
+    assert partials == ["open chrome"]
+    assert final == "open chrome"
+    assert whisper.transcribe.call_count == 1
+
+
+def test_finalize_only_transcribes_unconfirmed_tail(recording):
+    """
+    Test that confirmed segments are kept and only the audio after them is transcribed at the end.
+    """
+    whisper = MagicMock()
+    whisper.transcribe.return_value = ([segment(" open", 0.5), segment(" chro", 1.0)], None)
+    session = make_streamer(whisper, []).begin(recording)
+    session._step()
+
+    # More speech arrives after the partial pass.
+    ring = recording.ring
+    for _ in range(4):
+        recording.process_frame(ring.write(np.full(FRAME_LENGTH, 8000, dtype=np.int16)))
+    whisper.transcribe.return_value = ([segment(" chrome please", 1.0)], None)
+    final = session.finalize(recording.speech_segments(), ring.total_written)
+
+    assert final == "open chrome please"
+    tail_audio = whisper.transcribe.call_args.args[0]
+    assert tail_audio.shape[0] == 17 * FRAME_LENGTH - SAMPLE_RATE // 2  # from the confirmed "open" onwards
+
+
+def test_partial_passes_share_the_stt_executor(recording):
+    """
+    Test that a partial pass waits for the executor's Whisper call in progress instead of running beside it.
+    """
+    whisper = MagicMock()
+    whisper.transcribe.return_value = ([segment(" open chrome", 1.0)], None)
+    release = threading.Event()
+    with ThreadPoolExecutor(1) as stt:
+        stt.submit(release.wait, 5)  # The previous command's final transcription
+        session = StreamingTranscriber(whisper, SAMPLE_RATE, speech_pad=0, interval=3600, min_window=FRAME_LENGTH,
+                                       executor=stt).begin(recording)
+        step = threading.Thread(target=session._step)
+        step.start()
+        step.join(0.1)
+        assert step.is_alive() and whisper.transcribe.call_count == 0
+
+        release.set()
+        step.join(5)
+    assert whisper.transcribe.call_count == 1
+
+
+def test_pass_in_flight_at_stop_is_not_published(recording):
+    """
+    Test that a partial pass that finishes after stop() does not call on_partial, which could end the next recording.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def transcribe(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return [segment(" open chrome", 1.0)], None
+
+    whisper = MagicMock()
+    whisper.transcribe.side_effect = transcribe
+    partials = []
+    session = make_streamer(whisper, partials).begin(recording)
+    step = threading.Thread(target=session._step)
+    step.start()
+    started.wait(5)
+
+    session.stop()
+    release.set()
+    step.join(5)
+    assert partials == []
+
+
+def test_finalize_on_the_stt_executor_cancels_a_queued_pass(recording):
+    """
+    Test that finalizing on the single stt thread does not wait for a partial pass queued behind it.
+    """
+    whisper = MagicMock()
+    whisper.transcribe.return_value = ([segment(" open chrome", 1.0)], None)
+    sessions, begun = [], threading.Event()
+
+    def finalize():
+        begun.wait(5)
+        session = sessions[0]
+        while session._pending is None:  # The first partial pass is queued behind this call
+            threading.Event().wait(0.01)
+        return session.finalize(recording.speech_segments(), recording.ring.total_written)
+
+    stt = ThreadPoolExecutor(1)
+    final = stt.submit(finalize)
+    sessions.append(StreamingTranscriber(whisper, SAMPLE_RATE, speech_pad=0, interval=0.01, min_window=FRAME_LENGTH,
+                                         executor=stt).begin(recording))
+    begun.set()
+
+    assert final.result(timeout=5) == "open chrome"
+    assert sessions[0].passes == 0
+    stt.shutdown(wait=False)
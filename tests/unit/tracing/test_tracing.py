@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from tracing import ChromeTraceExporter, JsonlTraceExporter, Tracer
+
+
+def test_spans_record_durations_attributes_and_errors():
+    """
+    Test that spans time their stage, keep attributes set during it, and record exceptions.
+    """
+    trace = Tracer().start_trace("voice_command")
+    with trace.span("fast_classify", model="all-MiniLM-L6-v2") as span:
+        span.set(confidence=0.93)
+    with pytest.raises(KeyError):
+        with trace.span("ner"):
+            raise KeyError("APP_NAME")
+    trace.add_span("wake_detect", 1.0, 1.5)
+
+    durations = trace.durations()
+    assert list(durations) == ["wake_detect", "fast_classify", "ner"]
+    assert durations["wake_detect"] == pytest.approx(0.5)
+    assert trace.spans[0].attributes == {"model": "all-MiniLM-L6-v2", "confidence": 0.93}
+    assert trace.spans[1].attributes["error"].startswith("KeyError")
+
+
+def test_traces_export_to_chrome_and_jsonl(tmp_path):
+    """
+    Test that a finished trace is exported once to both formats, and the Chrome file loads as JSON.
+    """
+    chrome_path, jsonl_path = tmp_path / "trace.json", tmp_path / "traces.jsonl"
+    tracer = Tracer([ChromeTraceExporter(chrome_path), JsonlTraceExporter(jsonl_path)])
+    trace = tracer.start_trace("text_command", source="text")
+    with trace.span("dispatch", intent_type="system_control"):
+        pass
+    trace.finish()
+    trace.finish()
+    tracer.close()
+
+    # The Chrome file is left open-ended so traces can be appended; close it to parse it.
+    events = json.loads(chrome_path.read_text().rstrip().rstrip(",") + "]")
+    spans = [event for event in events if event["ph"] == "X"]
+    assert len(spans) == 1
+    assert spans[0]["name"] == "dispatch"
+    assert spans[0]["args"] == {"trace_id": trace.trace_id, "source": "text", "intent_type": "system_control"}
+
+    records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["name"] == "text_command"
+    assert records[0]["spans"][0]["name"] == "dispatch"
+    assert records[0]["spans"][0]["start_ms"] == 0.0
@@ -0,0 +1,202 @@
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class Span:
+    """One timed stage of a trace. Use as a context manager, or record it after the fact."""
+
+    __slots__ = ("name", "start", "end", "attributes", "thread_id", "thread_name")
+
+    def __init__(self, name: str, start: float = None, end: float = None, **attributes):
+        thread = threading.current_thread()
+        self.name = name
+        self.start = start
+        self.end = end
+        self.attributes = attributes
+        self.thread_id = thread.native_id
+        self.thread_name = thread.name
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, **attributes):
+        """Adds attributes that are only known once the stage has run (confidence, bytes...)."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end = time.perf_counter()
+        if exc_type:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc_val}"
+
+
+class Trace:
+    """
+    All spans of one command, from wake word to the first audio of the response.
+
+    Spans may be added from any thread. The trace is exported once, by `finish()`.
+    """
+
+    def __init__(self, tracer, trace_id: int, name: str, **attributes):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.name = name
+        self.attributes = attributes
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def span(self, name: str, **attributes) -> Span:
+        """Returns a span to be used as a context manager around the stage."""
+        span = Span(name, **attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def add_span(self, name: str, start: float, end: float, **attributes) -> Span:
+        """Records a stage that was timed elsewhere (`start`/`end` are perf_counter values)."""
+        span = Span(name, start, end, **attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def durations(self) -> dict[str, float]:
+        """Seconds spent per stage name, in the order the stages started."""
+        durations = {}
+        with self._lock:
+            spans = sorted((span for span in self.spans if span.start is not None), key=lambda s: s.start)
+        for span in spans:
+            durations[span.name] = durations.get(span.name, 0.0) + span.duration
+        return durations
+
+    def finish(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        self.tracer.export(self)
+
+
+class ChromeTraceExporter:
+    """
+    Appends spans as Chrome trace events ("X" complete events), viewable in
+    chrome://tracing or https://ui.perfetto.dev.
+
+    The file uses the JSON Array Format without the closing bracket, which both viewers
+    accept; that way every trace can be appended as soon as it finishes.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write("[\n")
+        self._pid = os.getpid()
+        self._named_threads = set()
+
+    def export(self, trace: Trace, epoch: float):
+        events = []
+        for span in trace.spans:
+            if span.start is None:
+                continue
+            if span.thread_id not in self._named_threads:
+                self._named_threads.add(span.thread_id)
+                events.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": span.thread_id,
+                               "args": {"name": span.thread_name}})
+            events.append({
+                "name": span.name,
+                "cat": trace.name,
+                "ph": "X",
+                "ts": (span.start - epoch) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": self._pid,
+                "tid": span.thread_id,
+                "args": {"trace_id": trace.trace_id, **trace.attributes, **span.attributes},
+            })
+        self._file.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlTraceExporter:
+    """Writes one JSON line per trace with its spans, relative to the start of the trace."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def export(self, trace: Trace, epoch: float):
+        spans = sorted((span for span in trace.spans if span.start is not None), key=lambda s: s.start)
+        origin = spans[0].start if spans else 0.0
+        record = {
+            "trace_id": trace.trace_id,
+            "name": trace.name,
+            **trace.attributes,
+            "spans": [{
+                "name": span.name,
+                "start_ms": (span.start - origin) * 1000,
+                "duration_ms": span.duration * 1000,
+                "thread": span.thread_name,
+                **span.attributes,
+            } for span in spans],
+        }
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Tracer:
+    """
+    Creates a Trace per command and hands finished traces to the exporters. With no
+    exporters, tracing costs a few perf_counter() calls per stage.
+    """
+
+    def __init__(self, exporters: list = None):
+        self.exporters = exporters or []
+        self.epoch = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start_trace(self, name: str, **attributes) -> Trace:
+        return Trace(self, next(self._ids), name, **attributes)
+
+    def export(self, trace: Trace):
+        if not self.exporters:
+            return
+        with self._lock:
+            for exporter in self.exporters:
+                try:
+                    exporter.export(trace, self.epoch)
+                except Exception as e:
+                    print(f"[Tracer] ERROR: Failed to export trace {trace.trace_id}: {e}")
+
+    def close(self):
+        with self._lock:
+            for exporter in self.exporters:
+                exporter.close()
+            self.exporters = []
+
+
+def create_tracer(tracing_settings: dict, project_root: Path, extra_exporters: tuple = ()) -> Tracer:
+    """
+    Builds the Tracer described by the `tracing` section of config.yaml.
+    :param extra_exporters: Exporters that always receive traces, e.g. for metrics.
+    """
+    exporters = list(extra_exporters)
+    if tracing_settings['enabled']:
+        if tracing_settings['chrome_trace_path']:
+            exporters.append(ChromeTraceExporter(project_root / tracing_settings['chrome_trace_path']))
+        if tracing_settings['jsonl_path']:
+            exporters.append(JsonlTraceExporter(project_root / tracing_settings['jsonl_path']))
+    return Tracer(exporters)
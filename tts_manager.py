@@ -1,10 +1,10 @@
 import io
 import queue
 import threading
+import time
 import wave
 
 import numpy as np
-import sounddevice as sd
 
 from tts import PiperTTSNative
 
@@ -15,8 +15,10 @@ class TTSManager:
     Now supports callbacks when TTS playback completes.
     """
 
-    def __init__(self, tts_engine: PiperTTSNative):
+    def __init__(self, tts_engine: PiperTTSNative, play_audio: bool = True):
         self.tts_engine = tts_engine
+        # When False, speech is synthesized but not played (e.g. when replaying recordings).
+        self.play_audio = play_audio
         self.task_queue = queue.Queue()
         self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.worker_thread.start()
@@ -31,6 +33,9 @@ class TTSManager:
             return
 
         try:
+            # Imported here so that TTS can run without PortAudio when playback is disabled.
+            import sounddevice as sd
+
             with wave.open(io.BytesIO(wav_bytes), 'rb') as wav_file:
                 sample_rate = wav_file.getframerate()
                 num_channels = wav_file.getnchannels()
@@ -62,13 +67,24 @@ class TTSManager:
             if task is None:
                 break
 
-            # Task is a tuple: (text, callback)
-            text, callback = task
+            # Task is a tuple: (text, callback, trace, queued_at)
+            text, callback, trace, queued_at = task
             print(f"[TTSManager] Worker thread received task: '{text}'")
 
             # Perform the slow, blocking operations here
+            synth_start = time.perf_counter()
             wav_bytes = self.tts_engine.speak(text)
-            self._play_audio(wav_bytes)
+            play_start = time.perf_counter()
+            if trace:
+                trace.add_span("tts_synth", synth_start, play_start, characters=len(text), bytes=len(wav_bytes))
+                # Playback starts right after synthesis; this is when the user first hears LOKI.
+                trace.add_span("first_audio_out", queued_at, play_start, played=self.play_audio)
+            if self.play_audio:
+                self._play_audio(wav_bytes)
+                if trace:
+                    trace.add_span("tts_playback", play_start, time.perf_counter())
+            if trace:
+                trace.finish()
 
             # After playback is complete, call the callback if provided
             if callback:
@@ -79,17 +95,20 @@ class TTSManager:
 
         print("[TTSManager] Worker thread shutting down.")
 
-    def speak_async(self, text: str, on_complete=None):
+    def speak_async(self, text: str, on_complete=None, trace=None):
         """
         Public method to add text to the TTS queue. This is non-blocking.
 
         Args:
             text: The text to synthesize and speak
             on_complete: Optional callback function to call after playback completes
+            trace: Optional tracing.Trace of the command; synthesis spans are added and the trace is finished
         """
         if not text:
+            if trace:
+                trace.finish()
             return
-        self.task_queue.put((text, on_complete))
+        self.task_queue.put((text, on_complete, trace, time.perf_counter()))
         print(f"[TTSManager] Queued for synthesis: '{text}'")
 
     def shutdown(self):
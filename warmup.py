@@ -0,0 +1,35 @@
+import numpy as np
+
+# Short, representative inputs. They only have to take the same code paths as real commands.
+WARMUP_TEXT = "open chrome"
+WARMUP_SPEECH = "Okay."
+WARMUP_AUDIO_SECONDS = 1.0
+WHISPER_SAMPLE_RATE = 16000
+
+
+def warm_up_whisper(whisper):
+    """
+    Runs one transcription over a second of faint noise, so CTranslate2's kernels and
+    allocator caches are initialized before the first command.
+    """
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(WARMUP_AUDIO_SECONDS * WHISPER_SAMPLE_RATE)) * 0.01).astype(np.float32)
+    segments, _ = whisper.transcribe(audio, language="en", vad_filter=False)
+    # Segments are generated lazily; decoding only happens while they are consumed.
+    for _ in segments:
+        pass
+
+
+def warm_up_fast_classifier(fast_classifier):
+    """Runs spaCy and one SentenceTransformer forward pass for a single sentence."""
+    fast_classifier.classify(WARMUP_TEXT)
+
+
+def warm_up_ner_predictor(ner_predictor):
+    """Runs feature extraction and the CRF tagger once."""
+    ner_predictor.predict(WARMUP_TEXT)
+
+
+def warm_up_tts(tts_engine):
+    """Synthesizes a short phrase without playing it, so Piper's ONNX session is optimized."""
+    tts_engine.speak(WARMUP_SPEECH)